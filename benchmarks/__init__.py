@@ -0,0 +1,12 @@
+"""
+Standalone benchmarks for the flight services.
+
+Run from the project root, e.g.:
+    python -m benchmarks.flight_store
+"""
+import os
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'space_flight_control_system.settings')
+django.setup()
@@ -0,0 +1,156 @@
+"""
+Compare requests/s and p99 latency of the WSGI deployment (FlightViewSet in server threads),
+the ASGI deployment running FlightViewSet through sync_to_async and the ASGI deployment running the async views.
+Requests go straight to the Django WSGI/ASGI handlers in this process (no sockets, no HTTP parsing),
+so the numbers show the cost of the handler stack and views, not of a particular server.
+
+    python -m benchmarks.asgi_wsgi [requests] [concurrency]
+"""
+import asyncio
+import io
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from wsgiref.util import setup_testing_defaults
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "space_flight_control_system.settings")
+
+from . import utils
+from space_flight_control_system.asgi import application as asgi_application
+from space_flight_control_system.wsgi import application as wsgi_application
+
+FLIGHT = json.dumps({"departure_location": "Earth", "arrival_location": "Mars", "max_capacity": 50}).encode()
+
+
+def wsgi_request(method: str, path: str, query: str = "", body: bytes = b"") -> int:
+    environ = {
+        "REQUEST_METHOD": method,
+        "PATH_INFO": path,
+        "QUERY_STRING": query,
+        "CONTENT_TYPE": "application/json",
+        "CONTENT_LENGTH": str(len(body)),
+        "wsgi.input": io.BytesIO(body),
+    }
+    setup_testing_defaults(environ)
+    statuses = []
+    response = wsgi_application(environ, lambda status, headers: statuses.append(status))
+    for _ in response:
+        pass
+    response.close()
+    return int(statuses[0].split()[0])
+
+
+async def asgi_request(method: str, path: str, query: str = "", body: bytes = b"") -> int:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "headers": [
+            (b"host", b"127.0.0.1"),
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+        ],
+        "client": ("127.0.0.1", 50000),
+        "server": ("127.0.0.1", 80),
+    }
+    statuses = []
+    request_sent = False
+    response_done = asyncio.Event()
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await response_done.wait()  # the client stays connected until the response is complete
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            statuses.append(message["status"])
+        elif not message.get("more_body"):
+            response_done.set()
+
+    await asgi_application(scope, receive, send)
+    return statuses[0]
+
+
+def percentile(latencies: list[float], fraction: float) -> float:
+    latencies = sorted(latencies)
+    return latencies[min(len(latencies) - 1, int(len(latencies) * fraction))]
+
+
+def run_wsgi(requests: int, concurrency: int, *request) -> tuple[float, list[float]]:
+    latencies = []
+    lock = threading.Lock()
+
+    def client(count: int) -> None:
+        timings = []
+        for _ in range(count):
+            start = time.perf_counter()
+            wsgi_request(*request)
+            timings.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(timings)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        for _ in executor.map(client, [requests // concurrency] * concurrency):
+            pass
+    return time.perf_counter() - start, latencies
+
+
+def run_asgi(requests: int, concurrency: int, *request) -> tuple[float, list[float]]:
+    latencies = []
+
+    async def client(count: int) -> None:
+        for _ in range(count):
+            start = time.perf_counter()
+            await asgi_request(*request)
+            latencies.append(time.perf_counter() - start)
+
+    async def run() -> float:
+        start = time.perf_counter()
+        await asyncio.gather(*(client(requests // concurrency) for _ in range(concurrency)))
+        return time.perf_counter() - start
+
+    return asyncio.run(run()), latencies
+
+
+def bench(name: str, run, requests: int, concurrency: int, *request) -> list:
+    run(concurrency, concurrency, *request)  # warm up
+    elapsed, latencies = run(requests, concurrency, *request)
+    return [
+        name,
+        f"{len(latencies) / elapsed:,.0f}",
+        f"{percentile(latencies, 0.5) * 1000:.2f}",
+        f"{percentile(latencies, 0.99) * 1000:.2f}",
+    ]
+
+
+def main(requests: int = 5_000, concurrency: int = 32) -> None:
+    assert wsgi_request("POST", "/api/v1/flight/", body=FLIGHT) == 201
+    print(f"{requests:,} requests per run, {concurrency} concurrent clients")
+    rows = []
+    for endpoint, method, sync_path, async_path, query, body in [
+        ("delayed", "GET", "/api/v1/delayed/", "/api/v1/async/delayed/", "flight_id=0", b""),
+        ("flight", "POST", "/api/v1/flight/", "/api/v1/async/flight/", "", FLIGHT),
+    ]:
+        rows += [
+            bench(f"{endpoint}, WSGI", run_wsgi, requests, concurrency, method, sync_path, query, body),
+            bench(f"{endpoint}, ASGI sync view", run_asgi, requests, concurrency, method, sync_path, query, body),
+            bench(f"{endpoint}, ASGI async view", run_asgi, requests, concurrency, method, async_path, query, body),
+        ]
+    utils.print_table(["deployment", "requests/s", "p50 ms", "p99 ms"], rows)
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,67 @@
+"""
+Compare memory use and throughput of the flight storage engines.
+
+    python -m benchmarks.flight_store [flights]
+"""
+import sys
+
+from . import utils
+from flight.models import FlightStatus
+from flight.services import ColumnarFlightService, FlightService
+
+LOCATIONS = ["Earth", "Mars", "Moon", "Venus", "Europa", "Titan", "Ceres", "Io"]
+
+
+def fill(service: FlightService, flights: int) -> FlightService:
+    for i in range(flights):
+        service.add_flight(LOCATIONS[i % 8], LOCATIONS[(i * 3 + 1) % 8], 50)
+    for i in range(0, flights, 10):
+        service.change_flight_status(i, FlightStatus.DELAYED.value)
+    return service
+
+
+def bench(service_class: type[FlightService], flights: int) -> list:
+    service, memory = utils.measure_memory(lambda: fill(service_class(), flights))
+
+    def add():
+        fill(service_class(), flights)
+        return flights
+
+    def scan():
+        is_delayed = service.is_delayed
+        for i in range(flights):
+            is_delayed(i)
+        return flights
+
+    def change_status():
+        for i in range(flights):
+            service.change_flight_status(i, FlightStatus.ON_THE_WAY.value)
+        return flights
+
+    def buy():
+        target = service_class()
+        target.add_flight("Earth", "Mars", flights)
+        for i in range(flights):
+            target.buy_ticket(0, i)
+        return flights
+
+    return [
+        service_class.__name__,
+        f"{memory / flights:.0f}",
+        f"{utils.measure_rate(add):,.0f}",
+        f"{utils.measure_rate(scan):,.0f}",
+        f"{utils.measure_rate(change_status):,.0f}",
+        f"{utils.measure_rate(buy):,.0f}",
+    ]
+
+
+def main(flights: int = 300_000) -> None:
+    print(f"{flights:,} flights")
+    utils.print_table(
+        ["engine", "bytes/flight", "add/s", "is_delayed/s", "status/s", "buy_ticket/s"],
+        [bench(service_class, flights) for service_class in (FlightService, ColumnarFlightService)],
+    )
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,72 @@
+"""
+Measure recovery time of a journal with a million records: replaying the whole journal
+versus loading a snapshot and replaying the tail written after it.
+
+    python -m benchmarks.journal_recovery [records] [tail records]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from . import utils
+from flight.services import FlightService, JournalService, PassengerService
+
+FLIGHTS = 10_000
+CAPACITY = 100
+
+
+def journal_mutations(flight_service, passenger_service, records: int):
+    """
+    Yield after every record: flights first, then passengers alternating with their tickets
+    """
+    for _ in range(FLIGHTS):
+        flight_service.add_flight("Earth", "Mars", CAPACITY)
+        yield
+    for i in range((records - FLIGHTS) // 2):
+        passenger_id = passenger_service.add_passenger(f"Yuri{i}", "Gagarin")
+        yield
+        flight_service.buy_ticket(i % FLIGHTS, passenger_id)
+        yield
+
+
+def build(directory: str, records: int, tail: int | None) -> float:
+    journal = JournalService(directory, snapshot_records=0, durability="none")
+    flight_service, passenger_service = journal.recover(FlightService(), PassengerService())
+    start = time.perf_counter()
+    for written, _ in enumerate(journal_mutations(flight_service, passenger_service, records), start=1):
+        if tail is not None and written == records - tail:
+            journal.snapshot()
+    elapsed = time.perf_counter() - start
+    journal.close()
+    return records / elapsed
+
+
+def recover(directory: str) -> dict:
+    journal = JournalService(directory)
+    journal.recover(FlightService(), PassengerService())
+    journal.close()
+    return journal.recovery_stats
+
+
+def main(records: int = 1_000_000, tail: int = 100_000) -> None:
+    print(f"{records:,} journal records")
+    rows = []
+    for name, snapshot_tail in (("journal only", None), (f"snapshot + {tail:,} tail", tail)):
+        with tempfile.TemporaryDirectory() as directory:
+            write_rate = build(directory, records, snapshot_tail)
+            size = sum(os.path.getsize(os.path.join(directory, file_name)) for file_name in os.listdir(directory))
+            stats = recover(directory)
+            rows.append([
+                name,
+                f"{write_rate:,.0f}",
+                f"{size / 2**20:.1f}",
+                f"{stats['replayed_records']:,}",
+                f"{stats['snapshot_seconds']:.2f}",
+                f"{stats['seconds']:.2f}",
+            ])
+    utils.print_table(["recovery", "records/s written", "MiB on disk", "replayed", "snapshot s", "total s"], rows)
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,47 @@
+"""
+Compare passenger registrations per second with the direct, buffered and async log writers.
+
+    python -m benchmarks.log_writer [registrations]
+"""
+import sys
+
+from . import utils
+from flight.services import LogService, PassengerService
+
+CONFIGURATIONS = [
+    {"mode": "direct"},
+    {"mode": "buffered", "durability": "none"},
+    {"mode": "buffered", "durability": "flush"},
+    {"mode": "buffered", "durability": "fsync"},
+    {"mode": "async", "durability": "flush"},
+    {"mode": "async", "durability": "fsync"},
+]
+
+
+def bench(options: dict, registrations: int) -> list:
+    def register():
+        passenger_service = PassengerService()
+        log_service = LogService(log_file_name="bench_passengers.csv", **options)
+        for i in range(registrations):
+            passenger_service.add_passenger("Elon", f"Musk{i}")
+            log_service.write_entry("Elon", f"Musk{i}")
+        log_service.close()
+        return registrations
+
+    return [
+        options["mode"],
+        options.get("durability", "-"),
+        f"{utils.measure_rate(register):,.0f}",
+    ]
+
+
+def main(registrations: int = 50_000) -> None:
+    print(f"{registrations:,} registrations")
+    utils.print_table(
+        ["mode", "durability", "registrations/s"],
+        [bench(options, registrations) for options in CONFIGURATIONS],
+    )
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
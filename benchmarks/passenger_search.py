@@ -0,0 +1,74 @@
+"""
+Passenger name search latency (p50 / p99) with the prefix indexes at one million passengers,
+compared with scanning the passenger list.
+
+    python -m benchmarks.passenger_search [passengers] [queries]
+"""
+import random
+import string
+import sys
+import time
+from typing import Callable
+
+from . import utils
+from flight.services import PassengerService
+
+
+def random_words(rng: random.Random, count: int) -> list[str]:
+    return [
+        "".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 9))).capitalize()
+        for _ in range(count)
+    ]
+
+
+def latencies(search: Callable[[str], object], prefixes: list[str]) -> tuple[float, float]:
+    timings = []
+    for prefix in prefixes:
+        start = time.perf_counter()
+        search(prefix)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return timings[len(timings) // 2], timings[min(len(timings) - 1, len(timings) * 99 // 100)]
+
+
+def main(passengers: int = 1_000_000, queries: int = 1_000) -> None:
+    rng = random.Random(1)
+    names = random_words(rng, 5_000)
+    surnames = random_words(rng, max(passengers // 5, 1))
+    service = PassengerService()
+    start = time.perf_counter()
+    for _ in range(passengers):
+        service.add_passenger(rng.choice(names), rng.choice(surnames))
+    elapsed = time.perf_counter() - start
+    print(f"{passengers:,} passengers registered at {passengers / elapsed:,.0f}/s (indexes included)")
+
+    sample = [service.passengers[rng.randrange(passengers)] for _ in range(queries)]
+    rows = []
+    for label, prefixes, search in [
+        ("surname, 1 letter", [p.surname[:1] for p in sample], lambda q: service.search_passengers(surname=q)),
+        ("surname, 3 letters", [p.surname[:3] for p in sample], lambda q: service.search_passengers(surname=q)),
+        ("full surname", [p.surname for p in sample], lambda q: service.search_passengers(surname=q)),
+        ("name, 2 letters", [p.name[:2] for p in sample], lambda q: service.search_passengers(name=q)),
+        (
+            "name + surname",
+            [(p.name[:2], p.surname[:3]) for p in sample],
+            lambda q: service.search_passengers(name=q[0], surname=q[1]),
+        ),
+    ]:
+        p50, p99 = latencies(search, prefixes)
+        rows.append([label, f"{p50 * 1e6:,.1f}", f"{p99 * 1e6:,.1f}"])
+
+    def scan(prefix: str) -> list[int]:
+        prefix = prefix.casefold()
+        return [
+            passenger_id for passenger_id, passenger in enumerate(service.passengers)
+            if passenger.surname.casefold().startswith(prefix)
+        ][:100]
+
+    p50, p99 = latencies(scan, [p.surname[:3] for p in sample[:5]])
+    rows.append(["surname, 3 letters, list scan", f"{p50 * 1e6:,.1f}", f"{p99 * 1e6:,.1f}"])
+    utils.print_table(["query (limit 100)", "p50 us", "p99 us"], rows)
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,71 @@
+"""
+Per-request overhead of validating get_delayed / get_ticket query parameters with the DRF serializer
+and with the fast path, alone and as part of a whole get_delayed request.
+
+    python -m benchmarks.query_validation [requests]
+"""
+import os
+import sys
+from unittest.mock import patch
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "space_flight_control_system.settings")
+django.setup()
+
+from django.http import QueryDict
+from rest_framework.test import APIRequestFactory
+
+from . import utils
+from flight.serializers import BuyTicketQuerySerializer, FlightIDSerializer
+from flight.validation import fast_query_validator
+from flight.views import FlightViewSet
+
+
+def microseconds(func, requests: int) -> str:
+    def run():
+        for _ in range(requests):
+            func()
+        return requests
+    return f"{1_000_000 / utils.measure_rate(run):.2f}"
+
+
+def bench_validation(name: str, serializer_class, query: str, requests: int) -> list:
+    data = QueryDict(query)
+    validator = fast_query_validator(serializer_class)
+
+    def serializer():
+        query_ser = serializer_class(data=data)
+        return query_ser.data if query_ser.is_valid() else query_ser.errors
+
+    def fast():
+        query_ser = validator(data)
+        return query_ser.data if query_ser.is_valid() else query_ser.errors
+
+    return [name, microseconds(serializer, requests), microseconds(fast, requests)]
+
+
+def bench_view(requests: int) -> list:
+    FlightViewSet.flight_service.add_flight("Earth", "Mars", 50)
+    view = FlightViewSet.as_view({"get": "get_delayed"})
+    request = APIRequestFactory().get("/api/v1/delayed/?flight_id=0")
+    timings = []
+    for fast_query_actions in [frozenset(), frozenset({"get_delayed"})]:
+        with patch.object(FlightViewSet, "fast_query_actions", fast_query_actions):
+            timings.append(microseconds(lambda: view(request), requests))
+    return ["get_delayed request", *timings]
+
+
+def main(requests: int = 20_000) -> None:
+    print(f"{requests:,} requests per run, microseconds per request")
+    rows = [
+        bench_validation("flight_id, valid", FlightIDSerializer, "flight_id=42", requests),
+        bench_validation("flight_id, invalid", FlightIDSerializer, "flight_id=-1", requests),
+        bench_validation("ticket, valid", BuyTicketQuerySerializer, "flight_id=42&passenger_id=7", requests),
+        bench_view(requests // 4),
+    ]
+    utils.print_table(["query", "serializer", "fast path"], rows)
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,60 @@
+"""
+flights_by_status latency (p50 / p99) of the shared memory engine, which scans the status column in chunks,
+compared with the per-status index of the columnar engine, at 100,000 flights.
+
+    python -m benchmarks.shared_status_scan [flights] [queries]
+"""
+import random
+import sys
+import time
+import uuid
+
+from . import utils
+from flight.models import FlightStatus
+from flight.services import ColumnarFlightService, SharedFlightService
+
+
+def latencies(query, queries: int) -> tuple[float, float]:
+    timings = []
+    for _ in range(queries):
+        start = time.perf_counter()
+        query()
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return timings[len(timings) // 2], timings[min(len(timings) - 1, len(timings) * 99 // 100)]
+
+
+def main(flights: int = 100_000, queries: int = 1_000) -> None:
+    rng = random.Random(1)
+    delayed = set(rng.sample(range(flights), flights // 100))
+    shared = SharedFlightService(f"bench_{uuid.uuid4().hex[:12]}", max_flights=flights, max_seats=flights)
+    columnar = ColumnarFlightService()
+    try:
+        for service in (shared, columnar):
+            for flight_id in range(flights):
+                service.add_flight("Earth", "Mars", 1)
+            for flight_id in delayed:
+                service.change_flight_status(flight_id, FlightStatus.DELAYED.value)
+
+        middle = sorted(delayed)[len(delayed) // 2]
+        rows = []
+        for label, status, after in [
+            ("common status, first page", FlightStatus.AVAILABLE_FOR_REGISTRATION.value, -1),
+            ("1% of flights, first page", FlightStatus.DELAYED.value, -1),
+            ("1% of flights, deep page", FlightStatus.DELAYED.value, middle),
+            ("no flights (whole column)", FlightStatus.ARRIVED.value, -1),
+        ]:
+            row = [label]
+            for service in (shared, columnar):
+                p50, p99 = latencies(lambda: service.flights_by_status(status, after=after, limit=100), queries)
+                row += [f"{p50 * 1e6:,.1f}", f"{p99 * 1e6:,.1f}"]
+            rows.append(row)
+    finally:
+        shared.unlink()
+        shared.close()
+    print(f"{flights:,} flights, limit 100, microseconds per query")
+    utils.print_table(["query", "shared scan p50", "p99", "columnar index p50", "p99"], rows)
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,69 @@
+"""
+Compare the in-memory flight service with the SQLite one (committing every write and in batches)
+on create / buy_ticket / is_delayed workloads.
+
+    python -m benchmarks.storage_backends [operations]
+"""
+import os
+import sys
+import tempfile
+from typing import Callable
+
+from . import utils
+from flight.services import FlightService, SQLiteDatabase, SQLiteFlightService
+
+
+def bench(name: str, create_service: Callable[[], FlightService], operations: int) -> list:
+    def create():
+        service = create_service()
+        for i in range(operations):
+            service.add_flight("Earth", "Mars", 50)
+        return operations
+
+    service = create_service()
+    flight_ids = [service.add_flight("Earth", "Mars", operations) for _ in range(3)]
+    next_passenger_id = iter(range(10**9))
+
+    def buy():
+        flight_id = flight_ids.pop()
+        for _ in range(operations):
+            service.buy_ticket(flight_id, next(next_passenger_id))
+        return operations
+
+    def is_delayed():
+        for i in range(operations):
+            service.is_delayed(i % 3)
+        return operations
+
+    return [
+        name,
+        f"{utils.measure_rate(create):,.0f}",
+        f"{utils.measure_rate(buy):,.0f}",
+        f"{utils.measure_rate(is_delayed):,.0f}",
+    ]
+
+
+def main(operations: int = 20_000) -> None:
+    print(f"{operations:,} operations per run, operations/s")
+    with tempfile.TemporaryDirectory() as directory:
+        databases = []
+
+        def sqlite(commit_rows: int) -> Callable[[], FlightService]:
+            def create_service() -> FlightService:
+                database = SQLiteDatabase(os.path.join(directory, f"{len(databases)}.sqlite3"), commit_rows=commit_rows)
+                databases.append(database)
+                return SQLiteFlightService(database)
+            return create_service
+
+        rows = [
+            bench("memory", FlightService, operations),
+            bench("sqlite, commit every write", sqlite(1), operations // 10),
+            bench("sqlite, commit every 100", sqlite(100), operations),
+        ]
+        for database in databases:
+            database.close()
+    utils.print_table(["engine", "add_flight/s", "buy_ticket/s", "is_delayed/s"], rows)
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
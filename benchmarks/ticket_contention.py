@@ -0,0 +1,56 @@
+"""
+Measure concurrent ticket sales throughput by thread count, with per-flight lock striping
+and with a single lock shared by all flights.
+
+    python -m benchmarks.ticket_contention [tickets per thread] [flights]
+"""
+import sys
+import threading
+import time
+
+from . import utils
+from flight.services import ColumnarFlightService, FlightService
+
+THREADS = [1, 2, 4, 8, 16]
+
+
+def bench(service_class: type[FlightService], lock_stripes: int, threads: int, tickets: int, flights: int) -> float:
+    service = service_class(lock_stripes=lock_stripes)
+    for _ in range(flights):
+        service.add_flight("Earth", "Mars", threads * tickets)
+    start_barrier = threading.Barrier(threads + 1)
+
+    def sell(thread: int) -> None:
+        start_barrier.wait()
+        for i in range(tickets):
+            service.buy_ticket((thread + i) % flights, thread * tickets + i)
+
+    workers = [threading.Thread(target=sell, args=(thread,)) for thread in range(threads)]
+    for worker in workers:
+        worker.start()
+    start_barrier.wait()
+    start = time.perf_counter()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+
+    sold = sum(service.count_passengers(flight_id) for flight_id in range(flights))
+    assert sold == threads * tickets, "oversold or lost tickets"
+    return sold / elapsed
+
+
+def main(tickets: int = 20_000, flights: int = 256) -> None:
+    print(f"{tickets:,} tickets per thread over {flights} flights, tickets/s")
+    rows = []
+    for service_class in (FlightService, ColumnarFlightService):
+        for lock_stripes in (1, 64):
+            rows.append([
+                service_class.__name__,
+                lock_stripes,
+                *(f"{bench(service_class, lock_stripes, threads, tickets, flights):,.0f}" for threads in THREADS),
+            ])
+    utils.print_table(["engine", "stripes", *(f"{threads} threads" for threads in THREADS)], rows)
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
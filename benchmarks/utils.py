@@ -0,0 +1,42 @@
+import gc
+import time
+import tracemalloc
+from typing import Callable
+
+
+def measure_memory(build: Callable[[], object]) -> tuple[object, int]:
+    """
+    Build an object and measure how much memory stays allocated for it
+    :param build: factory to measure
+    :return: built object and allocated bytes
+    """
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    obj = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return obj, after - before
+
+
+def measure_rate(func: Callable[[], int], repeat: int = 3) -> float:
+    """
+    Run func several times and return the best operations per second
+    :param func: benchmark body returning the number of operations it performed
+    :param repeat: number of runs
+    :return: operations per second
+    """
+    best = 0.0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        ops = func()
+        elapsed = time.perf_counter() - start
+        best = max(best, ops / elapsed)
+    return best
+
+
+def print_table(header: list[str], rows: list[list]) -> None:
+    widths = [max(len(str(cell)) for cell in column) for column in zip(header, *rows)]
+    for row in [header, *rows]:
+        print("  ".join(str(cell).rjust(width) for cell, width in zip(row, widths)))
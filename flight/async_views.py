@@ -0,0 +1,122 @@
+"""
+Native async variants of the hot flight, passenger, ticket and delayed endpoints.
+
+Under an ASGI server FlightViewSet runs every request in a thread through sync_to_async,
+these views run on the event loop instead. They use the same services as FlightViewSet and answer
+with the same status codes and payloads. In-memory engines are called directly (their locks are only held
+for a few instructions), other engines and the log file are called in a worker thread so they never block the loop.
+"""
+import json
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse, JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_http_methods, require_POST
+from rest_framework import status
+
+from .serializers import (
+    BuyTicketQuerySerializer,
+    FlightIDSerializer,
+    InFlightSerializer,
+    InPassengerSerializer,
+    ValidationErrorSerializer,
+)
+from .services import AlreadyBookedError, ColumnarFlightService, FlightService, PassengerService
+from .views import FlightViewSet
+
+IN_MEMORY_SERVICES = (FlightService, ColumnarFlightService, PassengerService)
+
+
+async def _call(service, method: str, *args, **kwargs):
+    func = getattr(service, method)
+    if type(service) in IN_MEMORY_SERVICES:
+        return func(*args, **kwargs)
+    return await sync_to_async(func, thread_sensitive=False)(*args, **kwargs)
+
+
+def _request_data(request):
+    # raises ValueError on malformed JSON
+    if request.content_type == "application/json":
+        return json.loads(request.body or b"{}")
+    return request.POST
+
+
+def _parse_error(error: ValueError) -> JsonResponse:
+    # same payload as the DRF JSON parser
+    return JsonResponse({"detail": f"JSON parse error - {error}"}, status=status.HTTP_400_BAD_REQUEST)
+
+
+def _validation_error(serializer) -> JsonResponse:
+    return JsonResponse(
+        ValidationErrorSerializer({"errors": serializer.errors}).data,
+        status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+    )
+
+
+@csrf_exempt
+@require_POST
+async def post_flight(request):
+    try:
+        in_flight = InFlightSerializer(data=_request_data(request))
+    except ValueError as error:
+        return _parse_error(error)
+    if not in_flight.is_valid():
+        return _validation_error(in_flight)
+
+    new_flight_id = await _call(FlightViewSet.flight_service, "add_flight", **in_flight.data)
+    return JsonResponse({"flight_id": new_flight_id}, status=status.HTTP_201_CREATED)
+
+
+@csrf_exempt
+@require_POST
+async def post_passenger(request):
+    try:
+        in_passenger = InPassengerSerializer(data=_request_data(request))
+    except ValueError as error:
+        return _parse_error(error)
+    if not in_passenger.is_valid():
+        return _validation_error(in_passenger)
+
+    new_passenger_id = await _call(FlightViewSet.passenger_service, "add_passenger", **in_passenger.data)
+    log_service = FlightViewSet.log_service
+    # a full async queue may block (backpressure policy), so that goes to a worker thread too
+    if not log_service.try_write_entry(**in_passenger.data, passenger_id=new_passenger_id):
+        await sync_to_async(log_service.write_entry, thread_sensitive=False)(
+            **in_passenger.data, passenger_id=new_passenger_id
+        )
+    return JsonResponse({"passenger_id": new_passenger_id}, status=status.HTTP_201_CREATED)
+
+
+@csrf_exempt
+@require_http_methods(["GET", "POST"])  # like /api/v1/ticket/, the query string carries the ticket either way
+async def get_ticket(request):
+    query_ser = BuyTicketQuerySerializer(data=request.GET)
+    if not query_ser.is_valid():
+        return _validation_error(query_ser)
+
+    if await _call(FlightViewSet.passenger_service, "get_passenger", query_ser.data["passenger_id"]) is None:
+        return HttpResponse(status=status.HTTP_404_NOT_FOUND)
+
+    try:
+        await _call(FlightViewSet.flight_service, "buy_ticket", **query_ser.data)
+        return HttpResponse(status=status.HTTP_200_OK)
+    except IndexError:
+        return HttpResponse(status=status.HTTP_404_NOT_FOUND)
+    except AlreadyBookedError:
+        return HttpResponse(status=status.HTTP_409_CONFLICT)
+    except ValueError:
+        return HttpResponse(status=status.HTTP_403_FORBIDDEN)
+
+
+@require_GET
+async def get_delayed(request):
+    query_ser = FlightIDSerializer(data=request.GET)
+    if not query_ser.is_valid():
+        return _validation_error(query_ser)
+
+    try:
+        if await _call(FlightViewSet.flight_service, "is_delayed", query_ser.data["flight_id"]):
+            return HttpResponse(status=status.HTTP_200_OK)
+        return HttpResponse(status=status.HTTP_204_NO_CONTENT)
+    except IndexError:
+        return HttpResponse(status=status.HTTP_404_NOT_FOUND)
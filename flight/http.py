@@ -0,0 +1,95 @@
+import json
+import re
+
+from rest_framework.renderers import BaseRenderer
+
+BYTE_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def parse_byte_range(header: str | None, size: int) -> tuple[int, int] | None:
+    """
+    Parse a single-range Range header. Raises RangeNotSatisfiable if the range is outside of the body.
+    :param header: Range header value
+    :param size: body size in bytes
+    :return: inclusive (first byte, last byte) or None to send the whole body (no, malformed or multiple ranges)
+    """
+    if not header:
+        return None
+    match = BYTE_RANGE_RE.match(header.strip())
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first:
+        if not last:
+            return None
+        suffix = int(last)  # "bytes=-N": last N bytes
+        if suffix == 0:
+            raise RangeNotSatisfiable()
+        return max(size - suffix, 0), size - 1
+    first = int(first)
+    if last and int(last) < first:
+        return None  # invalid range, ignored
+    if first >= size:
+        raise RangeNotSatisfiable()
+    last = size - 1 if not last else min(int(last), size - 1)
+    return first, last
+
+
+def accepts_encoding(header: str | None, encoding: str) -> bool:
+    """
+    Check if an Accept-Encoding header allows a content coding
+    :param header: Accept-Encoding header value
+    :param encoding: content coding, e.g. "gzip"
+    :return: coding is accepted with a non-zero quality
+    """
+    qualities = {}
+    for item in (header or "").split(","):
+        coding, *params = item.split(";")
+        quality = 1.0
+        for param in params:
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding.strip().lower()] = quality
+    return qualities.get(encoding, qualities.get("*", 0.0)) > 0
+
+
+def iter_slices(data: bytes, first: int, last: int, chunk_size: int = 64 * 1024):
+    """
+    Stream an inclusive byte range of an in-memory body in chunks
+    """
+    view = memoryview(data)
+    for offset in range(first, last + 1, chunk_size):
+        yield bytes(view[offset:min(offset + chunk_size, last + 1)])
+
+
+def format_event(event: str, data) -> bytes:
+    """
+    Format a server-sent event
+    :param event: event name
+    :param data: JSON-serializable event data
+    :return: event bytes
+    """
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n".encode()
+
+
+class EventStreamRenderer(BaseRenderer):
+    """
+    Lets content negotiation pick text/event-stream (or ?format=sse), views stream the events themselves
+    """
+    media_type = "text/event-stream"
+    format = "sse"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None) -> bytes:
+        response = (renderer_context or {}).get("response")
+        if data is None:
+            return b""
+        return format_event("error" if response is not None and response.status_code >= 400 else "message", data)
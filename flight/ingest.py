@@ -0,0 +1,117 @@
+import json
+from typing import Callable, Iterable
+
+from rest_framework.serializers import Serializer
+
+from .serializers import InFlightSerializer, InPassengerSerializer
+
+
+def extend_id_ranges(ranges: list[list[int]], ids: Iterable[int]) -> list[list[int]]:
+    """
+    Add IDs to a list of inclusive [first, last] ranges, merging consecutive values
+    :param ranges: ranges collected so far (modified in place)
+    :param ids: new IDs in creation order
+    :return: ranges
+    """
+    for new_id in ids:
+        if ranges and ranges[-1][1] + 1 == new_id:
+            ranges[-1][1] = new_id
+        else:
+            ranges.append([new_id, new_id])
+    return ranges
+
+
+def ingest_ndjson(
+        lines: Iterable[bytes | str],
+        serializer_class: type[Serializer],
+        create_batch: Callable[[list[dict]], list[int | str]],
+        batch_size: int = 500,
+) -> dict:
+    """
+    Validate newline-delimited JSON records one line at a time and create them in batches,
+    so the input is never held in memory as a whole.
+    :param lines: NDJSON lines (a file, an HTTP request body, ...)
+    :param serializer_class: serializer validating a single record
+    :param create_batch: creates validated records and returns, in the same order, the ID of every created record
+        or the error message of every record the service rejected
+    :param batch_size: number of validated records passed to create_batch at once
+    :return: number of created records, created ID ranges and per-line validation errors
+    """
+    report = {"created": 0, "id_ranges": [], "errors": []}
+    batch: list[dict] = []
+    batch_lines: list[int] = []
+
+    def flush() -> None:
+        created_ids = []
+        for line_number, result in zip(batch_lines, create_batch(batch)):
+            if isinstance(result, str):
+                report["errors"].append({"line": line_number, "errors": {"non_field_errors": [result]}})
+            else:
+                created_ids.append(result)
+        report["created"] += len(created_ids)
+        extend_id_ranges(report["id_ranges"], created_ids)
+        batch.clear()
+        batch_lines.clear()
+
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            report["errors"].append({"line": line_number, "errors": {"non_field_errors": [f"Invalid JSON: {e}"]}})
+            continue
+        if not isinstance(record, dict):
+            report["errors"].append({"line": line_number, "errors": {"non_field_errors": ["Expected a JSON object."]}})
+            continue
+
+        record_ser = serializer_class(data=record)
+        if not record_ser.is_valid():
+            report["errors"].append({"line": line_number, "errors": record_ser.errors})
+            continue
+
+        batch.append(record_ser.validated_data)
+        batch_lines.append(line_number)
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+
+    report["errors"].sort(key=lambda error: error["line"])  # rejected records are reported when their batch is
+    return report
+
+
+def ingest_flights(lines: Iterable[bytes | str], flight_service) -> dict:
+    """
+    Create flights from NDJSON lines shaped like InFlightSerializer.
+    Flights the service rejects (e.g. the shared storage is full) are reported as line errors.
+    :param lines: NDJSON lines
+    :param flight_service: FlightService to add flights to
+    :return: ingestion report (see ingest_ndjson)
+    """
+    def add_flight(flight: dict) -> int | str:
+        try:
+            return flight_service.add_flight(**flight)
+        except ValueError as e:
+            return str(e)
+
+    return ingest_ndjson(lines, InFlightSerializer, lambda batch: [add_flight(flight) for flight in batch])
+
+
+def ingest_passengers(lines: Iterable[bytes | str], passenger_service, log_service) -> dict:
+    """
+    Register passengers from NDJSON lines shaped like InPassengerSerializer and log every batch at once
+    :param lines: NDJSON lines
+    :param passenger_service: PassengerService to add passengers to
+    :param log_service: LogService to write passenger log entries to
+    :return: ingestion report (see ingest_ndjson)
+    """
+    def create_batch(batch: list[dict]) -> list[int]:
+        passenger_ids = [passenger_service.add_passenger(**passenger) for passenger in batch]
+        log_service.write_entries(
+            [(passenger["name"], passenger["surname"]) for passenger in batch],
+            passenger_ids,
+        )
+        return passenger_ids
+
+    return ingest_ndjson(lines, InPassengerSerializer, create_batch)
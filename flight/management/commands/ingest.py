@@ -0,0 +1,62 @@
+import json
+import secrets
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from flight.ingest import ingest_flights, ingest_passengers
+from flight.services import LogService, create_flight_service, create_passenger_service, journal_services
+
+PERSISTENT_FLIGHT_ENGINES = ("shared_memory", "sqlite")
+PERSISTENT_PASSENGER_ENGINES = ("sqlite",)
+
+
+class Command(BaseCommand):
+    help = (
+        "Load flights or passengers from a newline-delimited JSON file into persistent flight storage "
+        "(a shared_memory or sqlite engine, or the journal), so the server sees them"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("kind", choices=["flights", "passengers"])
+        parser.add_argument("path", help="NDJSON file to read, '-' for stdin")
+
+    def handle(self, *args, **options):
+        # the command runs in its own process: anything loaded into in-memory storage is lost when it exits
+        journal = getattr(settings, "JOURNAL", {}).get("ENABLED", False)
+        if options["kind"] == "flights":
+            engine, persistent = getattr(settings, "FLIGHT_STORAGE_ENGINE", "objects"), PERSISTENT_FLIGHT_ENGINES
+        else:
+            engine, persistent = getattr(settings, "PASSENGER_STORAGE_ENGINE", "memory"), PERSISTENT_PASSENGER_ENGINES
+        if engine not in persistent and not journal:
+            raise CommandError(
+                f"{options['kind'].capitalize()} storage engine {engine!r} keeps data in this process only, "
+                f"configure one of {', '.join(persistent)} or enable the JOURNAL"
+            )
+        if engine not in persistent:
+            self.stderr.write("The journal has a single writer: stop the server first, it loads the data on start")
+
+        try:
+            ndjson = sys.stdin if options["path"] == "-" else open(options["path"], encoding="utf-8")
+        except OSError as e:
+            raise CommandError(f"Cannot open {options['path']}: {e}")
+
+        flight_service, passenger_service = journal_services(create_flight_service(), create_passenger_service())
+        with ndjson:
+            if options["kind"] == "flights":
+                report = ingest_flights(ndjson, flight_service)
+            else:
+                # a log of its own: the server's passengers.csv and segments are left alone
+                log_options = getattr(settings, "PASSENGER_LOG", {})
+                log_service = LogService(
+                    log_file_name=f"ingest-{secrets.token_hex(4)}.csv",
+                    output_log_path=log_options.get("OUTPUT_LOG_PATH", settings.STATIC_URL + "log/"),
+                )
+                report = ingest_passengers(ndjson, passenger_service, log_service)
+                log_service.close()
+                self.stderr.write(f"Passenger log entries written to {log_service.log_file}")
+
+        self.stdout.write(json.dumps(report, indent=2))
+        if report["errors"]:
+            self.stderr.write(f"{len(report['errors'])} line(s) failed")
@@ -17,6 +17,58 @@ class FlightStatus(Enum):  # NOTE: EnumField in serializers are dumb so hard-cod
     DELAYED = "DELAYED"
 
 
+class TicketPurchaseStatus(Enum):
+    OK = "OK"
+    NOT_FOUND = "NOT_FOUND"
+    FULL = "FULL"
+    ALREADY_BOOKED = "ALREADY_BOOKED"
+
+
+class PassengerManifest:
+    """
+    Passenger IDs booked on a flight: keeps booking order and answers membership in O(1)
+    """
+    __slots__ = ("_order", "_ids")
+
+    def __init__(self, passenger_ids=()) -> None:
+        self._order: list[int] = []
+        self._ids: set[int] = set()
+        for passenger_id in passenger_ids:
+            self.add(passenger_id)
+
+    def add(self, passenger_id: int) -> bool:
+        """
+        Add a passenger to the manifest
+        :param passenger_id: Passenger ID
+        :return: True if added, False if passenger is already on the manifest
+        """
+        if passenger_id in self._ids:
+            return False
+        self._ids.add(passenger_id)
+        self._order.append(passenger_id)
+        return True
+
+    def __contains__(self, passenger_id) -> bool:
+        return passenger_id in self._ids
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def __iter__(self):
+        return iter(self._order)
+
+    def __getitem__(self, index):
+        return self._order[index]
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (PassengerManifest, list, tuple)):
+            return self._order == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"PassengerManifest({self._order!r})"
+
+
 class Flight:
     def __init__(
             self,
@@ -31,7 +83,7 @@ class Flight:
         self.arrival_location = arrival_location
         self.max_capacity = max_capacity
         self.status: str = status
-        self.passengers: list[int] = []
+        self.passengers: PassengerManifest = PassengerManifest()
 
 
 class Operation:
@@ -0,0 +1,30 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+MAX_ID = 2 ** 63 - 2  # largest ID a page can start after (SQLite row IDs, flight ID + 1, are signed 64-bit)
+
+
+def encode_cursor(kind: str, last_id: int) -> str:
+    """
+    Build an opaque page cursor
+    :param kind: what is listed ("flight", "passenger"), a cursor only works for the list it came from
+    :param last_id: ID of the last item on the page
+    :return: cursor for the next page
+    """
+    return urlsafe_b64encode(f"{kind}:{last_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(kind: str, cursor: str) -> int:
+    """
+    Read a page cursor. Raises ValueError if the cursor is malformed, out of range or belongs to another list.
+    :param kind: what is listed
+    :param cursor: cursor from encode_cursor
+    :return: ID of the last item on the previous page
+    """
+    try:
+        cursor_kind, last_id = urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode().split(":")
+        last_id = int(last_id)
+    except ValueError:  # also bad base64 and UTF-8
+        raise ValueError(f"Invalid cursor {cursor!r}") from None
+    if cursor_kind != kind or not 0 <= last_id <= MAX_ID:
+        raise ValueError(f"Invalid cursor {cursor!r}")
+    return last_id
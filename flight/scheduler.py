@@ -1,5 +1,142 @@
+import heapq
+import itertools
+import logging
+import pickle
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Callable
+
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.date import DateTrigger
 
 scheduler = BackgroundScheduler()
 scheduler.start()
+
+POOL_KINDS = ("thread", "process")
+
+logger = logging.getLogger(__name__)
+
+
+class ExecutorPool:
+    """
+    Named pool running at most max_workers jobs at a time. Waiting jobs are started highest priority first
+    (in submission order within a priority). A "process" pool runs jobs in worker processes,
+    so their functions, arguments and results must be picklable (submit rejects jobs that are not).
+    """
+
+    def __init__(self, name: str, kind: str = "thread", max_workers: int = 4):
+        """
+        :param name: pool name (used in thread names and statistics)
+        :param kind: "thread" or "process"
+        :param max_workers: jobs running at the same time
+        """
+        if kind not in POOL_KINDS:
+            raise ValueError(f"Unknown executor pool kind {kind!r}")
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        self.name = name
+        self.kind = kind
+        self.max_workers = max_workers
+        if kind == "thread":
+            self.executor = ThreadPoolExecutor(max_workers, thread_name_prefix=f"pool-{name}")
+        else:
+            self.executor = ProcessPoolExecutor(max_workers)
+        # (-priority, submission order, func, args, callback, on_error)
+        self._queue: list[tuple[int, int, Callable, tuple, Callable | None, Callable | None]] = []
+        self._order = itertools.count()
+        self._running = 0
+        self._lock = threading.Lock()
+        self.submitted_jobs = 0
+        self.completed_jobs = 0
+        self.failed_jobs = 0
+        self.run_seconds = 0.0
+        self.max_run_seconds = 0.0
+
+    def submit(
+            self,
+            func: Callable,
+            args: list | tuple = (),
+            priority: int = 0,
+            callback: Callable | None = None,
+            on_error: Callable | None = None,
+    ) -> None:
+        """
+        Queue a job
+        :param func: job function
+        :param args: job arguments
+        :param priority: jobs with higher priority start first
+        :param callback: called with the job result when it succeeds
+        :param on_error: called with the exception when it fails
+        """
+        self.check_job(func, args)
+        with self._lock:
+            heapq.heappush(self._queue, (-priority, next(self._order), func, tuple(args), callback, on_error))
+            self.submitted_jobs += 1
+        self._dispatch()
+
+    def check_job(self, func: Callable, args: list | tuple = ()) -> None:
+        """
+        Make sure a job can run in this pool. Raises ValueError if this is a process pool and the job
+        cannot be pickled (lambdas, closures, bound methods of objects holding locks, ...).
+        :param func: job function
+        :param args: job arguments
+        """
+        if self.kind != "process":
+            return
+        try:
+            pickle.dumps((func, tuple(args)))
+        except (pickle.PicklingError, TypeError, AttributeError) as exc:
+            raise ValueError(f"{func!r} cannot run in process pool {self.name!r}: {exc}") from None
+
+    def _dispatch(self) -> None:
+        while True:
+            with self._lock:
+                if self._running >= self.max_workers or not self._queue:
+                    return
+                _, _, func, args, callback, on_error = heapq.heappop(self._queue)
+                self._running += 1
+            # submitted outside the lock: a job that is already done runs its done callback right here
+            started = time.perf_counter()
+            future = self.executor.submit(func, *args)
+            future.add_done_callback(partial(self._finish, callback, on_error, started))
+
+    def _finish(self, callback: Callable | None, on_error: Callable | None, started: float, future: Future) -> None:
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self._running -= 1
+            self.run_seconds += elapsed
+            self.max_run_seconds = max(self.max_run_seconds, elapsed)
+            if future.exception() is None:
+                self.completed_jobs += 1
+            else:
+                self.failed_jobs += 1
+        try:
+            if future.exception() is not None:
+                logger.error("Job failed in executor pool %r", self.name, exc_info=future.exception())
+                if on_error is not None:
+                    on_error(future.exception())
+            elif callback is not None:
+                callback(future.result())
+        finally:
+            self._dispatch()
+
+    def stats(self) -> dict:
+        """
+        Pool statistics
+        :return: kind, max_workers, queue_depth, running, submitted/completed/failed jobs, average and max run time
+        """
+        with self._lock:
+            finished = self.completed_jobs + self.failed_jobs
+            return {
+                "kind": self.kind,
+                "max_workers": self.max_workers,
+                "queue_depth": len(self._queue),
+                "running": self._running,
+                "submitted_jobs": self.submitted_jobs,
+                "completed_jobs": self.completed_jobs,
+                "failed_jobs": self.failed_jobs,
+                "avg_run_seconds": self.run_seconds / finished if finished else 0.0,
+                "max_run_seconds": self.max_run_seconds,
+            }
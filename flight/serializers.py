@@ -1,13 +1,15 @@
+from django.conf import settings
 from rest_framework import serializers
 from rest_enumfield import EnumField
 
-from .models import FlightStatus
+from .models import FlightStatus, TicketPurchaseStatus
+from .pagination import MAX_ID, decode_cursor
 
 
 class InFlightSerializer(serializers.Serializer):
     departure_location = serializers.CharField(max_length=50)
     arrival_location = serializers.CharField(max_length=50)
-    max_capacity = serializers.IntegerField(min_value=1, default=50)
+    max_capacity = serializers.IntegerField(min_value=1, max_value=2 ** 32 - 1, default=50)  # a 32-bit column
 
 
 class FlightIDSerializer(serializers.Serializer):
@@ -23,10 +25,115 @@ class PassengerIDSerializer(serializers.Serializer):
     passenger_id = serializers.IntegerField(min_value=0, required=True)
 
 
+class PassengerSearchQuerySerializer(serializers.Serializer):
+    name = serializers.CharField(max_length=255, required=False, help_text="Name prefix (case-insensitive)")
+    surname = serializers.CharField(max_length=255, required=False, help_text="Surname prefix (case-insensitive)")
+    limit = serializers.IntegerField(min_value=1, max_value=1000, default=100)
+
+    def validate(self, attrs: dict) -> dict:
+        if not attrs.get("name") and not attrs.get("surname"):
+            raise serializers.ValidationError("Provide a name or surname prefix.")
+        return attrs
+
+
+class PassengerIDListSerializer(serializers.Serializer):
+    passenger_ids = serializers.ListField(child=serializers.IntegerField(min_value=0))
+
+
+class PassengerItinerarySerializer(PassengerIDSerializer):
+    flight_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=0),
+        help_text="Flights the passenger has tickets to, in ascending order",
+    )
+
+
 class BuyTicketQuerySerializer(FlightIDSerializer, PassengerIDSerializer):
     pass
 
 
+class BuyTicketBatchSerializer(serializers.Serializer):
+    tickets = serializers.ListField(
+        child=serializers.ListField(
+            child=serializers.IntegerField(min_value=0),
+            min_length=2,
+            max_length=2,
+        ),
+        min_length=1,
+        max_length=1000,
+        help_text="[flight_id, passenger_id] pairs",
+    )
+
+
+class BuyTicketBatchResultSerializer(serializers.Serializer):
+    results = serializers.ListField(
+        child=serializers.ChoiceField(choices=[ticket_status.value for ticket_status in TicketPurchaseStatus]),
+        help_text="Purchase outcome for every ticket, in request order",
+    )
+
+
+class TicketStatusSerializer(serializers.Serializer):
+    booked = serializers.BooleanField()
+    passengers_count = serializers.IntegerField(min_value=0)
+
+
+class FlightsByStatusQuerySerializer(serializers.Serializer):
+    status = serializers.ChoiceField(choices=[flight_status.value for flight_status in FlightStatus])
+    after = serializers.IntegerField(
+        min_value=-1,
+        max_value=MAX_ID,
+        default=-1,
+        help_text="Only flights with a greater ID are listed: next_after of the previous page",
+    )
+    limit = serializers.IntegerField(min_value=1, max_value=1000, default=100)
+
+
+class FlightIDPageSerializer(serializers.Serializer):
+    flight_ids = serializers.ListField(child=serializers.IntegerField(min_value=0))
+    next_after = serializers.IntegerField(
+        allow_null=True,
+        help_text="Pass as after to get the next page, null on the last page",
+    )
+
+
+class FlightSearchQuerySerializer(serializers.Serializer):
+    departure_location = serializers.CharField(max_length=50)
+    arrival_location = serializers.CharField(max_length=50)
+    after = serializers.IntegerField(
+        min_value=-1,
+        max_value=MAX_ID,
+        default=-1,
+        help_text="Only flights with a greater ID are listed: next_after of the previous page",
+    )
+    limit = serializers.IntegerField(min_value=1, max_value=1000, default=100)
+
+
+class BookableFlightSerializer(FlightIDSerializer):
+    seats_remaining = serializers.IntegerField(min_value=1)
+
+
+class FlightSearchResultSerializer(serializers.Serializer):
+    flights = BookableFlightSerializer(many=True)
+    next_after = serializers.IntegerField(
+        allow_null=True,
+        help_text="Pass as after to get the next page, null on the last page",
+    )
+
+
+class DelayedBatchSerializer(serializers.Serializer):
+    flight_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=0),
+        min_length=1,
+        max_length=1000,
+    )
+
+
+class DelayedBatchResultSerializer(serializers.Serializer):
+    results = serializers.ListField(
+        child=serializers.BooleanField(allow_null=True),
+        help_text="Delay status of every flight in request order, null if flight is not found",
+    )
+
+
 class ChangeFlightStatusSerializer(FlightIDSerializer):
     status = EnumField(choices=FlightStatus, required=True)
 
@@ -39,11 +146,149 @@ class ValidationErrorSerializer(serializers.Serializer):
     )
 
 
+class IngestLineErrorSerializer(serializers.Serializer):
+    line = serializers.IntegerField(min_value=1)
+    errors = serializers.DictField(
+        child=serializers.ListField(
+            child=serializers.CharField()
+        )
+    )
+
+
+class IngestReportSerializer(serializers.Serializer):
+    created = serializers.IntegerField(min_value=0)
+    id_ranges = serializers.ListField(
+        child=serializers.ListField(
+            child=serializers.IntegerField(min_value=0),
+            min_length=2,
+            max_length=2,
+        ),
+        help_text="Created IDs as inclusive [first, last] ranges",
+    )
+    errors = IngestLineErrorSerializer(many=True)
+
+
+class WatermarkQuerySerializer(serializers.Serializer):
+    after = serializers.IntegerField(
+        min_value=-1,
+        default=-1,
+        help_text="Watermark of an earlier export: only passengers with a greater ID are exported",
+    )
+
+
+class ExportQuerySerializer(WatermarkQuerySerializer):
+    until = serializers.IntegerField(
+        min_value=-1,
+        required=False,
+        help_text="Last Passenger ID to export (a watermark returned by the log operation)",
+    )
+    compress = serializers.ChoiceField(
+        choices=["gzip", "identity"],
+        required=False,
+        help_text="Content coding, overrides Accept-Encoding",
+    )
+
+
+class LogStatsSerializer(serializers.Serializer):
+    mode = serializers.CharField()
+    queue_depth = serializers.IntegerField(min_value=0)
+    lag_seconds = serializers.FloatField(min_value=0)
+    last_write_lag_seconds = serializers.FloatField(min_value=0)
+    written_rows = serializers.IntegerField(min_value=0)
+    dropped_rows = serializers.IntegerField(min_value=0)
+    spilled_rows = serializers.IntegerField(min_value=0)
+    write_errors = serializers.IntegerField(min_value=0)
+    segments = serializers.IntegerField(min_value=1)
+
+
 class OperationSerializer(serializers.Serializer):
     id = serializers.CharField(required=True, min_length=36, max_length=36)
     done = serializers.BooleanField()
     result = serializers.DictField()
 
 
+class OperationExpiredSerializer(serializers.Serializer):
+    id = serializers.CharField(required=True, min_length=36, max_length=36)
+    status = serializers.CharField(help_text='Always "expired": the operation existed but was dropped from the registry')
+
+
+class ExecutorPoolStatsSerializer(serializers.Serializer):
+    kind = serializers.ChoiceField(choices=["thread", "process"])
+    max_workers = serializers.IntegerField(min_value=1)
+    queue_depth = serializers.IntegerField(min_value=0)
+    running = serializers.IntegerField(min_value=0)
+    submitted_jobs = serializers.IntegerField(min_value=0)
+    completed_jobs = serializers.IntegerField(min_value=0)
+    failed_jobs = serializers.IntegerField(min_value=0)
+    avg_run_seconds = serializers.FloatField(min_value=0)
+    max_run_seconds = serializers.FloatField(min_value=0)
+
+
+class OperationStatsSerializer(serializers.Serializer):
+    operations = serializers.IntegerField(min_value=0)
+    pending = serializers.IntegerField(min_value=0)
+    ttl = serializers.FloatField(min_value=0)
+    max_operations = serializers.IntegerField(min_value=0)
+    expired_operations = serializers.IntegerField(min_value=0)
+    evicted_operations = serializers.IntegerField(min_value=0)
+    coalesced_operations = serializers.IntegerField(min_value=0)
+    reused_results = serializers.IntegerField(min_value=0)
+    pools = serializers.DictField(child=ExecutorPoolStatsSerializer())
+
+
 class GetOperationQuerySerializer(serializers.Serializer):
-    id = serializers.UUIDField(required=True)
\ No newline at end of file
+    id = serializers.UUIDField(required=True)
+    wait = serializers.FloatField(
+        min_value=0,
+        max_value=60,
+        required=False,
+        help_text="Long-poll: seconds to wait for the operation to finish before answering",
+    )
+
+
+class PageQuerySerializer(serializers.Serializer):
+    cursor_kind: str
+
+    cursor = serializers.CharField(required=False, help_text="next_cursor of the previous page")
+    limit = serializers.IntegerField(
+        min_value=1,
+        max_value=settings.PAGINATION["MAX_PAGE_SIZE"],
+        default=settings.PAGINATION["PAGE_SIZE"],
+    )
+
+    def validate_cursor(self, value: str) -> int:
+        try:
+            return decode_cursor(self.cursor_kind, value)
+        except ValueError:
+            raise serializers.ValidationError("Invalid cursor.") from None
+
+
+class FlightPageQuerySerializer(PageQuerySerializer):
+    cursor_kind = "flight"
+
+
+class PassengerPageQuerySerializer(PageQuerySerializer):
+    cursor_kind = "passenger"
+
+
+class FlightListItemSerializer(FlightIDSerializer):
+    departure_location = serializers.CharField()
+    arrival_location = serializers.CharField()
+    max_capacity = serializers.IntegerField(min_value=1)
+    status = serializers.ChoiceField(choices=[flight_status.value for flight_status in FlightStatus])
+    passengers_count = serializers.IntegerField(min_value=0)
+
+
+class FlightPageSerializer(serializers.Serializer):
+    flights = FlightListItemSerializer(many=True)
+    next_cursor = serializers.CharField(allow_null=True, help_text="Cursor of the next page, null on the last page")
+
+
+class PassengerListItemSerializer(PassengerIDSerializer):
+    name = serializers.CharField()
+    surname = serializers.CharField()
+
+
+class PassengerPageSerializer(serializers.Serializer):
+    passengers = PassengerListItemSerializer(many=True)
+    next_cursor = serializers.CharField(allow_null=True, help_text="Cursor of the next page, null on the last page")
\ No newline at end of file
@@ -1,11 +1,39 @@
 __all__ = [
+    'AlreadyBookedError',
+    'ColumnarFlightService',
+    'ExportService',
     'FlightService',
+    'JournalService',
+    'JournaledFlightService',
+    'JournaledPassengerService',
     'LogService',
     'OperationService',
     'PassengerService',
+    'SQLiteDatabase',
+    'SQLiteFlightService',
+    'SQLiteOperationService',
+    'SQLitePassengerService',
+    'SharedFlightService',
+    'create_flight_service',
+    'create_log_service',
+    'create_operation_service',
+    'create_passenger_service',
+    'journal_services',
 ]
 
-from .flight_service import FlightService
+from .columnar_flight_service import ColumnarFlightService
+from .export_service import ExportService
+from .factory import (
+    create_flight_service,
+    create_log_service,
+    create_operation_service,
+    create_passenger_service,
+    journal_services,
+)
+from .flight_service import AlreadyBookedError, FlightService
+from .journal_service import JournaledFlightService, JournaledPassengerService, JournalService
 from .log_service import LogService
 from .operation_service import OperationService
 from .passenger_service import PassengerService
+from .shared_flight_service import SharedFlightService
+from .sqlite_service import SQLiteDatabase, SQLiteFlightService, SQLiteOperationService, SQLitePassengerService
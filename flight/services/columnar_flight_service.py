@@ -0,0 +1,180 @@
+from array import array
+from sys import intern
+
+from ..models import Flight, FlightStatus, PassengerManifest
+from .flight_service import AlreadyBookedError, FlightService
+
+STATUSES: list[str] = [flight_status.value for flight_status in FlightStatus]
+STATUS_CODES: dict[str, int] = {value: code for code, value in enumerate(STATUSES)}
+DELAYED_CODE = STATUS_CODES[FlightStatus.DELAYED.value]
+MAX_CAPACITY = 2 ** 32 - 1  # capacities and seat counters are unsigned 32-bit columns
+
+
+class ColumnarFlightService(FlightService):
+    """
+    Flight storage engine keeping every flight attribute in its own typed column
+    instead of a list of Flight objects. Flight ID is the row index in every column.
+    """
+
+    def __init__(self, lock_stripes: int = 64):
+        self._init_locks(lock_stripes)
+        self._init_indexes()
+        self.locations: list[str] = []  # interned location names, referenced by index
+        self.location_ids: dict[str, int] = {}
+        self.departures = array("I")
+        self.arrivals = array("I")
+        self.capacities = array("I")
+        self.seats_taken = array("I")
+        self.statuses = array("B")  # index in STATUSES
+        self.passengers: dict[int, PassengerManifest] = {}  # flight ID -> manifest, created on first ticket
+
+    @property
+    def flights(self) -> list[Flight]:
+        """
+        Materialize all flights as Flight objects (slow, for debugging and exports only)
+        :return: list of flights
+        """
+        return [self.get_flight(flight_id) for flight_id in range(len(self.statuses))]
+
+    def _location_id(self, location: str) -> int:
+        location_id = self.location_ids.get(location)
+        if location_id is None:
+            location_id = len(self.locations)
+            self.locations.append(intern(location))
+            self.location_ids[self.locations[location_id]] = location_id
+        return location_id
+
+    def add_flight(
+            self,
+            departure_location: str,
+            arrival_location: str,
+            max_capacity: int
+    ) -> int:
+        """
+        Add a new flight to the system. Raises ValueError if max_capacity does not fit the capacity column.
+        :param departure_location:
+        :param arrival_location:
+        :param max_capacity:
+        :return: ID of the new flight
+        """
+        if max_capacity <= 0:
+            raise ValueError('Passenger capacity must be greater than 0')
+        if max_capacity > MAX_CAPACITY:
+            raise ValueError(f'Passenger capacity must be at most {MAX_CAPACITY}')
+        with self._add_lock, self._status_lock:  # all columns must grow together, nothing below can fail
+            departure = self._location_id(departure_location)
+            arrival = self._location_id(arrival_location)
+            self.departures.append(departure)
+            self.arrivals.append(arrival)
+            self.capacities.append(max_capacity)
+            self.seats_taken.append(0)
+            self.statuses.append(STATUS_CODES[FlightStatus.AVAILABLE_FOR_REGISTRATION.value])
+            flight_id = len(self.statuses)-1
+            self._index_status(flight_id, None, FlightStatus.AVAILABLE_FOR_REGISTRATION.value)
+            self._index_route(flight_id, (departure_location, arrival_location))
+            return flight_id
+
+    def _flight(self, flight_id: int) -> Flight:
+        return Flight(
+            self.locations[self.departures[flight_id]],
+            self.locations[self.arrivals[flight_id]],
+            self.capacities[flight_id],
+            STATUSES[self.statuses[flight_id]],
+        )
+
+    def get_flight(self, flight_id: int) -> Flight:
+        """
+        Build a Flight object from the columns. Raises IndexError if flight is not found.
+        :param flight_id: Flight ID
+        :return: Flight object (a copy, changes are not stored)
+        """
+        flight = self._flight(flight_id)
+        flight.passengers = PassengerManifest(self.passengers.get(flight_id, ()))
+        return flight
+
+    def list_flights(self, after: int = -1, limit: int = 100) -> list[tuple[int, Flight, int]]:
+        """
+        List flights in ID order, built from the columns without manifests (see FlightService.list_flights)
+        """
+        start = max(after + 1, 0)
+        stop = min(start + limit, len(self.statuses))
+        return [(flight_id, self._flight(flight_id), self.seats_taken[flight_id]) for flight_id in range(start, stop)]
+
+    def change_flight_status(self, flight_id: int, status: str) -> bool:
+        """
+        Change flight status. Raises ValueError if status is not a FlightStatus value.
+        :param flight_id: Flight ID
+        :param status: new flight status (FlightStatus.value)
+        :return: True if successful, False otherwise
+        """
+        if not -len(self.statuses) <= flight_id < len(self.statuses):
+            return False
+        try:
+            status_code = STATUS_CODES[status]
+        except KeyError:
+            raise ValueError(f"Unknown flight status {status!r}") from None
+        flight_id %= len(self.statuses)
+        with self._status_lock:
+            old_code = self.statuses[flight_id]
+            if old_code != status_code:
+                self._index_status(flight_id, STATUSES[old_code], status)
+                self.statuses[flight_id] = status_code
+        return True
+
+    def buy_ticket(self, flight_id: int, passenger_id: int) -> None:
+        """
+        Try to buy a ticket. Raises IndexError if flight_id is out of range. Raises ValueError if flight is full.
+        Raises AlreadyBookedError (a ValueError) if the passenger already has a ticket to this flight.
+        :param flight_id: Flight ID
+        :param passenger_id: Passenger ID to add to the flight passenger list (NOTE: passenger existence is not checked)
+        :return:
+        """
+        self.seats_taken[flight_id]  # raise IndexError for unknown flights
+        flight_id %= len(self.statuses)  # normalize negative IDs like list indexing does
+        with self._flight_lock(flight_id):
+            seats_taken = self.seats_taken[flight_id]
+            passengers = self.passengers.get(flight_id)
+            if passengers is not None and passenger_id in passengers:
+                raise AlreadyBookedError(f"Passenger {passenger_id} already has a ticket to flight {flight_id}")
+            if seats_taken >= self.capacities[flight_id]:
+                raise ValueError(f"Flight {flight_id} is already full")
+
+            if passengers is None:
+                passengers = self.passengers[flight_id] = PassengerManifest()
+            passengers.add(passenger_id)
+            self.seats_taken[flight_id] = seats_taken + 1
+            self._index_ticket(flight_id, passenger_id)
+            if seats_taken + 1 == self.capacities[flight_id]:
+                self._unindex_route(flight_id, self._route(flight_id))
+
+    def _route(self, flight_id: int) -> tuple[str, str]:
+        return self.locations[self.departures[flight_id]], self.locations[self.arrivals[flight_id]]
+
+    def _seats_remaining(self, flight_id: int) -> int:
+        return self.capacities[flight_id] - self.seats_taken[flight_id]
+
+    def has_ticket(self, flight_id: int, passenger_id: int) -> bool:
+        """
+        Check if passenger has a ticket to the flight. Raises IndexError if flight is not found.
+        :param flight_id: Flight ID
+        :param passenger_id: Passenger ID
+        :return: passenger is on the flight manifest
+        """
+        self.statuses[flight_id]  # raise IndexError for unknown flights
+        return passenger_id in self.passengers.get(flight_id % len(self.statuses), ())
+
+    def count_passengers(self, flight_id: int) -> int:
+        """
+        Count passengers with a ticket to the flight. Raises IndexError if flight is not found.
+        :param flight_id: Flight ID
+        :return: number of booked passengers
+        """
+        return self.seats_taken[flight_id]
+
+    def is_delayed(self, flight_id: int) -> bool:
+        """
+        Check if flight is delayed. Raises IndexError if flight is not found.
+        :param flight_id: Flight ID
+        :return: flight is delayed
+        """
+        return self.statuses[flight_id] == DELAYED_CODE
@@ -0,0 +1,215 @@
+import secrets
+import threading
+import zlib
+from array import array
+from bisect import bisect_right
+from typing import Iterator
+
+from ..models import Passenger
+from .passenger_service import PassengerService
+
+CSV_SEPARATOR = ";"
+CHECKPOINT_ROWS = 1024  # rows between remembered byte offsets
+GZIP_LEVEL = 6
+
+
+def csv_field(value) -> str:
+    value = str(value)
+    if any(char in value for char in (CSV_SEPARATOR, '"', "\n", "\r")):
+        return '"' + value.replace('"', '""') + '"'
+    return value
+
+
+class ExportService:
+    """
+    Passenger list exported as CSV bytes straight from PassengerService.
+    Passengers are append-only, so an export is fully described by its row range [first_row, rows):
+    a full export starts at row 0, an incremental one right after the watermark (last passenger ID)
+    of a previous export. Byte offsets of every CHECKPOINT_ROWS-th row are remembered, so byte ranges
+    of an export can be served without re-encoding the rows before them.
+    Exports can also be gzip-compressed while streaming; the last compressed full export is kept
+    and reused while no passengers are added.
+    """
+
+    header = CSV_SEPARATOR.join(["id", *Passenger("", "").__dict__.keys()]).encode() + b"\n"
+
+    def __init__(self, passenger_service: PassengerService, log_service=None, chunk_size: int = 64 * 1024):
+        self.passenger_service = passenger_service
+        self.log_service = log_service
+        self.chunk_size = chunk_size
+        self._lock = threading.Lock()
+        self._offsets = array("Q", [len(self.header)])  # byte offset of row i * CHECKPOINT_ROWS in a full export
+        self._measured_rows = 0  # rows included in self._size
+        self._size = len(self.header)
+        self._gzip_cache: tuple[int, bytes] | None = None  # (rows, compressed full export)
+        self._gzip_building = False  # a request is buffering a full export for the cache
+        # passenger IDs restart with the process, so row counts alone do not identify an export across restarts
+        self.generation = secrets.token_hex(4)
+
+    @staticmethod
+    def encode_row(passenger_id: int, passenger: Passenger) -> bytes:
+        return (CSV_SEPARATOR.join(
+            [str(passenger_id), *(csv_field(value) for value in passenger.__dict__.values())]
+        ) + "\n").encode()
+
+    def snapshot(self) -> int:
+        """
+        Get the current export version
+        :return: number of passengers in the export
+        """
+        return self.passenger_service.count_passengers()
+
+    def etag(self, rows: int, first_row: int = 0, encoding: str = "identity") -> str:
+        """
+        Get the entity tag of an export
+        :param rows: number of passengers when the export was taken
+        :param first_row: first Passenger ID in the export
+        :param encoding: content coding of the response
+        :return: quoted entity tag, unique to this service instance (process start)
+        """
+        version = f"{first_row}-{rows}" if first_row else f"{rows}"
+        suffix = "" if encoding == "identity" else f"-{encoding}"
+        return f'"passengers-{self.generation}-{version}{suffix}"'
+
+    def last_modified(self) -> float:
+        return self.passenger_service.last_modified
+
+    def record_export(self, after: int = -1) -> dict:
+        """
+        Record a new export high-water mark
+        :param after: watermark of the previous export the client already has (-1 for a full export)
+        :return: active log file path, log segments (see LogService.get_segments) holding rows after..watermark,
+                 previous and new watermark; rows after..watermark make up the export
+        """
+        watermark = max(self.snapshot(), after + 1) - 1
+        segments = [] if self.log_service is None else self.log_service.get_segments(after, watermark)
+        return {
+            "path": self.log_service.log_file if self.log_service is not None else None,
+            "segments": segments,
+            "after": after,
+            "watermark": watermark,
+        }
+
+    def _measure(self, rows: int) -> None:
+        # extend the size and checkpoints to cover the first `rows` rows, must be called with self._lock held
+        if rows <= self._measured_rows:
+            return
+        size = self._size
+        for passenger_id, passenger in self.passenger_service.iter_passengers(self._measured_rows, rows):
+            if passenger_id and passenger_id % CHECKPOINT_ROWS == 0:
+                self._offsets.append(size)
+            size += len(self.encode_row(passenger_id, passenger))
+        self._size = size
+        self._measured_rows = rows
+
+    def _offset_of(self, row: int) -> int:
+        # byte offset of a row in a full export, must be called with self._lock held
+        self._measure(row)
+        if row == self._measured_rows:
+            return self._size
+        checkpoint = row // CHECKPOINT_ROWS
+        offset = self._offsets[checkpoint]
+        for passenger_id, passenger in self.passenger_service.iter_passengers(checkpoint * CHECKPOINT_ROWS, row):
+            offset += len(self.encode_row(passenger_id, passenger))
+        return offset
+
+    def content_length(self, rows: int, first_row: int = 0) -> int:
+        """
+        Get the size of an export. Only rows added since the last call are encoded.
+        :param rows: number of passengers when the export was taken
+        :param first_row: first Passenger ID in the export
+        :return: size in bytes
+        """
+        first_row = min(first_row, rows)
+        with self._lock:
+            return len(self.header) + self._offset_of(rows) - self._offset_of(first_row)
+
+    def iter_bytes(self, rows: int, start: int = 0, end: int | None = None, first_row: int = 0) -> Iterator[bytes]:
+        """
+        Stream an export in chunks of about chunk_size bytes
+        :param rows: number of passengers when the export was taken
+        :param start: first byte to send
+        :param end: last byte to send (inclusive), end of export if None
+        :param first_row: first Passenger ID in the export
+        :return: iterator of byte chunks
+        """
+        first_row = min(first_row, rows)
+        size = self.content_length(rows, first_row)
+        end = size - 1 if end is None else min(end, size - 1)
+        if start > end:
+            return
+        if start < len(self.header):
+            yield self.header[start:end + 1]
+            start = len(self.header)
+            if start > end:
+                return
+
+        # translate export positions to positions in a full export
+        with self._lock:
+            shift = self._offset_of(first_row) - len(self.header)
+        start, end = start + shift, end + shift
+        with self._lock:
+            checkpoint = bisect_right(self._offsets, start) - 1
+        row, offset = checkpoint * CHECKPOINT_ROWS, self._offsets[checkpoint]
+        chunk: list[bytes] = []
+        chunk_length = 0
+
+        for passenger_id, passenger in self.passenger_service.iter_passengers(row, rows):
+            chunk.append(self.encode_row(passenger_id, passenger))
+            chunk_length += len(chunk[-1])
+            if chunk_length >= self.chunk_size or offset + chunk_length > end:
+                if offset + chunk_length > start:
+                    yield b"".join(chunk)[max(start - offset, 0):end + 1 - offset]
+                offset += chunk_length
+                chunk, chunk_length = [], 0
+                if offset > end:
+                    return
+        if chunk and offset + chunk_length > start:
+            yield b"".join(chunk)[max(start - offset, 0):end + 1 - offset]
+
+    def cached_gzip(self, rows: int, first_row: int = 0) -> bytes | None:
+        """
+        Get a gzip-compressed export produced earlier by iter_gzip
+        :param rows: number of passengers when the export was taken
+        :param first_row: first Passenger ID in the export (only full exports are cached)
+        :return: compressed export or None if it is not cached
+        """
+        cache = self._gzip_cache
+        if first_row == 0 and cache is not None and cache[0] == rows:
+            return cache[1]
+        return None
+
+    def iter_gzip(self, rows: int, first_row: int = 0) -> Iterator[bytes]:
+        """
+        Stream a gzip-compressed export, compressing chunk by chunk. A completely streamed
+        full export is cached for cached_gzip; only one request at a time keeps a copy of what it sends,
+        concurrent ones just stream.
+        :param rows: number of passengers when the export was taken
+        :param first_row: first Passenger ID in the export
+        :return: iterator of compressed chunks
+        """
+        compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        compressed = None
+        if first_row == 0:
+            with self._lock:
+                if not self._gzip_building:
+                    self._gzip_building = True
+                    compressed = []
+        try:
+            for chunk in self.iter_bytes(rows, first_row=first_row):
+                data = compressor.compress(chunk)
+                if data:
+                    if compressed is not None:
+                        compressed.append(data)
+                    yield data
+            data = compressor.flush()
+            if compressed is not None:
+                compressed.append(data)
+                cache = self._gzip_cache
+                if cache is None or cache[0] < rows:
+                    self._gzip_cache = (rows, b"".join(compressed))
+            yield data
+        finally:
+            if compressed is not None:
+                with self._lock:
+                    self._gzip_building = False
@@ -0,0 +1,108 @@
+from functools import cache
+from typing import Callable
+
+from django.conf import settings
+
+from .columnar_flight_service import ColumnarFlightService
+from .flight_service import FlightService
+from .journal_service import JournaledFlightService, JournaledPassengerService, JournalService
+from .log_service import LogService
+from .operation_service import OperationService
+from .passenger_service import PassengerService
+from .shared_flight_service import SharedFlightService
+from .sqlite_service import SQLiteDatabase, SQLiteFlightService, SQLiteOperationService, SQLitePassengerService
+
+
+@cache
+def get_sqlite_database() -> SQLiteDatabase:
+    """
+    Open the database configured by settings.SQLITE_STORAGE, shared by every SQLite service of the process
+    :return: SQLiteDatabase instance
+    """
+    options = getattr(settings, "SQLITE_STORAGE", {})
+    return SQLiteDatabase(**{key.lower(): value for key, value in options.items()})
+
+
+FLIGHT_STORAGE_ENGINES: dict[str, Callable[..., FlightService]] = {
+    "objects": FlightService,
+    "columnar": ColumnarFlightService,
+    "shared_memory": SharedFlightService,
+    "sqlite": lambda **options: SQLiteFlightService(get_sqlite_database(), **options),
+}
+PASSENGER_STORAGE_ENGINES: dict[str, Callable[[], PassengerService]] = {
+    "memory": PassengerService,
+    "sqlite": lambda: SQLitePassengerService(get_sqlite_database()),
+}
+OPERATION_STORAGE_ENGINES: dict[str, Callable[..., OperationService]] = {
+    "memory": OperationService,
+    "sqlite": lambda **options: SQLiteOperationService(get_sqlite_database(), **options),
+}
+
+
+def create_flight_service() -> FlightService:
+    """
+    Create a flight service with the storage engine selected by settings.FLIGHT_STORAGE_ENGINE,
+    configured by settings.FLIGHT_STORAGE_OPTIONS
+    :return: FlightService instance
+    """
+    engine = getattr(settings, "FLIGHT_STORAGE_ENGINE", "objects")
+    try:
+        create = FLIGHT_STORAGE_ENGINES[engine]
+    except KeyError:
+        raise ValueError(f"Unknown flight storage engine {engine!r}") from None
+    options = getattr(settings, "FLIGHT_STORAGE_OPTIONS", {})
+    return create(**{key.lower(): value for key, value in options.items()})
+
+
+def create_passenger_service() -> PassengerService:
+    """
+    Create a passenger service with the storage engine selected by settings.PASSENGER_STORAGE_ENGINE
+    :return: PassengerService instance
+    """
+    engine = getattr(settings, "PASSENGER_STORAGE_ENGINE", "memory")
+    try:
+        return PASSENGER_STORAGE_ENGINES[engine]()
+    except KeyError:
+        raise ValueError(f"Unknown passenger storage engine {engine!r}") from None
+
+
+def create_operation_service() -> OperationService:
+    """
+    Create an operation service with the storage engine selected by settings.OPERATION_STORAGE_ENGINE,
+    configured by settings.OPERATIONS
+    :return: OperationService instance
+    """
+    engine = getattr(settings, "OPERATION_STORAGE_ENGINE", "memory")
+    try:
+        create = OPERATION_STORAGE_ENGINES[engine]
+    except KeyError:
+        raise ValueError(f"Unknown operation storage engine {engine!r}") from None
+    options = getattr(settings, "OPERATIONS", {})
+    return create(**{key.lower(): value for key, value in options.items()})
+
+
+def create_log_service() -> LogService:
+    """
+    Create the passenger log service configured by settings.PASSENGER_LOG
+    :return: LogService instance
+    """
+    options = getattr(settings, "PASSENGER_LOG", {})
+    return LogService(**{key.lower(): value for key, value in options.items()})
+
+
+def journal_services(
+        flight_service: FlightService,
+        passenger_service: PassengerService,
+) -> tuple[FlightService | JournaledFlightService, PassengerService | JournaledPassengerService]:
+    """
+    Restore flights and passengers from the journal configured by settings.JOURNAL and journal their mutations,
+    if the journal is enabled
+    :param flight_service: empty flight service
+    :param passenger_service: empty passenger service
+    :return: flight and passenger services to use
+    """
+    options = dict(getattr(settings, "JOURNAL", {}))
+    if not options.pop("ENABLED", False):
+        return flight_service, passenger_service
+    journal = JournalService(**{key.lower(): value for key, value in options.items()})
+    return journal.recover(flight_service, passenger_service)
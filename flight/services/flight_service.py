@@ -1,10 +1,63 @@
-from ..models import Flight, FlightStatus
+import threading
+from bisect import bisect_left, bisect_right, insort
+
+from ..models import Flight, FlightStatus, TicketPurchaseStatus
 from datetime import datetime
+from typing import Callable, Iterable
+
+
+class AlreadyBookedError(ValueError):
+    pass
 
 
 class FlightService:
-    def __init__(self):
+    def __init__(self, lock_stripes: int = 64):
+        """
+        :param lock_stripes: number of locks ticket purchases are spread over (by flight ID),
+                             purchases for flights on different stripes run in parallel
+        """
         self.flights: list[Flight] = []
+        self._init_locks(lock_stripes)
+        self._init_indexes()
+
+    def _init_locks(self, lock_stripes: int) -> None:
+        self._add_lock = threading.Lock()  # keeps ID assignment atomic
+        self._flight_locks = [threading.Lock() for _ in range(lock_stripes)]
+
+    def _flight_lock(self, flight_id: int) -> threading.Lock:
+        return self._flight_locks[flight_id % len(self._flight_locks)]
+
+    def _init_indexes(self) -> None:
+        self.status_index: dict[str, list[int]] = {}  # status -> sorted flight IDs
+        self._status_lock = threading.Lock()
+        self.route_index: dict[tuple[str, str], list[int]] = {}  # (departure, arrival) -> sorted IDs with free seats
+        self._route_lock = threading.Lock()
+        self.itineraries: dict[int, list[int]] = {}  # passenger ID -> sorted flight IDs
+        self._itinerary_lock = threading.Lock()
+
+    @staticmethod
+    def _unindex(flight_ids: list[int], flight_id: int) -> None:
+        position = bisect_left(flight_ids, flight_id)
+        if position < len(flight_ids) and flight_ids[position] == flight_id:
+            del flight_ids[position]
+
+    def _index_status(self, flight_id: int, old_status: str | None, new_status: str) -> None:
+        # called with _status_lock held
+        self._unindex(self.status_index.get(old_status, []), flight_id)
+        insort(self.status_index.setdefault(new_status, []), flight_id)
+
+    def _index_route(self, flight_id: int, route: tuple[str, str]) -> None:
+        with self._route_lock:
+            insort(self.route_index.setdefault(route, []), flight_id)
+
+    def _index_ticket(self, flight_id: int, passenger_id: int) -> None:
+        with self._itinerary_lock:
+            insort(self.itineraries.setdefault(passenger_id, []), flight_id)
+
+    def _unindex_route(self, flight_id: int, route: tuple[str, str]) -> None:
+        # the flight is full
+        with self._route_lock:
+            self._unindex(self.route_index.get(route, []), flight_id)
 
     def add_flight(
             self,
@@ -19,14 +72,38 @@ class FlightService:
         :param max_capacity:
         :return: ID of the new flight
         """
-        self.flights.append(
-            Flight(
-                departure_location,
-                arrival_location,
-                max_capacity,
-            )
+        flight = Flight(
+            departure_location,
+            arrival_location,
+            max_capacity,
         )
-        return len(self.flights)-1
+        with self._add_lock, self._status_lock:
+            self.flights.append(flight)
+            flight_id = len(self.flights)-1
+            self._index_status(flight_id, None, flight.status)
+            self._index_route(flight_id, (departure_location, arrival_location))
+            return flight_id
+
+    def get_flight(self, flight_id: int) -> Flight:
+        """
+        Get a flight. Raises IndexError if flight is not found.
+        :param flight_id: Flight ID
+        :return: Flight object
+        """
+        return self.flights[flight_id]
+
+    def list_flights(self, after: int = -1, limit: int = 100) -> list[tuple[int, Flight, int]]:
+        """
+        List flights in ID order, O(limit) however deep the page is
+        :param after: only flights with a greater ID are listed (ID of the last flight on the previous page)
+        :param limit: max number of flights
+        :return: (Flight ID, Flight, passengers count) triples; other engines leave the Flight passenger list empty
+        """
+        start = max(after + 1, 0)
+        return [
+            (flight_id, flight, len(flight.passengers))
+            for flight_id, flight in enumerate(self.flights[start:start + limit], start=start)
+        ]
 
     def change_flight_status(self, flight_id: int, status: str) -> bool:
         """
@@ -36,22 +113,102 @@ class FlightService:
         :return: True if successful, False otherwise
         """
         try:
-            self.flights[flight_id].status = status
-            return True
+            flight = self.flights[flight_id]
         except IndexError:
             return False
+        flight_id %= len(self.flights)
+        with self._status_lock:
+            if flight.status != status:
+                self._index_status(flight_id, flight.status, status)
+                flight.status = status
+        return True
+
+    def flights_by_status(self, status: str, after: int = -1, limit: int = 100) -> list[int]:
+        """
+        List flights in a status from the status index, O(log n + limit)
+        :param status: flight status (FlightStatus.value)
+        :param after: only flights with a greater ID are listed (ID of the last flight on the previous page)
+        :param limit: max number of flights
+        :return: flight IDs in ascending order
+        """
+        with self._status_lock:
+            flight_ids = self.status_index.get(status, [])
+            start = bisect_right(flight_ids, after)
+            return flight_ids[start:start + limit]
 
     def buy_ticket(self, flight_id: int, passenger_id: int) -> None:
         """
         Try to buy a ticket. Raises IndexError if flight_id is out of range. Raises ValueError if flight is full.
+        Raises AlreadyBookedError (a ValueError) if the passenger already has a ticket to this flight.
         :param flight_id: Flight ID
-        :param passenger_id: Passenger ID to add to the flight passenger list (NOTE: no checks are performed)
+        :param passenger_id: Passenger ID to add to the flight passenger list (NOTE: passenger existence is not checked)
         :return:
         """
-        if len(self.flights[flight_id].passengers) >= self.flights[flight_id].max_capacity:
-            raise ValueError(f"Flight {flight_id} is already full")
+        flight = self.flights[flight_id]
+        flight_id %= len(self.flights)  # normalize negative IDs so they share the stripe of their flight
+        with self._flight_lock(flight_id):
+            if passenger_id in flight.passengers:
+                raise AlreadyBookedError(f"Passenger {passenger_id} already has a ticket to flight {flight_id}")
+            if len(flight.passengers) >= flight.max_capacity:
+                raise ValueError(f"Flight {flight_id} is already full")
+
+            flight.passengers.add(passenger_id)
+            self._index_ticket(flight_id, passenger_id)
+            if len(flight.passengers) == flight.max_capacity:
+                self._unindex_route(flight_id, (flight.departure_location, flight.arrival_location))
+
+    def buy_tickets(
+            self,
+            tickets: Iterable[tuple[int, int]],
+            passenger_exists: Callable[[int], bool] | None = None,
+    ) -> list[str]:
+        """
+        Buy a batch of tickets in one pass. Never raises for a single ticket, every purchase gets its own outcome.
+        :param tickets: (flight ID, passenger ID) pairs
+        :param passenger_exists: optional check, tickets for unknown passengers are reported as NOT_FOUND
+        :return: TicketPurchaseStatus value for every ticket, in the same order
+        """
+        results = []
+        for flight_id, passenger_id in tickets:
+            if passenger_exists is not None and not passenger_exists(passenger_id):
+                results.append(TicketPurchaseStatus.NOT_FOUND.value)
+                continue
+            try:
+                self.buy_ticket(flight_id, passenger_id)
+                results.append(TicketPurchaseStatus.OK.value)
+            except IndexError:
+                results.append(TicketPurchaseStatus.NOT_FOUND.value)
+            except AlreadyBookedError:
+                results.append(TicketPurchaseStatus.ALREADY_BOOKED.value)
+            except ValueError:
+                results.append(TicketPurchaseStatus.FULL.value)
+        return results
+
+    def has_ticket(self, flight_id: int, passenger_id: int) -> bool:
+        """
+        Check if passenger has a ticket to the flight. Raises IndexError if flight is not found.
+        :param flight_id: Flight ID
+        :param passenger_id: Passenger ID
+        :return: passenger is on the flight manifest
+        """
+        return passenger_id in self.flights[flight_id].passengers
 
-        self.flights[flight_id].passengers.append(passenger_id)
+    def count_passengers(self, flight_id: int) -> int:
+        """
+        Count passengers with a ticket to the flight. Raises IndexError if flight is not found.
+        :param flight_id: Flight ID
+        :return: number of booked passengers
+        """
+        return len(self.flights[flight_id].passengers)
+
+    def get_itinerary(self, passenger_id: int) -> list[int]:
+        """
+        List flights a passenger has tickets to, from the passenger -> flights index, O(tickets of the passenger)
+        :param passenger_id: Passenger ID
+        :return: Flight IDs in ascending order (empty if the passenger has no tickets)
+        """
+        with self._itinerary_lock:
+            return list(self.itineraries.get(passenger_id, ()))
 
     def is_delayed(self, flight_id: int) -> bool:
         """
@@ -61,3 +218,43 @@ class FlightService:
         """
         return self.flights[flight_id].status == FlightStatus.DELAYED.value
 
+    def search_flights(
+            self,
+            departure_location: str,
+            arrival_location: str,
+            after: int = -1,
+            limit: int = 100,
+    ) -> list[tuple[int, int]]:
+        """
+        Find bookable flights (with free seats) on a route using the route index.
+        The cost depends on the page size, not on the number of flights in the system.
+        :param departure_location:
+        :param arrival_location:
+        :param after: only flights with a greater ID are listed (ID of the last flight on the previous page)
+        :param limit: max number of flights
+        :return: (flight ID, seats remaining) in ascending flight ID order
+        """
+        with self._route_lock:
+            flight_ids = self.route_index.get((departure_location, arrival_location), [])
+            start = bisect_right(flight_ids, after)
+            flight_ids = flight_ids[start:start + limit]
+        return [(flight_id, self._seats_remaining(flight_id)) for flight_id in flight_ids]
+
+    def _seats_remaining(self, flight_id: int) -> int:
+        flight = self.flights[flight_id]
+        return flight.max_capacity - len(flight.passengers)
+
+    def are_delayed(self, flight_ids: Iterable[int]) -> list[bool | None]:
+        """
+        Check delay status of a batch of flights in one call
+        :param flight_ids: Flight IDs
+        :return: for every flight in the same order: flight is delayed, None if flight is not found
+        """
+        results = []
+        for flight_id in flight_ids:
+            try:
+                results.append(self.is_delayed(flight_id))
+            except IndexError:
+                results.append(None)
+        return results
+
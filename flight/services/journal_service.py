@@ -0,0 +1,307 @@
+import atexit
+import os
+import struct
+import threading
+import time
+import zlib
+from array import array
+from typing import BinaryIO, Callable, Iterable
+
+from ..models import FlightStatus
+from .columnar_flight_service import STATUSES, STATUS_CODES
+from .flight_service import AlreadyBookedError, FlightService
+from .log_service import DURABILITY_POLICIES
+from .passenger_service import PassengerService
+
+# journal record: op code, payload length, payload, CRC32 of the three
+ADD_FLIGHT, CHANGE_FLIGHT_STATUS, BUY_TICKET, ADD_PASSENGER = range(1, 5)
+RECORD_HEADER = struct.Struct("<BI")
+RECORD_CRC = struct.Struct("<I")
+FLIGHT_RECORD = struct.Struct("<I")  # max capacity, followed by both locations
+STATUS_RECORD = struct.Struct("<qB")  # flight ID, index in STATUSES
+TICKET_RECORD = struct.Struct("<qq")  # flight ID, passenger ID
+
+# snapshot: header, flights (locations, FLIGHT_SNAPSHOT, passenger IDs as int64), passengers (name, surname)
+SNAPSHOT_MAGIC = b"SFCS"
+SNAPSHOT_HEADER = struct.Struct("<4sIQQQ")  # magic, format version, generation, flights, passengers
+FLIGHT_SNAPSHOT = struct.Struct("<IBI")  # max capacity, index in STATUSES, passengers
+STRING_LENGTH = struct.Struct("<H")
+
+
+def _pack_strings(*strings: str) -> bytes:
+    parts = []
+    for string in strings:
+        encoded = string.encode()
+        parts.append(STRING_LENGTH.pack(len(encoded)))
+        parts.append(encoded)
+    return b"".join(parts)
+
+
+def _unpack_strings(data: bytes | memoryview, offset: int, count: int) -> tuple[list[str], int]:
+    strings = []
+    for _ in range(count):
+        length, = STRING_LENGTH.unpack_from(data, offset)
+        offset += STRING_LENGTH.size
+        strings.append(bytes(data[offset:offset + length]).decode())
+        offset += length
+    return strings, offset
+
+
+class JournalService:
+    """
+    Append-only journal of flight and passenger mutations with periodic snapshots.
+
+    Every successful add_flight, change_flight_status, buy_ticket and add_passenger is appended to
+    journal.<generation>.bin as a compact binary record. Every snapshot_records records the whole state is written
+    to snapshot.bin (atomically) and a new, empty journal generation is started, so recovery loads the snapshot
+    and replays only the journal tail written after it. A torn record at the end of the journal (a crash during
+    a write) is cut off on recovery.
+    """
+
+    def __init__(
+            self,
+            directory: str,
+            snapshot_records: int = 100_000,
+            durability: str = "flush",
+    ):
+        """
+        :param directory: where the journal and the snapshot are kept
+        :param snapshot_records: take a snapshot after this many journal records (0 - only when snapshot() is called)
+        :param durability: what a record write guarantees: "none", "flush" (handed to the OS) or "fsync" (on disk)
+        """
+        if durability not in DURABILITY_POLICIES:
+            raise ValueError(f"Unknown durability policy {durability!r}")
+        self.directory = str(directory)
+        self.snapshot_records = snapshot_records
+        self.durability = durability
+        self.snapshot_file = os.path.join(self.directory, "snapshot.bin")
+        self.generation = 0
+        self.records = 0  # records in the current journal generation
+        self.recovery_stats: dict = {}
+        self.flight_service: FlightService | None = None
+        self.passenger_service: PassengerService | None = None
+        self._handle: BinaryIO | None = None
+        self._lock = threading.RLock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    def journal_file(self, generation: int) -> str:
+        return os.path.join(self.directory, f"journal.{generation:06d}.bin")
+
+    def recover(
+            self,
+            flight_service: FlightService,
+            passenger_service: PassengerService,
+    ) -> tuple["JournaledFlightService", "JournaledPassengerService"]:
+        """
+        Load the snapshot and replay the journal tail into empty services, then start journaling their mutations
+        :param flight_service: empty flight service to restore flights into
+        :param passenger_service: empty passenger service to restore passengers into
+        :return: flight and passenger services that journal every mutation (use them instead of the arguments)
+        """
+        started = time.perf_counter()
+        snapshot_flights, snapshot_passengers = self._load_snapshot(flight_service, passenger_service)
+        snapshot_seconds = time.perf_counter() - started
+        self.records = self._replay(self.journal_file(self.generation), flight_service, passenger_service)
+        self.recovery_stats = {
+            "generation": self.generation,
+            "snapshot_flights": snapshot_flights,
+            "snapshot_passengers": snapshot_passengers,
+            "snapshot_seconds": snapshot_seconds,
+            "replayed_records": self.records,
+            "seconds": time.perf_counter() - started,
+        }
+        self._remove_old_journals()
+
+        self.flight_service = flight_service
+        self.passenger_service = passenger_service
+        self._handle = open(self.journal_file(self.generation), "ab")
+        atexit.register(self.close)
+        return JournaledFlightService(flight_service, self), JournaledPassengerService(passenger_service, self)
+
+    def _load_snapshot(self, flight_service: FlightService, passenger_service: PassengerService) -> tuple[int, int]:
+        try:
+            with open(self.snapshot_file, "rb") as snapshot:
+                data = memoryview(snapshot.read())
+        except FileNotFoundError:
+            return 0, 0
+        magic, version, self.generation, flights, passengers = SNAPSHOT_HEADER.unpack_from(data)
+        if magic != SNAPSHOT_MAGIC or version != 1:
+            raise ValueError(f"{self.snapshot_file} is not a journal snapshot")
+        offset = SNAPSHOT_HEADER.size
+        for _ in range(flights):
+            (departure, arrival), offset = _unpack_strings(data, offset, 2)
+            max_capacity, status_code, booked = FLIGHT_SNAPSHOT.unpack_from(data, offset)
+            offset += FLIGHT_SNAPSHOT.size
+            flight_id = flight_service.add_flight(departure, arrival, max_capacity)
+            if STATUSES[status_code] != FlightStatus.AVAILABLE_FOR_REGISTRATION.value:
+                flight_service.change_flight_status(flight_id, STATUSES[status_code])
+            passenger_ids = array("q")
+            passenger_ids.frombytes(data[offset:offset + booked * passenger_ids.itemsize])
+            offset += booked * passenger_ids.itemsize
+            for passenger_id in passenger_ids:
+                flight_service.buy_ticket(flight_id, passenger_id)
+        for _ in range(passengers):
+            (name, surname), offset = _unpack_strings(data, offset, 2)
+            passenger_service.add_passenger(name, surname)
+        return flights, passengers
+
+    def _replay(self, path: str, flight_service: FlightService, passenger_service: PassengerService) -> int:
+        try:
+            with open(path, "rb") as journal:
+                data = memoryview(journal.read())
+        except FileNotFoundError:
+            return 0
+        add_flight, change_flight_status = flight_service.add_flight, flight_service.change_flight_status
+        buy_ticket, add_passenger = flight_service.buy_ticket, passenger_service.add_passenger
+        offset = records = 0
+        while offset + RECORD_HEADER.size <= len(data):
+            op, length = RECORD_HEADER.unpack_from(data, offset)
+            end = offset + RECORD_HEADER.size + length
+            if end + RECORD_CRC.size > len(data):
+                break
+            if RECORD_CRC.unpack_from(data, end)[0] != zlib.crc32(data[offset:end]):
+                break
+            payload = offset + RECORD_HEADER.size
+            if op == BUY_TICKET:
+                try:
+                    buy_ticket(*TICKET_RECORD.unpack_from(data, payload))
+                except AlreadyBookedError:
+                    pass  # bought while the snapshot was taken, it is in the snapshot already
+            elif op == ADD_PASSENGER:
+                add_passenger(*_unpack_strings(data, payload, 2)[0])
+            elif op == ADD_FLIGHT:
+                max_capacity, = FLIGHT_RECORD.unpack_from(data, payload)
+                add_flight(*_unpack_strings(data, payload + FLIGHT_RECORD.size, 2)[0], max_capacity)
+            elif op == CHANGE_FLIGHT_STATUS:
+                flight_id, status_code = STATUS_RECORD.unpack_from(data, payload)
+                change_flight_status(flight_id, STATUSES[status_code])
+            offset = end + RECORD_CRC.size
+            records += 1
+        if offset < len(data):
+            os.truncate(path, offset)  # torn or corrupt tail, appends continue after the last good record
+        return records
+
+    def _remove_old_journals(self) -> None:
+        for file_name in os.listdir(self.directory):
+            if file_name.startswith("journal.") and file_name != os.path.basename(self.journal_file(self.generation)):
+                os.remove(os.path.join(self.directory, file_name))
+
+    def record(self, op: int, payload: bytes) -> None:
+        """
+        Append a mutation to the journal (and take a snapshot if it is due)
+        :param op: record type (ADD_FLIGHT, CHANGE_FLIGHT_STATUS, BUY_TICKET or ADD_PASSENGER)
+        :param payload: record payload
+        """
+        record = RECORD_HEADER.pack(op, len(payload)) + payload
+        with self._lock:
+            self._handle.write(record + RECORD_CRC.pack(zlib.crc32(record)))
+            if self.durability != "none":
+                self._handle.flush()
+            if self.durability == "fsync":
+                os.fsync(self._handle.fileno())
+            self.records += 1
+            if self.snapshot_records and self.records >= self.snapshot_records:
+                self.snapshot()
+
+    def snapshot(self) -> None:
+        """
+        Write the current state to the snapshot file and start a new journal generation
+        """
+        with self._lock:
+            generation = self.generation + 1
+            flights = self.flight_service.flights
+            passengers = [passenger for _, passenger in self.passenger_service.iter_passengers()]
+            tmp_file = self.snapshot_file + ".tmp"
+            with open(tmp_file, "wb") as snapshot:
+                snapshot.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, 1, generation, len(flights), len(passengers)))
+                for flight in flights:
+                    passenger_ids = array("q", flight.passengers)
+                    snapshot.write(_pack_strings(flight.departure_location, flight.arrival_location))
+                    snapshot.write(FLIGHT_SNAPSHOT.pack(
+                        flight.max_capacity, STATUS_CODES[flight.status], len(passenger_ids),
+                    ))
+                    snapshot.write(passenger_ids.tobytes())
+                snapshot.write(b"".join(_pack_strings(passenger.name, passenger.surname) for passenger in passengers))
+                snapshot.flush()
+                os.fsync(snapshot.fileno())
+            os.replace(tmp_file, self.snapshot_file)
+
+            self._handle.close()
+            self._handle = open(self.journal_file(generation), "ab")
+            os.remove(self.journal_file(self.generation))
+            self.generation = generation
+            self.records = 0
+
+    def close(self) -> None:
+        """
+        Flush and close the journal
+        """
+        with self._lock:
+            if self._handle is not None:
+                self._handle.close()
+                self._handle = None
+        atexit.unregister(self.close)
+
+
+class JournaledFlightService:
+    """
+    Flight service wrapper journaling every successful mutation (see JournalService.recover).
+    Everything else is delegated to the wrapped service.
+    """
+
+    def __init__(self, service: FlightService, journal: JournalService):
+        self.service = service
+        self.journal = journal
+
+    def __getattr__(self, name: str):
+        return getattr(self.service, name)
+
+    def add_flight(self, departure_location: str, arrival_location: str, max_capacity: int) -> int:
+        # the record is packed first: a flight the journal cannot hold would shift every later flight ID on replay
+        try:
+            payload = FLIGHT_RECORD.pack(max_capacity) + _pack_strings(departure_location, arrival_location)
+        except struct.error as error:
+            raise ValueError(f"Flight cannot be journaled: {error}") from None
+        with self.journal._lock:  # journal order must match ID order
+            flight_id = self.service.add_flight(departure_location, arrival_location, max_capacity)
+            self.journal.record(ADD_FLIGHT, payload)
+        return flight_id
+
+    def change_flight_status(self, flight_id: int, status: str) -> bool:
+        with self.journal._lock:  # journal order must match the order of status changes
+            changed = self.service.change_flight_status(flight_id, status)
+            if changed:
+                self.journal.record(CHANGE_FLIGHT_STATUS, STATUS_RECORD.pack(flight_id, STATUS_CODES[status]))
+        return changed
+
+    def buy_ticket(self, flight_id: int, passenger_id: int) -> None:
+        # purchases of different flights do not depend on each other, only the record is written under the lock
+        self.service.buy_ticket(flight_id, passenger_id)
+        self.journal.record(BUY_TICKET, TICKET_RECORD.pack(flight_id, passenger_id))
+
+    def buy_tickets(
+            self,
+            tickets: Iterable[tuple[int, int]],
+            passenger_exists: Callable[[int], bool] | None = None,
+    ) -> list[str]:
+        return FlightService.buy_tickets(self, tickets, passenger_exists)
+
+
+class JournaledPassengerService:
+    """
+    Passenger service wrapper journaling every registration (see JournalService.recover).
+    Everything else is delegated to the wrapped service.
+    """
+
+    def __init__(self, service: PassengerService, journal: JournalService):
+        self.service = service
+        self.journal = journal
+
+    def __getattr__(self, name: str):
+        return getattr(self.service, name)
+
+    def add_passenger(self, name: str, surname: str) -> int:
+        with self.journal._lock:  # journal order must match ID order
+            passenger_id = self.service.add_passenger(name, surname)
+            self.journal.record(ADD_PASSENGER, _pack_strings(name, surname))
+        return passenger_id
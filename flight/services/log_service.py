@@ -1,34 +1,454 @@
+import atexit
+import json
+import logging
 import os
+import queue
+import secrets
+import threading
+import time
+from collections import deque
+from typing import Iterable
 
 from django.conf import settings
 from ..models import Passenger
 
+LOG_MODES = ("direct", "buffered", "async")
+DURABILITY_POLICIES = ("none", "flush", "fsync")
+BACKPRESSURE_POLICIES = ("block", "drop", "spill")
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()  # async mode: tells the writer thread to exit
+
+Row = tuple[int | None, str]  # (Passenger ID or None for "next row number", CSV line)
+
 
 class LogService:
-    def __init__(self, log_file_name: str = "passengers.csv", output_log_path: str = settings.STATIC_URL + "log/"):
+    def __init__(
+            self,
+            log_file_name: str = "passengers.csv",
+            output_log_path: str = settings.STATIC_URL + "log/",
+            mode: str = "direct",
+            buffer_rows: int = 1000,
+            flush_interval: float = 1.0,
+            durability: str = "flush",
+            queue_size: int = 10000,
+            backpressure: str = "block",
+            rotate_bytes: int = 0,
+            rotate_rows: int = 0,
+    ):
+        """
+        :param log_file_name: log file name
+        :param output_log_path: directory of the log file
+        :param mode: "direct" opens and closes the file for every write,
+                     "buffered" keeps the file open and writes rows in batches,
+                     "async" queues rows for a background writer thread
+        :param buffer_rows: buffered mode: flush once this many rows are waiting,
+                            async mode: maximum number of queued writes handled in one batch
+        :param flush_interval: buffered mode: flush rows that have been waiting this many seconds
+        :param durability: what a batch write guarantees: "none" (rows handed to the file object),
+                           "flush" (rows handed to the OS) or "fsync" (rows on disk)
+        :param queue_size: async mode: maximum number of queued writes
+        :param backpressure: async mode: what a write does when the queue is full:
+                             "block" waits for space, "drop" discards the rows,
+                             "spill" parks the rows in an unbounded overflow buffer the writer thread
+                             moves back to the queue, in order, as it frees space
+        :param rotate_bytes: move the log file to a numbered segment once it reaches this size (0 - never)
+        :param rotate_rows: move the log file to a numbered segment once it has this many rows (0 - never)
+            Segments and their manifest are named after this instance, so another process building a LogService
+            (a management command, another worker) never touches them; they are removed at interpreter exit.
+        """
+        if mode not in LOG_MODES:
+            raise ValueError(f"Unknown log mode {mode!r}")
+        if durability not in DURABILITY_POLICIES:
+            raise ValueError(f"Unknown durability policy {durability!r}")
+        if backpressure not in BACKPRESSURE_POLICIES:
+            raise ValueError(f"Unknown backpressure policy {backpressure!r}")
         self.log_file_name = log_file_name
         self.output_log_path = output_log_path[1:] + (
             "/" if output_log_path[-1] != "/" else ""  # cut out first '/' to get relative path and set last '/'
         )
         self.log_file = self.output_log_path + self.log_file_name
+        self.mode = mode
+        self.buffer_rows = buffer_rows
+        self.flush_interval = flush_interval
+        self.durability = durability
+        self.backpressure = backpressure
+        self.rotate_bytes = rotate_bytes
+        self.rotate_rows = rotate_rows
+        self.run = secrets.token_hex(4)
+        self.manifest_file = f"{os.path.splitext(self.log_file)[0]}.{self.run}.manifest.json"
+        self.segments: list[dict] = []  # closed segments, oldest first
+
+        self._lock = threading.Lock()  # guards the pending rows, the file handle and the segments
+        self._stats_lock = threading.Lock()
+        self._start_segment()
+        self._pending: list[Row] = []
+        self._flush_timer: threading.Timer | None = None
+        self._handle = None
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._spill: deque = deque()  # queue items waiting for space, newer than everything in the queue
+        self._spill_lock = threading.Lock()
+        self._writer: threading.Thread | None = None
+        self.written_rows = 0
+        self.dropped_rows = 0
+        self.spilled_rows = 0
+        self.write_errors = 0  # async batches the writer thread failed to write
+        self.last_write_lag = 0.0  # seconds between enqueueing and writing the last async batch
+        if self.mode != "direct":
+            self._handle = open(self.log_file, "a")
+            atexit.register(self.close)
+        if self.mode == "async":
+            self._writer = threading.Thread(target=self._run_writer, name="passenger-log-writer", daemon=True)
+            self._writer.start()
 
+    def _segment_path(self, number: int) -> str:
+        stem, extension = os.path.splitext(self.log_file)
+        return f"{stem}.{self.run}.{number:06d}{extension}"
+
+    def _remove_segments(self) -> None:
+        # the log lives for one run, like the truncated active file: drop the segments this instance wrote
+        self.close()
+        with self._lock:
+            for segment in self.segments:
+                try:
+                    os.remove(segment["file"])
+                except OSError:
+                    pass
+            try:
+                os.remove(self.manifest_file)
+            except OSError:
+                pass
+            self.segments = []
+
+    def _start_segment(self) -> None:
+        # (re)create the active log file with a header, must be called with self._lock held or from __init__
         with open(self.log_file, "w") as log_file:
             a = Passenger("", "")
-            log_file.write(";".join(a.__dict__.keys()) + "\n")
+            header = ";".join(a.__dict__.keys()) + "\n"
+            log_file.write(header)
+        self._segment_rows = 0
+        self._segment_bytes = len(header.encode())
+        self._segment_first_id: int | None = None
+        self._segment_last_id: int | None = None
+        self._segment_ranges: list[list[int]] = []  # [first, last] Passenger ID runs in log order
+
+    def _write_rows(self, rows: list[Row]) -> None:
+        if self.mode == "direct":
+            with self._lock:
+                self._append(rows)
+            return
+
+        if self.mode == "async":
+            self._enqueue_rows(rows)
+            return
+
+        with self._lock:
+            self._pending.extend(rows)
+            if len(self._pending) >= self.buffer_rows:
+                self._flush_pending()
+            elif self._flush_timer is None and self.flush_interval > 0:
+                self._flush_timer = threading.Timer(self.flush_interval, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+
+    def _flush_pending(self) -> None:
+        # must be called with self._lock held
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        if not self._pending:
+            return
+        self._append(self._pending)
+        self._pending = []
 
-    def write_entry(self, name: str, surname: str) -> None:
+    def _append(self, rows: list[Row]) -> None:
+        # write rows to the active log file and rotate it if needed, must be called with self._lock held
+        lines = []
+        first_id, last_id = self._segment_first_id, self._segment_last_id
+        ranges = [self._segment_ranges[-1][:]] if self._segment_ranges else []  # runs touched by this write
+        for passenger_id, line in rows:
+            if passenger_id is None:
+                passenger_id = self.written_rows + len(lines)
+            first_id = passenger_id if first_id is None else min(first_id, passenger_id)
+            last_id = passenger_id if last_id is None else max(last_id, passenger_id)
+            if ranges and ranges[-1][1] + 1 == passenger_id:
+                ranges[-1][1] = passenger_id
+            else:
+                ranges.append([passenger_id, passenger_id])
+            lines.append(line)
+
+        handle = self._handle if self._handle is not None else open(self.log_file, "a")
+        try:
+            handle.writelines(lines)
+            if self.durability != "none":
+                handle.flush()
+            if self.durability == "fsync":
+                os.fsync(handle.fileno())
+        finally:
+            if handle is not self._handle:
+                handle.close()
+
+        self.written_rows += len(lines)
+        self._segment_rows += len(lines)
+        if self.rotate_bytes:
+            self._segment_bytes += sum(len(line.encode()) for line in lines)
+        self._segment_first_id, self._segment_last_id = first_id, last_id
+        self._segment_ranges[-1:] = ranges
+        if (
+            (self.rotate_rows and self._segment_rows >= self.rotate_rows)
+            or (self.rotate_bytes and self._segment_bytes >= self.rotate_bytes)
+        ):
+            self._rotate()
+
+    def _rotate(self) -> None:
+        # must be called with self._lock held
+        if not self._segment_rows:
+            return
+        if self._handle is not None:
+            self._handle.close()
+        if not self.segments:
+            atexit.register(self._remove_segments)
+        segment_file = self._segment_path(len(self.segments) + 1)
+        os.replace(self.log_file, segment_file)
+        self.segments.append({
+            "segment": len(self.segments) + 1,
+            "file": segment_file,
+            "first_passenger_id": self._segment_first_id,
+            "last_passenger_id": self._segment_last_id,
+            "ranges": self._segment_ranges,
+            "rows": self._segment_rows,
+            "bytes": os.path.getsize(segment_file),
+        })
+        manifest_tmp = self.manifest_file + ".tmp"
+        with open(manifest_tmp, "w") as manifest:
+            json.dump(self.segments, manifest, indent=1)
+        os.replace(manifest_tmp, self.manifest_file)
+
+        self._start_segment()
+        if self._handle is not None:
+            self._handle = open(self.log_file, "a")
+
+    def _enqueue_rows(self, rows: list[Row]) -> None:
+        item = (time.monotonic(), rows)
+        if self.backpressure == "block":
+            self._queue.put(item)
+        elif self.backpressure == "drop":
+            try:
+                self._queue.put_nowait(item)
+            except queue.Full:
+                with self._stats_lock:
+                    self.dropped_rows += len(rows)
+                return
+        else:
+            with self._spill_lock:
+                try:
+                    if self._spill:  # rows spilled earlier must reach the queue first
+                        raise queue.Full
+                    self._queue.put_nowait(item)
+                except queue.Full:
+                    self._spill.append(item)
+                    self.spilled_rows += len(rows)
+        if self._writer is None:  # closed while this write was being queued
+            self._drain_queue()
+
+    def _unspill(self) -> None:
+        # move spilled items back to the queue in order while it has space (the writer thread just freed some)
+        with self._spill_lock:
+            while self._spill:
+                try:
+                    self._queue.put_nowait(self._spill[0])
+                except queue.Full:
+                    return
+                self._spill.popleft()
+
+    def _drain_queue(self) -> None:
+        # write rows left in the queue and the spill buffer after the writer thread stopped
+        with self._lock:
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    with self._spill_lock:
+                        if not self._spill:
+                            return
+                        item = self._spill.popleft()
+                    self._append(item[1])
+                    continue
+                if item is not _STOP:
+                    self._append(item[1])
+                self._queue.task_done()
+
+    def _run_writer(self) -> None:
+        stop = False
+        while not stop:
+            batch = [self._queue.get()]
+            while len(batch) < self.buffer_rows:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            rows = []
+            enqueued_at = None
+            for item in batch:
+                if item is _STOP:
+                    stop = True
+                    continue
+                enqueued_at = item[0] if enqueued_at is None else enqueued_at
+                rows.extend(item[1])
+            try:
+                if rows:
+                    with self._lock:
+                        self._append(rows)
+                    self.last_write_lag = time.monotonic() - enqueued_at
+            except Exception:
+                logger.exception("Passenger log writer failed to write %d rows", len(rows))
+                with self._stats_lock:
+                    self.write_errors += 1
+            finally:
+                self._unspill()  # before task_done, so flush() cannot see an empty queue with rows still spilled
+                for _ in batch:
+                    self._queue.task_done()
+
+    def write_entry(self, name: str, surname: str, passenger_id: int | None = None) -> None:
         """
         Write a passenger to log file
         :param name: Passenger name
         :param surname: Passenger surname
+        :param passenger_id: Passenger ID recorded in the segment index (log row number if None)
+        :return:
+        """
+        self._write_rows([(passenger_id, ";".join([name, surname]) + "\n")])
+
+    def try_write_entry(self, name: str, surname: str, passenger_id: int | None = None) -> bool:
+        """
+        Queue a passenger for the async writer thread if that needs no waiting (for callers on an event loop):
+        never waits for queue space or writes the file on the calling thread
+        :param name: Passenger name
+        :param surname: Passenger surname
+        :param passenger_id: Passenger ID recorded in the segment index (log row number if None)
+        :return: True if queued, False if the log is not in async mode, the queue is full or rows are spilled
+                 (call write_entry from a worker thread then, it applies the backpressure policy)
+        """
+        if self.mode != "async" or self._spill:
+            return False
+        try:
+            self._queue.put_nowait((time.monotonic(), [(passenger_id, ";".join([name, surname]) + "\n")]))
+        except queue.Full:
+            return False
+        if self._writer is None:  # closed while this write was being queued
+            self._drain_queue()
+        return True
+
+    def write_entries(self, entries: Iterable[tuple[str, str]], passenger_ids: Iterable[int] | None = None) -> None:
+        """
+        Write several passengers to log file at once
+        :param entries: (name, surname) pairs
+        :param passenger_ids: Passenger IDs of the entries (log row numbers if None)
         :return:
         """
-        with open(self.log_file, "a") as log_file:
-            log_file.write(";".join([name, surname]) + "\n")
+        lines = [";".join([name, surname]) + "\n" for name, surname in entries]
+        self._write_rows(list(zip(passenger_ids or [None] * len(lines), lines)))
+
+    def flush(self) -> None:
+        """
+        Write all buffered or queued rows to the log file and hand them to the OS
+        :return:
+        """
+        if self.mode == "async":
+            self._queue.join()
+        with self._lock:
+            self._flush_pending()
+            if self._handle is not None:
+                self._handle.flush()
+
+    def close(self) -> None:
+        """
+        Flush buffered or queued rows and close the log file, later writes fall back to direct mode.
+        Called on interpreter shutdown in buffered and async modes.
+        :return:
+        """
+        with self._lock:
+            mode, self.mode = self.mode, "direct"  # writes from now on go straight to the file
+        if self._writer is not None:
+            self._queue.put(_STOP)
+            self._writer.join()
+            self._writer = None
+            self._drain_queue()  # rows queued by writes that saw the async mode just before the switch
+        with self._lock:
+            self._flush_pending()
+            if self._handle is not None:
+                self._handle.close()
+                self._handle = None
+
+    def stats(self) -> dict:
+        """
+        Get writer counters for monitoring
+        :return: dict with mode, queue depth (buffered, queued or spilled writes), lag of the oldest queued write
+                 and the last written batch in seconds, written/dropped/spilled row counts,
+                 failed async batch writes, number of segments
+        """
+        lag = 0.0
+        if self.mode == "async":
+            queue_depth = self._queue.qsize() + len(self._spill)
+            with self._queue.mutex:
+                if self._queue.queue and self._queue.queue[0] is not _STOP:
+                    lag = time.monotonic() - self._queue.queue[0][0]
+        else:
+            queue_depth = len(self._pending)
+        return {
+            "mode": self.mode,
+            "queue_depth": queue_depth,
+            "lag_seconds": lag,
+            "last_write_lag_seconds": self.last_write_lag,
+            "written_rows": self.written_rows,
+            "dropped_rows": self.dropped_rows,
+            "spilled_rows": self.spilled_rows,
+            "write_errors": self.write_errors,
+            "segments": len(self.segments) + 1,
+        }
 
     def get_log_file_path(self) -> str:
         """
-        Get the log file path
+        Get the log file path. Buffered rows are flushed first so the file is complete.
         :return:
         """
+        self.flush()
         return self.log_file
+
+    def rotate(self) -> None:
+        """
+        Move the active log file to a new segment now (if it has any rows)
+        :return:
+        """
+        self.flush()
+        with self._lock:
+            self._rotate()
+
+    def get_segments(self, after: int = -1, until: int | None = None) -> list[dict]:
+        """
+        Get the segment index, the active log file is the last segment
+        :param after: only segments holding a Passenger ID greater than this
+        :param until: only segments holding a Passenger ID up to this (all if None)
+        :return: segments with file, first/last Passenger ID, the [first, last] Passenger ID runs in log order,
+                 row count and size in bytes, oldest first
+        """
+        self.flush()
+        with self._lock:
+            active = {
+                "segment": len(self.segments) + 1,
+                "file": self.log_file,
+                "first_passenger_id": self._segment_first_id,
+                "last_passenger_id": self._segment_last_id,
+                "ranges": [run[:] for run in self._segment_ranges],
+                "rows": self._segment_rows,
+                "bytes": os.path.getsize(self.log_file),
+            }
+            segments = [*self.segments, active]
+        if after < 0 and until is None:
+            return segments
+        return [
+            segment for segment in segments
+            if any(last > after and (until is None or first <= until) for first, last in segment["ranges"])
+        ]
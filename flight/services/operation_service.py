@@ -1,27 +1,107 @@
+import threading
+import time
+from collections import OrderedDict, deque
+from functools import partial
 from uuid import UUID, uuid4
-from typing import Callable
+from typing import Callable, Hashable
 from datetime import datetime
 from ..models import Operation
-from ..scheduler import scheduler, DateTrigger
+from ..scheduler import ExecutorPool, scheduler, DateTrigger
+
+DEFAULT_POOLS = {"default": {"kind": "thread", "max_workers": 4}}
+WAIT_POLL_SECONDS = 1.0  # wait_operation re-checks this often (operations finished by other processes)
+FORGOTTEN_IDS = 10_000  # expired/evicted operation IDs remembered to tell "expired" from "never existed"
 
 
 class OperationService:
 
-    def __init__(self):
-        self.operations: dict[UUID, Operation] = {}
+    def __init__(
+            self,
+            ttl: float = 600.0,
+            max_operations: int = 10_000,
+            pools: dict[str, dict] | None = None,
+            reuse_seconds: float = 0.0,
+    ):
+        """
+        :param ttl: seconds a finished operation is kept (0 - until evicted)
+        :param max_operations: operations kept at most (0 - unlimited), when exceeded the least recently used
+                               finished operation is evicted (the least recently used pending one if all are pending)
+        :param pools: executor pools by name, each configured with ExecutorPool arguments (KIND, MAX_WORKERS),
+                      must include "default"
+        :param reuse_seconds: an identical coalesced operation started within this many seconds after another one
+                              finished gets the finished operation instead of running again (0 - never reuse)
+        """
+        pools = DEFAULT_POOLS if pools is None else pools
+        if "default" not in pools:
+            raise ValueError('Executor pools must include "default"')
+        self.pools: dict[str, ExecutorPool] = {
+            name: ExecutorPool(name, **{key.lower(): value for key, value in options.items()})
+            for name, options in pools.items()
+        }
+        self.operations: OrderedDict[UUID, Operation] = OrderedDict()  # least recently used first
+        self.ttl = ttl
+        self.max_operations = max_operations
+        self.expired_operations = 0
+        self.evicted_operations = 0
+        self._finished: deque[tuple[float, UUID]] = deque()  # the TTL is fixed, so finish order is expiry order
+        self._forgotten: OrderedDict[UUID, None] = OrderedDict()
+        self.reuse_seconds = reuse_seconds
+        self.coalesced_operations = 0
+        self.reused_results = 0
+        self._inflight: dict[Hashable, UUID] = {}  # coalescing key -> pending operation
+        self._recent: OrderedDict[Hashable, tuple[float, UUID]] = OrderedDict()  # key -> (finished, operation)
+        self._operation_keys: dict[UUID, Hashable] = {}
+        self._lock = threading.RLock()
+        self._finished_condition = threading.Condition(self._lock)
 
     def execute_operation(
         self,
         func: Callable,
         run_date: datetime | str = None,
         args: list | tuple = (),
+        pool: str = "default",
+        priority: int = 0,
+        coalesce: bool = True,
     ) -> UUID:
-        op_id = uuid4()
-        self.operations[op_id] = Operation(op_id)
+        """
+        Run func(*args) at run_date (now if None) in an executor pool
+        :param func: operation function, its return value becomes the operation result
+                     ({"error": "<exception type>: <message>"} if it raises)
+        :param run_date: when to run the operation
+        :param args: func arguments
+        :param pool: executor pool name
+        :param priority: operations with higher priority leave the pool queue first
+        :param coalesce: if the same func with the same args and run_date is already pending, return that operation
+                         instead of running func again (also reuse a recent result, see reuse_seconds)
+        :return: Operation ID
+        """
+        self.check_operation(func, args, pool)
+        executor_pool = self.pools[pool]
+        key = (func, tuple(args), run_date) if coalesce else None
+        if key is not None:
+            try:
+                hash(key)
+            except TypeError:  # unhashable arguments, cannot tell duplicates apart
+                key = None
+        with self._lock:
+            if key is not None:
+                op_id = self._coalesced_operation(key)
+                if op_id is not None:
+                    return op_id
+            op_id = uuid4()
+            self._register_operation(Operation(op_id))
+            if key is not None:
+                self._inflight[key] = op_id
+                self._operation_keys[op_id] = key
 
         def __exec_func() -> None:
-            res = func(*args)
-            self.finish_operation(op_id, res)
+            executor_pool.submit(
+                func,
+                args,
+                priority,
+                callback=partial(self._complete_operation, op_id),
+                on_error=partial(self._fail_operation, op_id),
+            )
 
         scheduler.add_job(
             __exec_func,
@@ -29,13 +109,162 @@ class OperationService:
         )
         return op_id
 
+    def check_operation(self, func: Callable, args: list | tuple = (), pool: str = "default") -> None:
+        """
+        Make sure func(*args) can run in an executor pool. Raises ValueError if the pool is unknown
+        or is a process pool that cannot pickle the job.
+        :param func: operation function
+        :param args: func arguments
+        :param pool: executor pool name
+        """
+        try:
+            executor_pool = self.pools[pool]
+        except KeyError:
+            raise ValueError(f"Unknown executor pool {pool!r}") from None
+        executor_pool.check_job(func, args)
+
+    def _coalesced_operation(self, key: Hashable) -> UUID | None:
+        op_id = self._inflight.get(key)
+        if op_id is not None:
+            if self.get_operation(op_id) is not None:
+                self.coalesced_operations += 1
+                return op_id
+            del self._inflight[key]  # evicted while pending
+        recent = self._recent.get(key)
+        if recent is not None:
+            finished_at, op_id = recent
+            if time.monotonic() - finished_at <= self.reuse_seconds and self.get_operation(op_id) is not None:
+                self.reused_results += 1
+                return op_id
+            del self._recent[key]
+        return None
+
+    def _complete_operation(self, op_id: UUID, result) -> None:
+        self.finish_operation(op_id, result)
+        self._release_operation(op_id, finished=True)
+
+    def _fail_operation(self, op_id: UUID, error: BaseException) -> None:
+        # a failed operation is done too: pollers stop waiting and the TTL drops it like a finished one
+        self.finish_operation(op_id, {"error": f"{type(error).__name__}: {error}"})
+        self._release_operation(op_id, finished=False)
+
+    def _release_operation(self, op_id: UUID, finished: bool) -> None:
+        with self._lock:
+            key = self._operation_keys.pop(op_id, None)
+            if key is None:
+                return
+            if self._inflight.get(key) == op_id:
+                del self._inflight[key]
+            if finished and self.reuse_seconds:
+                now = time.monotonic()
+                self._recent[key] = (now, op_id)
+                self._recent.move_to_end(key)
+                while now - next(iter(self._recent.values()))[0] > self.reuse_seconds:
+                    self._recent.popitem(last=False)
+
+    def _register_operation(self, op: Operation) -> None:
+        with self._lock:
+            self.expire_operations()
+            self.operations[op.id] = op
+            self._evict_operations()
+
+    def _forget(self, op_id: UUID) -> None:
+        self._forgotten[op_id] = None
+        if len(self._forgotten) > FORGOTTEN_IDS:
+            self._forgotten.popitem(last=False)
+
+    def _evict_operations(self) -> None:
+        while self.max_operations and len(self.operations) > self.max_operations:
+            victim = next((op_id for op_id, op in self.operations.items() if op.done), None)
+            if victim is None:
+                victim = next(iter(self.operations))
+            del self.operations[victim]
+            self._forget(victim)
+            self.evicted_operations += 1
+
+    def expire_operations(self) -> int:
+        """
+        Drop operations finished more than ttl seconds ago
+        :return: number of expired operations
+        """
+        if not self.ttl:
+            return 0
+        deadline = time.monotonic() - self.ttl
+        expired = 0
+        with self._lock:
+            while self._finished and self._finished[0][0] < deadline:
+                _, op_id = self._finished.popleft()
+                if self.operations.pop(op_id, None) is not None:
+                    self._forget(op_id)
+                    expired += 1
+            self.expired_operations += expired
+        return expired
+
     def finish_operation(self, op_id: UUID, result) -> bool:
-        op: Operation = self.operations.get(op_id)
-        if op is None:
-            return False
-        op.result = result
-        op.done = True
+        with self._lock:
+            op: Operation = self.operations.get(op_id)
+            if op is None:
+                return False
+            op.result = result
+            op.done = True
+            self._finished.append((time.monotonic(), op_id))
+            self._finished_condition.notify_all()
         return True
 
     def get_operation(self, op_id: UUID) -> Operation | None:
-        return self.operations.get(op_id)
+        with self._lock:
+            self.expire_operations()
+            op = self.operations.get(op_id)
+            if op is not None:
+                self.operations.move_to_end(op_id)
+            return op
+
+    def wait_operation(self, op_id: UUID, timeout: float) -> Operation | None:
+        """
+        Wait until an operation is done, waking up as soon as finish_operation runs
+        :param op_id: Operation ID
+        :param timeout: max seconds to wait
+        :return: Operation object (not done if the timeout ran out) or None if not found
+        """
+        deadline = time.monotonic() + timeout
+        with self._finished_condition:
+            while True:
+                op = self.get_operation(op_id)
+                remaining = deadline - time.monotonic()
+                if op is None or op.done or remaining <= 0:
+                    return op
+                self._finished_condition.wait(min(remaining, WAIT_POLL_SECONDS))
+
+    def is_expired(self, op_id: UUID) -> bool:
+        """
+        Check if an operation existed but was dropped (expired or evicted)
+        :param op_id: Operation ID
+        :return: operation was dropped recently
+        """
+        with self._lock:
+            self.expire_operations()
+            return op_id in self._forgotten
+
+    def _count_operations(self) -> tuple[int, int]:
+        return len(self.operations), sum(not op.done for op in self.operations.values())
+
+    def stats(self) -> dict:
+        """
+        Registry statistics
+        :return: stored and pending operations, limits, expired/evicted/coalesced operation and reused result counts,
+                 pool statistics
+        """
+        with self._lock:
+            self.expire_operations()
+            operations, pending = self._count_operations()
+            return {
+                "operations": operations,
+                "pending": pending,
+                "ttl": self.ttl,
+                "max_operations": self.max_operations,
+                "expired_operations": self.expired_operations,
+                "evicted_operations": self.evicted_operations,
+                "coalesced_operations": self.coalesced_operations,
+                "reused_results": self.reused_results,
+                "pools": {name: executor_pool.stats() for name, executor_pool in self.pools.items()},
+            }
@@ -1,9 +1,69 @@
+import heapq
+import threading
+import time
+from bisect import bisect_left, insort
+from itertools import islice
+from typing import Iterator
+
 from ..models import Passenger
 
+MERGE_RECENT_KEYS = 1024  # new keys are merged into the main sorted list once there are this many (at least)
+
+
+class PrefixIndex:
+    """
+    Case-insensitive prefix index of IDs by a string key. Distinct keys are kept sorted so a prefix is found by bisection,
+    each key holds its IDs in insertion order. New keys go to a small sorted list first and are merged into the main
+    one in bulk, so registering a million distinct names never shifts the main list on every insert.
+    """
+
+    def __init__(self):
+        self.ids: dict[str, list[int]] = {}
+        self._keys: list[str] = []
+        self._recent: list[str] = []
+
+    def add(self, key: str, item_id: int) -> None:
+        """
+        Index an ID under a key
+        :param key: indexed string
+        :param item_id: ID
+        """
+        key = key.casefold()
+        ids = self.ids.get(key)
+        if ids is None:
+            ids = self.ids[key] = []
+            insort(self._recent, key)
+            if len(self._recent) >= max(MERGE_RECENT_KEYS, len(self._keys) // 64):
+                self._keys += self._recent
+                self._keys.sort()  # two sorted runs, merged in linear time
+                self._recent = []
+        ids.append(item_id)
+
+    @staticmethod
+    def _matching_keys(keys: list[str], prefix: str) -> Iterator[str]:
+        position = bisect_left(keys, prefix)
+        while position < len(keys) and keys[position].startswith(prefix):
+            yield keys[position]
+            position += 1
+
+    def search(self, prefix: str) -> Iterator[int]:
+        """
+        Find IDs whose key starts with prefix, O(log n) to the first match
+        :param prefix: key prefix (any case)
+        :return: iterator of IDs ordered by key, then by insertion
+        """
+        prefix = prefix.casefold()
+        for key in heapq.merge(self._matching_keys(self._keys, prefix), self._matching_keys(self._recent, prefix)):
+            yield from self.ids[key]
+
 
 class PassengerService:
     def __init__(self):
         self.passengers: list[Passenger] = []
+        self._add_lock = threading.Lock()  # keeps ID assignment atomic, guards the name indexes
+        self.name_index = PrefixIndex()
+        self.surname_index = PrefixIndex()
+        self.last_modified: float = time.time()  # timestamp of the last registration
 
     def add_passenger(self, name: str, surname: str) -> int:
         """
@@ -12,8 +72,14 @@ class PassengerService:
         :param surname: Passenger surname
         :return: Created Passenger ID
         """
-        self.passengers.append(Passenger(name, surname))
-        return len(self.passengers)-1
+        passenger = Passenger(name, surname)
+        with self._add_lock:
+            self.passengers.append(passenger)
+            passenger_id = len(self.passengers)-1
+            self.name_index.add(name, passenger_id)
+            self.surname_index.add(surname, passenger_id)
+            self.last_modified = time.time()
+            return passenger_id
 
     def get_passenger(self, passenger_id: int) -> Passenger:
         """
@@ -25,3 +91,59 @@ class PassengerService:
             return self.passengers[passenger_id]
         except IndexError:
             return None
+
+    def has_passenger(self, passenger_id: int) -> bool:
+        """
+        Check if a passenger is registered
+        :param passenger_id: Passenger ID
+        :return: passenger exists
+        """
+        return 0 <= passenger_id < len(self.passengers)
+
+    def count_passengers(self) -> int:
+        """
+        Count registered passengers
+        :return: number of passengers (also the ID the next passenger will get)
+        """
+        return len(self.passengers)
+
+    def list_passengers(self, after: int = -1, limit: int = 100) -> list[tuple[int, Passenger]]:
+        """
+        List passengers in ID order, O(limit) however deep the page is
+        :param after: only passengers with a greater ID are listed (ID of the last passenger on the previous page)
+        :param limit: max number of passengers
+        :return: (Passenger ID, Passenger) pairs
+        """
+        start = max(after + 1, 0)
+        return list(enumerate(self.passengers[start:start + limit], start=start))
+
+    def search_passengers(self, name: str = "", surname: str = "", limit: int = 100) -> list[int]:
+        """
+        Find passengers by name and/or surname prefix (case-insensitive) using the name indexes
+        :param name: name prefix ("" - any name)
+        :param surname: surname prefix ("" - any surname)
+        :param limit: max number of passengers
+        :return: Passenger IDs ordered by the searched surname (or name), then by ID
+        """
+        if surname:
+            candidates, other_prefix = self.surname_index.search(surname), name.casefold()
+        else:
+            candidates, other_prefix = self.name_index.search(name), ""
+        passenger_ids = []
+        with self._add_lock:
+            for passenger_id in candidates:
+                if other_prefix and not self.passengers[passenger_id].name.casefold().startswith(other_prefix):
+                    continue
+                passenger_ids.append(passenger_id)
+                if len(passenger_ids) == limit:
+                    break
+        return passenger_ids
+
+    def iter_passengers(self, start: int = 0, stop: int | None = None) -> Iterator[tuple[int, Passenger]]:
+        """
+        Iterate over passengers in registration order
+        :param start: first Passenger ID
+        :param stop: Passenger ID to stop before (all passengers if None)
+        :return: iterator of (Passenger ID, Passenger) pairs
+        """
+        return enumerate(islice(self.passengers, start, stop), start=start)
@@ -0,0 +1,403 @@
+import os
+import tempfile
+import threading
+from bisect import bisect_right, insort
+from contextlib import contextmanager
+from multiprocessing import resource_tracker, shared_memory
+
+try:
+    import fcntl
+except ImportError:  # not a POSIX system
+    fcntl = None
+
+from ..models import Flight, FlightStatus, PassengerManifest
+from .columnar_flight_service import DELAYED_CODE, STATUSES, STATUS_CODES
+from .flight_service import AlreadyBookedError, FlightService
+
+LOCATION_BYTES = 200  # InFlightSerializer allows 50 characters, up to 4 bytes each in UTF-8
+HEADER_BYTES = 32  # flight count, seats allocated, max_flights, max_seats (uint64 each)
+STATUS_SCAN_BYTES = 64 * 1024  # flights_by_status copies the status column this many flights at a time
+ITINERARY_SCAN_FLIGHTS = 1024  # get_itinerary compares seat counters with its last copy this many flights at a time
+
+
+def _open_shared_memory(name: str, size: int) -> tuple[shared_memory.SharedMemory, bool]:
+    try:
+        memory, created = shared_memory.SharedMemory(name, create=True, size=size), True
+    except FileExistsError:
+        memory, created = shared_memory.SharedMemory(name), False
+    # the region belongs to the whole deployment, not to the process that happened to create it,
+    # so it must not be unlinked when that process exits (see SharedFlightService.unlink)
+    resource_tracker.unregister(memory._name, "shared_memory")
+    if memory.size < size:
+        memory.close()
+        raise ValueError(f"Shared memory {name!r} is smaller than configured, unlink it or change the name")
+    return memory, created
+
+
+class SharedFlightService(FlightService):
+    """
+    Flight storage engine keeping flights, seat counters and manifests in a named shared memory region,
+    so every worker process on the host sees the same inventory. The first process creates the region,
+    the others attach to it by name. Flight ID is the row index in every column, like in ColumnarFlightService.
+
+    Writers are serialized across processes with fcntl byte-range locks on a lock file (one byte per flight,
+    byte 0 for adding flights) and across threads of one process with the usual striped locks,
+    because fcntl locks are held by the process, not by the thread.
+    Every flight reserves max_capacity passenger slots in the shared seat pool when it is added.
+    Seats are append-only, so lookups each process needs fast (who is on a flight, which flights a passenger
+    is on) are kept in process memory and caught up from the shared counters instead of rescanning the columns.
+    """
+
+    def __init__(
+            self,
+            name: str = "space_flights",
+            max_flights: int = 100_000,
+            max_seats: int = 10_000_000,
+            lock_stripes: int = 64,
+    ):
+        """
+        :param name: shared memory region name, processes using the same name share flights
+        :param max_flights: flight rows in the region
+        :param max_seats: passenger slots in the region, shared by all flights
+        :param lock_stripes: see FlightService
+        """
+        if fcntl is None:
+            raise RuntimeError("Shared flight storage requires fcntl (a POSIX system)")
+        self._init_locks(lock_stripes)
+        self.name = name
+        self.max_flights = max_flights
+        self.max_seats = max_seats
+
+        # columns ordered by item size so every cast stays aligned
+        sizes = [
+            ("header", "Q", HEADER_BYTES),
+            ("seat_offsets", "Q", 8 * max_flights),
+            ("seats", "q", 8 * max_seats),
+            ("capacities", "I", 4 * max_flights),
+            ("seats_taken", "I", 4 * max_flights),
+            ("statuses", "B", max_flights),
+            ("departures", "B", LOCATION_BYTES * max_flights),
+            ("arrivals", "B", LOCATION_BYTES * max_flights),
+        ]
+        self.lock_file_path = os.path.join(tempfile.gettempdir(), f"{name}.lock")
+        self._lock_fd = os.open(self.lock_file_path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            with self._process_lock(0):  # a process attaching must not read the layout before the creator wrote it
+                self._memory, created = _open_shared_memory(name, sum(size for _, _, size in sizes))
+                self._columns: list[memoryview] = []
+                offset = 0
+                for column, item_format, size in sizes:
+                    view = self._memory.buf[offset:offset + size].cast(item_format)
+                    self._columns.append(view)
+                    setattr(self, column, view)
+                    offset += size
+                if created:
+                    self.header[2], self.header[3] = max_flights, max_seats
+                layout = (self.header[2], self.header[3])
+        except BaseException:
+            os.close(self._lock_fd)
+            raise
+        if layout != (max_flights, max_seats):
+            self.close()
+            raise ValueError(
+                f"Shared memory {name!r} holds max_flights, max_seats = {layout}, not {(max_flights, max_seats)},"
+                " unlink it or change the name"
+            )
+
+        self._passenger_sets: dict[int, set[int]] = {}  # flight ID -> passengers seen by this process
+        self._passenger_sets_seen: dict[int, int] = {}  # flight ID -> seats read into the set
+        self._routes: dict[tuple[str, str], list[int]] = {}  # (departure, arrival) -> flight IDs in ascending order
+        self._routes_seen = 0  # flights read into self._routes
+        self._routes_lock = threading.Lock()
+        self._itineraries: dict[int, list[int]] = {}  # passenger ID -> flight IDs in ascending order
+        self._itineraries_seen = bytearray()  # seats_taken column as of the last catch up
+        self._itineraries_lock = threading.Lock()
+
+    def close(self) -> None:
+        """
+        Detach this process from the shared region (the flights stay there for the other processes)
+        """
+        for view in self._columns:
+            view.release()
+        self._columns = []
+        self._memory.close()
+        os.close(self._lock_fd)
+
+    def unlink(self) -> None:
+        """
+        Destroy the shared region and its lock file. Processes still attached keep their mapping until they close it.
+        """
+        shared_memory.SharedMemory(self.name).unlink()
+        try:
+            os.unlink(self.lock_file_path)
+        except FileNotFoundError:
+            pass
+
+    @contextmanager
+    def _process_lock(self, offset: int):
+        fcntl.lockf(self._lock_fd, fcntl.LOCK_EX, 1, offset)
+        try:
+            yield
+        finally:
+            fcntl.lockf(self._lock_fd, fcntl.LOCK_UN, 1, offset)
+
+    def _row(self, flight_id: int) -> int:
+        count = self.header[0]
+        if not -count <= flight_id < count:
+            raise IndexError(f"Flight {flight_id} not found")
+        return flight_id % count
+
+    @staticmethod
+    def _encode_location(location: str) -> bytes:
+        encoded = location.encode()
+        if len(encoded) > LOCATION_BYTES:
+            raise ValueError(f"Location is longer than {LOCATION_BYTES} bytes")
+        return encoded.ljust(LOCATION_BYTES, b"\0")
+
+    def _location(self, column: memoryview, flight_id: int) -> str:
+        start = flight_id * LOCATION_BYTES
+        return bytes(column[start:start + LOCATION_BYTES]).rstrip(b"\0").decode()
+
+    @property
+    def flights(self) -> list[Flight]:
+        """
+        Materialize all flights as Flight objects (slow, for debugging and exports only)
+        :return: list of flights
+        """
+        return [self.get_flight(flight_id) for flight_id in range(self.header[0])]
+
+    def add_flight(
+            self,
+            departure_location: str,
+            arrival_location: str,
+            max_capacity: int
+    ) -> int:
+        """
+        Add a new flight to the system. Raises ValueError if the shared region has no room left.
+        :param departure_location:
+        :param arrival_location:
+        :param max_capacity:
+        :return: ID of the new flight
+        """
+        if max_capacity <= 0:
+            raise ValueError('Passenger capacity must be greater than 0')
+        departure = self._encode_location(departure_location)
+        arrival = self._encode_location(arrival_location)
+        with self._add_lock, self._process_lock(0):
+            flight_id, seats_allocated = self.header[0], self.header[1]
+            if flight_id >= self.max_flights or seats_allocated + max_capacity > self.max_seats:
+                raise ValueError("Shared flight storage is full")
+            start = flight_id * LOCATION_BYTES
+            self.departures[start:start + LOCATION_BYTES] = departure
+            self.arrivals[start:start + LOCATION_BYTES] = arrival
+            self.capacities[flight_id] = max_capacity
+            self.seats_taken[flight_id] = 0
+            self.seat_offsets[flight_id] = seats_allocated
+            self.statuses[flight_id] = STATUS_CODES[FlightStatus.AVAILABLE_FOR_REGISTRATION.value]
+            self.header[1] = seats_allocated + max_capacity
+            self.header[0] = flight_id + 1  # publish the row last, readers never see it half-written
+            return flight_id
+
+    def _passenger_ids(self, flight_id: int) -> list[int]:
+        start = self.seat_offsets[flight_id]
+        return self.seats[start:start + self.seats_taken[flight_id]].tolist()
+
+    def _has_passenger(self, flight_id: int, passenger_id: int, seats_taken: int) -> bool:
+        # seats are append-only, so this process keeps a hash of every flight it looked at and only reads
+        # the seats sold since (by any process); adding a seat twice from racing threads is harmless
+        passenger_ids = self._passenger_sets.get(flight_id)
+        if passenger_ids is None:
+            passenger_ids = self._passenger_sets.setdefault(flight_id, set())
+        seen = self._passenger_sets_seen.get(flight_id, 0)
+        if seen < seats_taken:
+            start = self.seat_offsets[flight_id]
+            passenger_ids.update(self.seats[start + seen:start + seats_taken].tolist())
+            self._passenger_sets_seen[flight_id] = seats_taken
+        return passenger_id in passenger_ids
+
+    def get_flight(self, flight_id: int) -> Flight:
+        """
+        Build a Flight object from the shared columns. Raises IndexError if flight is not found.
+        :param flight_id: Flight ID
+        :return: Flight object (a copy, changes are not stored)
+        """
+        flight_id = self._row(flight_id)
+        flight = self._flight(flight_id)
+        flight.passengers = PassengerManifest(self._passenger_ids(flight_id))
+        return flight
+
+    def _flight(self, flight_id: int) -> Flight:
+        return Flight(
+            self._location(self.departures, flight_id),
+            self._location(self.arrivals, flight_id),
+            self.capacities[flight_id],
+            STATUSES[self.statuses[flight_id]],
+        )
+
+    def list_flights(self, after: int = -1, limit: int = 100) -> list[tuple[int, Flight, int]]:
+        """
+        List flights in ID order, built from the shared columns without manifests (see FlightService.list_flights)
+        """
+        start = max(after + 1, 0)
+        stop = min(start + limit, self.header[0])
+        return [(flight_id, self._flight(flight_id), self.seats_taken[flight_id]) for flight_id in range(start, stop)]
+
+    def change_flight_status(self, flight_id: int, status: str) -> bool:
+        """
+        Change flight status. Raises ValueError if status is not a FlightStatus value.
+        :param flight_id: Flight ID
+        :param status: new flight status (FlightStatus.value)
+        :return: True if successful, False otherwise
+        """
+        try:
+            flight_id = self._row(flight_id)
+        except IndexError:
+            return False
+        try:
+            self.statuses[flight_id] = STATUS_CODES[status]  # a single byte, no lock needed
+        except KeyError:
+            raise ValueError(f"Unknown flight status {status!r}") from None
+        return True
+
+    def buy_ticket(self, flight_id: int, passenger_id: int) -> None:
+        """
+        Try to buy a ticket. Raises IndexError if flight_id is out of range. Raises ValueError if flight is full.
+        Raises AlreadyBookedError (a ValueError) if the passenger already has a ticket to this flight.
+        :param flight_id: Flight ID
+        :param passenger_id: Passenger ID to add to the flight passenger list (NOTE: passenger existence is not checked)
+        :return:
+        """
+        flight_id = self._row(flight_id)
+        with self._flight_lock(flight_id), self._process_lock(flight_id + 1):
+            seats_taken = self.seats_taken[flight_id]
+            if self._has_passenger(flight_id, passenger_id, seats_taken):
+                raise AlreadyBookedError(f"Passenger {passenger_id} already has a ticket to flight {flight_id}")
+            if seats_taken >= self.capacities[flight_id]:
+                raise ValueError(f"Flight {flight_id} is already full")
+
+            self.seats[self.seat_offsets[flight_id] + seats_taken] = passenger_id
+            self.seats_taken[flight_id] = seats_taken + 1
+
+    def has_ticket(self, flight_id: int, passenger_id: int) -> bool:
+        """
+        Check if passenger has a ticket to the flight. Raises IndexError if flight is not found.
+        :param flight_id: Flight ID
+        :param passenger_id: Passenger ID
+        :return: passenger is on the flight manifest
+        """
+        flight_id = self._row(flight_id)
+        return self._has_passenger(flight_id, passenger_id, self.seats_taken[flight_id])
+
+    def count_passengers(self, flight_id: int) -> int:
+        """
+        Count passengers with a ticket to the flight. Raises IndexError if flight is not found.
+        :param flight_id: Flight ID
+        :return: number of booked passengers
+        """
+        return self.seats_taken[self._row(flight_id)]
+
+    def _catch_up_itineraries(self) -> None:
+        # called with _itineraries_lock held; the seat counters are compared with this process's copy
+        # a block at a time and only the seats sold since are read, on the flights whose counter moved
+        seats_taken = self.seats_taken[:self.header[0]].tobytes()
+        seen = self._itineraries_seen
+        seen.extend(bytes(len(seats_taken) - len(seen)))
+        block_bytes = 4 * ITINERARY_SCAN_FLIGHTS
+        for block in range(0, len(seats_taken), block_bytes):
+            new_counts = seats_taken[block:block + block_bytes]
+            if new_counts == seen[block:block + block_bytes]:
+                continue
+            old_counts = memoryview(seen[block:block + block_bytes]).cast("I")
+            for index, count in enumerate(memoryview(new_counts).cast("I")):
+                if count != old_counts[index]:
+                    flight_id = block // 4 + index
+                    start = self.seat_offsets[flight_id]
+                    for passenger_id in self.seats[start + old_counts[index]:start + count].tolist():
+                        insort(self._itineraries.setdefault(passenger_id, []), flight_id)
+            seen[block:block + block_bytes] = new_counts
+
+    def get_itinerary(self, passenger_id: int) -> list[int]:
+        """
+        List flights a passenger has tickets to. Other processes sell tickets in place, so this process keeps
+        a passenger -> flights index caught up from the seat counters, O(flights / 1024 + tickets sold since).
+        :param passenger_id: Passenger ID
+        :return: Flight IDs in ascending order
+        """
+        with self._itineraries_lock:
+            self._catch_up_itineraries()
+            return list(self._itineraries.get(passenger_id, ()))
+
+    def is_delayed(self, flight_id: int) -> bool:
+        """
+        Check if flight is delayed. Raises IndexError if flight is not found.
+        :param flight_id: Flight ID
+        :return: flight is delayed
+        """
+        return self.statuses[self._row(flight_id)] == DELAYED_CODE
+
+    def _catch_up_routes(self) -> None:
+        # routes never change once a flight is published, so only flights added since the last call are read
+        count = self.header[0]
+        if self._routes_seen >= count:
+            return
+        with self._routes_lock:
+            for flight_id in range(self._routes_seen, count):
+                route = (self._location(self.departures, flight_id), self._location(self.arrivals, flight_id))
+                self._routes.setdefault(route, []).append(flight_id)
+            self._routes_seen = max(self._routes_seen, count)
+
+    def search_flights(
+            self,
+            departure_location: str,
+            arrival_location: str,
+            after: int = -1,
+            limit: int = 100,
+    ) -> list[tuple[int, int]]:
+        """
+        Find bookable flights (with free seats) on a route. This process keeps a route index caught up with
+        the flights other processes add; seats are sold in place, so they are checked while reading the index.
+        :param departure_location:
+        :param arrival_location:
+        :param after: only flights with a greater ID are listed (ID of the last flight on the previous page)
+        :param limit: max number of flights
+        :return: (flight ID, seats remaining) in ascending flight ID order
+        """
+        self._catch_up_routes()
+        flight_ids = self._routes.get((departure_location, arrival_location), [])
+        flights = []
+        for index in range(bisect_right(flight_ids, after), len(flight_ids)):
+            if len(flights) >= limit:
+                break
+            flight_id = flight_ids[index]
+            seats_remaining = self.capacities[flight_id] - self.seats_taken[flight_id]
+            if seats_remaining:
+                flights.append((flight_id, seats_remaining))
+        return flights
+
+    def flights_by_status(self, status: str, after: int = -1, limit: int = 100) -> list[int]:
+        """
+        List flights in a status. Other processes change statuses in place, so there is no index to keep up to date:
+        the status column (one byte per flight) is scanned from after + 1, a chunk at a time, until the page is full.
+        Each chunk is searched with bytes.find, tens of microseconds for 100,000 flights
+        (see benchmarks.shared_status_scan), so status changes stay lock-free single byte writes.
+        Raises ValueError if status is not a FlightStatus value.
+        :param status: flight status (FlightStatus.value)
+        :param after: only flights with a greater ID are listed (ID of the last flight on the previous page)
+        :param limit: max number of flights
+        :return: flight IDs in ascending order
+        """
+        try:
+            status_code = bytes([STATUS_CODES[status]])
+        except KeyError:
+            raise ValueError(f"Unknown flight status {status!r}") from None
+        count = self.header[0]
+        start = max(after + 1, 0)
+        flight_ids = []
+        while start < count and len(flight_ids) < limit:
+            statuses = bytes(self.statuses[start:min(start + STATUS_SCAN_BYTES, count)])
+            position = statuses.find(status_code)
+            while position != -1 and len(flight_ids) < limit:
+                flight_ids.append(start + position)
+                position = statuses.find(status_code, position + 1)
+            start += len(statuses)
+        return flight_ids
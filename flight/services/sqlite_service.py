@@ -0,0 +1,598 @@
+import atexit
+import json
+import sqlite3
+import threading
+import time
+from typing import Callable, Iterable, Iterator
+from uuid import UUID
+
+from ..models import Flight, FlightStatus, Operation, Passenger, PassengerManifest
+from .flight_service import AlreadyBookedError, FlightService
+from .operation_service import OperationService
+from .passenger_service import PassengerService
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS flights (
+    id INTEGER PRIMARY KEY,
+    departure_location TEXT NOT NULL,
+    arrival_location TEXT NOT NULL,
+    max_capacity INTEGER NOT NULL,
+    seats_taken INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS flights_status ON flights (status, id);
+CREATE INDEX IF NOT EXISTS flights_bookable_route ON flights (departure_location, arrival_location, id)
+    WHERE seats_taken < max_capacity;
+CREATE TABLE IF NOT EXISTS tickets (
+    flight_id INTEGER NOT NULL,
+    passenger_id INTEGER NOT NULL,
+    UNIQUE (flight_id, passenger_id)
+);
+CREATE INDEX IF NOT EXISTS tickets_passenger ON tickets (passenger_id);
+CREATE TABLE IF NOT EXISTS passengers (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    surname TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS passengers_name ON passengers (name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS passengers_surname ON passengers (surname COLLATE NOCASE);
+CREATE TABLE IF NOT EXISTS operations (
+    id TEXT PRIMARY KEY,
+    done INTEGER NOT NULL DEFAULT 0,
+    result TEXT,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS operations_finished ON operations (finished_at) WHERE done = 1;
+"""
+
+FLIGHT_STATUSES = {flight_status.value for flight_status in FlightStatus}
+
+
+def _like_prefix(prefix: str) -> str:
+    return prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+class SQLiteDatabase:
+    """
+    One SQLite connection shared by the SQLite services of a process.
+
+    The connection is opened once in WAL mode and reused by every thread (under a lock), so the sqlite3 statement
+    cache keeps every query prepared. Writes are committed in batches: after commit_rows writes or commit_interval
+    seconds after the first uncommitted write, whichever comes first, and on close (also at interpreter exit).
+    A crash loses at most that window. Other processes only see committed writes.
+    """
+
+    def __init__(
+            self,
+            path: str = ":memory:",
+            commit_rows: int = 100,
+            commit_interval: float = 0.5,
+            synchronous: str = "NORMAL",
+            timeout: float = 5.0,
+    ):
+        """
+        :param path: database file
+        :param commit_rows: commit after this many writes (1 - commit every write)
+        :param commit_interval: max seconds a write stays uncommitted
+        :param synchronous: SQLite synchronous pragma ("OFF", "NORMAL" or "FULL")
+        :param timeout: seconds to wait for another process holding the write lock
+        """
+        if commit_rows < 1:
+            raise ValueError("commit_rows must be at least 1")
+        self.path = str(path)
+        self.commit_rows = commit_rows
+        self.commit_interval = commit_interval
+        self.lock = threading.RLock()
+        self.connection = sqlite3.connect(
+            self.path,
+            timeout=timeout,
+            check_same_thread=False,
+            cached_statements=256,
+        )
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(f"PRAGMA synchronous={synchronous}")
+        self.connection.executescript(SCHEMA)
+        self._pending = 0
+        self._commit_timer: threading.Timer | None = None
+        atexit.register(self.close)
+
+    def read(self, sql: str, params: Iterable = ()) -> list[tuple]:
+        """
+        Run a query
+        :param sql: SELECT statement
+        :param params: statement parameters
+        :return: all rows
+        """
+        with self.lock:
+            return self.connection.execute(sql, params).fetchall()
+
+    def write(self, sql: str, params: Iterable = ()) -> sqlite3.Cursor:
+        """
+        Run a statement in the current batch
+        :param sql: INSERT/UPDATE/DELETE statement
+        :param params: statement parameters
+        :return: cursor (for rowcount and lastrowid)
+        """
+        with self.lock:
+            cursor = self.connection.execute(sql, params)
+            self.written()
+            return cursor
+
+    def written(self, rows: int = 1) -> None:
+        """
+        Count writes made directly on the connection (under self.lock) towards the batch
+        :param rows: number of writes
+        """
+        with self.lock:
+            self._pending += rows
+            if self._pending >= self.commit_rows:
+                self.commit()
+            elif self._commit_timer is None:
+                self._commit_timer = threading.Timer(self.commit_interval, self.commit)
+                self._commit_timer.daemon = True
+                self._commit_timer.start()
+
+    def unchanged(self) -> None:
+        """
+        End a transaction opened directly on the connection (under self.lock) by statements that changed nothing,
+        so this process does not hold the write lock until the next batch commit. Batched writes pending
+        in the same transaction are left to the batch commit.
+        """
+        with self.lock:
+            if not self._pending and self.connection.in_transaction:
+                self.connection.rollback()
+
+    def commit(self) -> None:
+        """
+        Commit the current batch
+        """
+        with self.lock:
+            if self._commit_timer is not None:
+                self._commit_timer.cancel()
+                self._commit_timer = None
+            self._pending = 0
+            if self.connection is not None:
+                self.connection.commit()
+
+    def close(self) -> None:
+        """
+        Commit the current batch and close the connection
+        """
+        with self.lock:
+            if self.connection is None:
+                return
+            self.commit()
+            self.connection.close()
+            self.connection = None
+        atexit.unregister(self.close)
+
+
+class SQLiteFlightService(FlightService):
+    """
+    Flight storage engine persisting flights and tickets in SQLite.
+    Flight ID is the row ID minus one, so IDs start at 0 like in the in-memory engines.
+    """
+
+    def __init__(self, database: SQLiteDatabase):
+        """
+        :param database: database shared with the other SQLite services
+        """
+        self.database = database
+
+    def _row_id(self, flight_id: int) -> int:
+        if flight_id < 0:
+            flight_id += self._count_flights()
+        return flight_id + 1
+
+    def _count_flights(self) -> int:
+        return self.database.read("SELECT COALESCE(MAX(id), 0) FROM flights")[0][0]
+
+    @property
+    def flights(self) -> list[Flight]:
+        """
+        Materialize all flights as Flight objects (slow, for debugging and exports only)
+        :return: list of flights
+        """
+        return [self.get_flight(flight_id) for flight_id in range(self._count_flights())]
+
+    def add_flight(
+            self,
+            departure_location: str,
+            arrival_location: str,
+            max_capacity: int
+    ) -> int:
+        """
+        Add a new flight to the system
+        :param departure_location:
+        :param arrival_location:
+        :param max_capacity:
+        :return: ID of the new flight
+        """
+        if max_capacity <= 0:
+            raise ValueError('Passenger capacity must be greater than 0')
+        cursor = self.database.write(
+            "INSERT INTO flights (departure_location, arrival_location, max_capacity, status) VALUES (?, ?, ?, ?)",
+            (departure_location, arrival_location, max_capacity, FlightStatus.AVAILABLE_FOR_REGISTRATION.value),
+        )
+        return cursor.lastrowid - 1
+
+    def get_flight(self, flight_id: int) -> Flight:
+        """
+        Load a flight. Raises IndexError if flight is not found.
+        :param flight_id: Flight ID
+        :return: Flight object (a copy, changes are not stored)
+        """
+        row_id = self._row_id(flight_id)
+        with self.database.lock:
+            rows = self.database.read(
+                "SELECT departure_location, arrival_location, max_capacity, status FROM flights WHERE id = ?",
+                (row_id,),
+            )
+            if not rows:
+                raise IndexError(f"Flight {flight_id} not found")
+            flight = Flight(*rows[0])
+            flight.passengers = PassengerManifest(
+                passenger_id for passenger_id, in self.database.read(
+                    "SELECT passenger_id FROM tickets WHERE flight_id = ? ORDER BY rowid", (row_id,),
+                )
+            )
+        return flight
+
+    def list_flights(self, after: int = -1, limit: int = 100) -> list[tuple[int, Flight, int]]:
+        """
+        List flights in ID order with one range query, without manifests (see FlightService.list_flights)
+        """
+        with self.database.lock:
+            rows = self.database.read(
+                "SELECT id, departure_location, arrival_location, max_capacity, status, seats_taken FROM flights"
+                " WHERE id > ? ORDER BY id LIMIT ?",
+                (max(after, -1) + 1, limit),
+            )
+        return [(row_id - 1, Flight(*row), seats_taken) for row_id, *row, seats_taken in rows]
+
+    def change_flight_status(self, flight_id: int, status: str) -> bool:
+        """
+        Change flight status. Raises ValueError if status is not a FlightStatus value.
+        :param flight_id: Flight ID
+        :param status: new flight status (FlightStatus.value)
+        :return: True if successful, False otherwise
+        """
+        if status not in FLIGHT_STATUSES:
+            raise ValueError(f"Unknown flight status {status!r}")
+        cursor = self.database.write("UPDATE flights SET status = ? WHERE id = ?", (status, self._row_id(flight_id)))
+        return cursor.rowcount > 0
+
+    def buy_ticket(self, flight_id: int, passenger_id: int) -> None:
+        """
+        Try to buy a ticket. Raises IndexError if flight_id is out of range. Raises ValueError if flight is full.
+        Raises AlreadyBookedError (a ValueError) if the passenger already has a ticket to this flight.
+        :param flight_id: Flight ID
+        :param passenger_id: Passenger ID to add to the flight passenger list (NOTE: passenger existence is not checked)
+        :return:
+        """
+        row_id = self._row_id(flight_id)
+        database = self.database
+        with database.lock:
+            connection = database.connection
+            booked = False
+            try:
+                # taking the seat first grabs the write lock, so no other process can book in between
+                taken = connection.execute(
+                    "UPDATE flights SET seats_taken = seats_taken + 1 WHERE id = ? AND seats_taken < max_capacity",
+                    (row_id,),
+                ).rowcount
+                if not taken:
+                    if not connection.execute("SELECT 1 FROM flights WHERE id = ?", (row_id,)).fetchone():
+                        raise IndexError(f"Flight {flight_id} not found")
+                    if self.has_ticket(flight_id, passenger_id):
+                        raise AlreadyBookedError(
+                            f"Passenger {passenger_id} already has a ticket to flight {flight_id}"
+                        )
+                    raise ValueError(f"Flight {flight_id} is already full")
+                try:
+                    connection.execute(
+                        "INSERT INTO tickets (flight_id, passenger_id) VALUES (?, ?)", (row_id, passenger_id),
+                    )
+                except sqlite3.IntegrityError:
+                    connection.execute("UPDATE flights SET seats_taken = seats_taken - 1 WHERE id = ?", (row_id,))
+                    raise AlreadyBookedError(
+                        f"Passenger {passenger_id} already has a ticket to flight {flight_id}"
+                    ) from None
+                booked = True
+            finally:
+                # a rejected purchase changed nothing, do not keep its transaction (and the write lock) open
+                if booked:
+                    database.written()
+                else:
+                    database.unchanged()
+
+    def buy_tickets(
+            self,
+            tickets: Iterable[tuple[int, int]],
+            passenger_exists: Callable[[int], bool] | None = None,
+    ) -> list[str]:
+        """
+        Buy a batch of tickets in one pass (see FlightService.buy_tickets), holding the database for the whole batch
+        """
+        with self.database.lock:
+            return super().buy_tickets(tickets, passenger_exists)
+
+    def has_ticket(self, flight_id: int, passenger_id: int) -> bool:
+        """
+        Check if passenger has a ticket to the flight. Raises IndexError if flight is not found.
+        :param flight_id: Flight ID
+        :param passenger_id: Passenger ID
+        :return: passenger is on the flight manifest
+        """
+        row_id = self._row_id(flight_id)
+        rows = self.database.read(
+            "SELECT EXISTS (SELECT 1 FROM tickets WHERE flight_id = ? AND passenger_id = ?) FROM flights WHERE id = ?",
+            (row_id, passenger_id, row_id),
+        )
+        if not rows:
+            raise IndexError(f"Flight {flight_id} not found")
+        return bool(rows[0][0])
+
+    def count_passengers(self, flight_id: int) -> int:
+        """
+        Count passengers with a ticket to the flight. Raises IndexError if flight is not found.
+        :param flight_id: Flight ID
+        :return: number of booked passengers
+        """
+        rows = self.database.read("SELECT seats_taken FROM flights WHERE id = ?", (self._row_id(flight_id),))
+        if not rows:
+            raise IndexError(f"Flight {flight_id} not found")
+        return rows[0][0]
+
+    def get_itinerary(self, passenger_id: int) -> list[int]:
+        """
+        List flights a passenger has tickets to using the tickets (passenger_id) index (see FlightService.get_itinerary)
+        """
+        return [
+            row_id - 1 for row_id, in self.database.read(
+                "SELECT flight_id FROM tickets WHERE passenger_id = ? ORDER BY flight_id", (passenger_id,),
+            )
+        ]
+
+    def is_delayed(self, flight_id: int) -> bool:
+        """
+        Check if flight is delayed. Raises IndexError if flight is not found.
+        :param flight_id: Flight ID
+        :return: flight is delayed
+        """
+        rows = self.database.read("SELECT status FROM flights WHERE id = ?", (self._row_id(flight_id),))
+        if not rows:
+            raise IndexError(f"Flight {flight_id} not found")
+        return rows[0][0] == FlightStatus.DELAYED.value
+
+    def flights_by_status(self, status: str, after: int = -1, limit: int = 100) -> list[int]:
+        """
+        List flights in a status using the (status, id) index (see FlightService.flights_by_status)
+        """
+        return [
+            row_id - 1 for row_id, in self.database.read(
+                "SELECT id FROM flights WHERE status = ? AND id > ? ORDER BY id LIMIT ?",
+                (status, max(after, -1) + 1, limit),
+            )
+        ]
+
+    def search_flights(
+            self,
+            departure_location: str,
+            arrival_location: str,
+            after: int = -1,
+            limit: int = 100,
+    ) -> list[tuple[int, int]]:
+        """
+        Find bookable flights on a route using a partial index over flights with free seats,
+        SQLite keeps it up to date as seats are sold (see FlightService.search_flights)
+        """
+        return [
+            (row_id - 1, seats_remaining) for row_id, seats_remaining in self.database.read(
+                "SELECT id, max_capacity - seats_taken FROM flights"
+                " WHERE departure_location = ? AND arrival_location = ? AND seats_taken < max_capacity AND id > ?"
+                " ORDER BY id LIMIT ?",
+                (departure_location, arrival_location, max(after, -1) + 1, limit),
+            )
+        ]
+
+    def are_delayed(self, flight_ids: Iterable[int]) -> list[bool | None]:
+        """
+        Check delay status of a batch of flights with one query (see FlightService.are_delayed)
+        """
+        with self.database.lock:
+            row_ids = [self._row_id(flight_id) for flight_id in flight_ids]
+            statuses = dict(self.database.read(
+                f"SELECT id, status FROM flights WHERE id IN ({','.join('?' * len(row_ids))})", row_ids,
+            )) if row_ids else {}
+        return [
+            None if row_id not in statuses else statuses[row_id] == FlightStatus.DELAYED.value
+            for row_id in row_ids
+        ]
+
+
+class SQLitePassengerService(PassengerService):
+    """
+    Passenger storage persisting passengers in SQLite. Passenger ID is the row ID minus one.
+    """
+
+    def __init__(self, database: SQLiteDatabase):
+        """
+        :param database: database shared with the other SQLite services
+        """
+        self.database = database
+        self.last_modified: float = time.time()
+
+    def add_passenger(self, name: str, surname: str) -> int:
+        """
+        Register new passenger in the system
+        :param name: Passenger name
+        :param surname: Passenger surname
+        :return: Created Passenger ID
+        """
+        cursor = self.database.write("INSERT INTO passengers (name, surname) VALUES (?, ?)", (name, surname))
+        self.last_modified = time.time()
+        return cursor.lastrowid - 1
+
+    def get_passenger(self, passenger_id: int) -> Passenger:
+        """
+        Get a passenger
+        :param passenger_id: Passenger ID
+        :return: Passenger object or None if no passenger is found
+        """
+        if passenger_id < 0:
+            passenger_id += self.count_passengers()
+        rows = self.database.read("SELECT name, surname FROM passengers WHERE id = ?", (passenger_id + 1,))
+        return Passenger(*rows[0]) if rows else None
+
+    def has_passenger(self, passenger_id: int) -> bool:
+        """
+        Check if a passenger is registered
+        :param passenger_id: Passenger ID
+        :return: passenger exists
+        """
+        return passenger_id >= 0 and bool(
+            self.database.read("SELECT 1 FROM passengers WHERE id = ?", (passenger_id + 1,))
+        )
+
+    def count_passengers(self) -> int:
+        """
+        Count registered passengers
+        :return: number of passengers (also the ID the next passenger will get)
+        """
+        return self.database.read("SELECT COALESCE(MAX(id), 0) FROM passengers")[0][0]
+
+    def list_passengers(self, after: int = -1, limit: int = 100) -> list[tuple[int, Passenger]]:
+        """
+        List passengers in ID order with one range query (see PassengerService.list_passengers)
+        """
+        return [
+            (passenger_id, Passenger(name, surname)) for passenger_id, name, surname in self.database.read(
+                "SELECT id - 1, name, surname FROM passengers WHERE id > ? ORDER BY id LIMIT ?",
+                (max(after, -1) + 1, limit),
+            )
+        ]
+
+    def search_passengers(self, name: str = "", surname: str = "", limit: int = 100) -> list[int]:
+        """
+        Find passengers by name and/or surname prefix with LIKE over the NOCASE indexes
+        (case-insensitive for ASCII only, see PassengerService.search_passengers)
+        """
+        column = "surname" if surname else "name"
+        return [
+            passenger_id for passenger_id, in self.database.read(
+                "SELECT id - 1 FROM passengers WHERE surname LIKE ? ESCAPE '\\' AND name LIKE ? ESCAPE '\\'"
+                f" ORDER BY {column} COLLATE NOCASE, id LIMIT ?",
+                (_like_prefix(surname), _like_prefix(name), limit),
+            )
+        ]
+
+    def iter_passengers(self, start: int = 0, stop: int | None = None) -> Iterator[tuple[int, Passenger]]:
+        """
+        Iterate over passengers in registration order, reading them from the database in pages
+        :param start: first Passenger ID
+        :param stop: Passenger ID to stop before (all passengers if None)
+        :return: iterator of (Passenger ID, Passenger) pairs
+        """
+        stop = self.count_passengers() if stop is None else min(stop, self.count_passengers())
+        while start < stop:
+            rows = self.database.read(
+                "SELECT id - 1, name, surname FROM passengers WHERE id > ? AND id <= ? ORDER BY id LIMIT 1000",
+                (start, stop),
+            )
+            if not rows:
+                return
+            for passenger_id, name, surname in rows:
+                yield passenger_id, Passenger(name, surname)
+            start = rows[-1][0] + 1
+
+
+class SQLiteOperationService(OperationService):
+    """
+    Operation storage persisting operations and their results (as JSON) in SQLite.
+    Finished operations expire after ttl like in OperationService, but when max_operations is exceeded
+    the oldest operations are evicted (finished ones first) instead of the least recently used ones.
+    """
+
+    def __init__(
+            self,
+            database: SQLiteDatabase,
+            ttl: float = 600.0,
+            max_operations: int = 10_000,
+            pools: dict[str, dict] | None = None,
+            reuse_seconds: float = 0.0,
+    ):
+        """
+        :param database: database shared with the other SQLite services
+        :param ttl: see OperationService
+        :param max_operations: see OperationService
+        :param pools: see OperationService
+        :param reuse_seconds: see OperationService (operations are coalesced within this process only)
+        """
+        super().__init__(ttl, max_operations, pools, reuse_seconds)
+        self.database = database
+
+    def _delete_operations(self, sql: str, params: Iterable) -> int:
+        with self.database.lock:
+            deleted = self.database.connection.execute(sql, params).fetchall()
+            if deleted:
+                self.database.written(len(deleted))
+            else:
+                self.database.unchanged()
+        with self._lock:
+            for op_id, in deleted:
+                self._forget(UUID(op_id))
+        return len(deleted)
+
+    def _register_operation(self, op: Operation) -> None:
+        self.expire_operations()
+        self.database.write("INSERT INTO operations (id) VALUES (?)", (str(op.id),))
+        self._evict_operations()
+
+    def _evict_operations(self) -> None:
+        if not self.max_operations:
+            return
+        excess = self.database.read("SELECT COUNT(*) FROM operations")[0][0] - self.max_operations
+        if excess > 0:
+            evicted = self._delete_operations(
+                "DELETE FROM operations WHERE rowid IN "
+                "(SELECT rowid FROM operations ORDER BY done DESC, rowid LIMIT ?) RETURNING id",
+                (excess,),
+            )
+            with self._lock:
+                self.evicted_operations += evicted
+
+    def expire_operations(self) -> int:
+        if not self.ttl:
+            return 0
+        deadline = time.time() - self.ttl
+        # called on every lookup: only start a write transaction when something has expired
+        if not self.database.read("SELECT 1 FROM operations WHERE done = 1 AND finished_at < ? LIMIT 1", (deadline,)):
+            return 0
+        expired = self._delete_operations(
+            "DELETE FROM operations WHERE done = 1 AND finished_at < ? RETURNING id",
+            (deadline,),
+        )
+        with self._lock:
+            self.expired_operations += expired
+        return expired
+
+    def finish_operation(self, op_id: UUID, result) -> bool:
+        cursor = self.database.write(
+            "UPDATE operations SET done = 1, result = ?, finished_at = ? WHERE id = ?",
+            (json.dumps(result, default=str), time.time(), str(op_id)),
+        )
+        with self._finished_condition:
+            self._finished_condition.notify_all()
+        return cursor.rowcount > 0
+
+    def get_operation(self, op_id: UUID) -> Operation | None:
+        self.expire_operations()
+        rows = self.database.read("SELECT done, result FROM operations WHERE id = ?", (str(op_id),))
+        if not rows:
+            return None
+        done, result = rows[0]
+        return Operation(op_id, bool(done), None if result is None else json.loads(result))
+
+    def _count_operations(self) -> tuple[int, int]:
+        return self.database.read("SELECT COUNT(*), COALESCE(SUM(done = 0), 0) FROM operations")[0]
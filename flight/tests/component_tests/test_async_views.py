@@ -0,0 +1,152 @@
+import asyncio
+from unittest.mock import patch
+
+from asgiref.sync import sync_to_async
+from django.test import AsyncClient
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from flight.models import FlightStatus
+from flight.services import LogService
+from flight.views import FlightViewSet
+
+
+class AsyncViewsTests(APITestCase):
+    def setUp(self):
+        self.async_client = AsyncClient()
+
+    async def post_valid_flight(self, max_capacity: int = 50):
+        return await self.async_client.post(
+            '/api/v1/async/flight/',
+            {
+                'departure_location': 'Earth',
+                'arrival_location': 'Mars',
+                'max_capacity': max_capacity,
+            },
+            content_type='application/json',
+        )
+
+    async def post_valid_passenger(self):
+        return await self.async_client.post(
+            '/api/v1/async/passenger/',
+            {
+                'name': 'Elon',
+                'surname': 'Musk',
+            },
+        )
+
+    async def test_post_flight_valid(self):
+        response = await self.post_valid_flight()
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        flight_id = response.json()['flight_id']
+        self.assertEqual(FlightViewSet.flight_service.get_flight(flight_id).arrival_location, 'Mars')
+
+    async def test_post_flight_validation_error(self):
+        response = await self.async_client.post('/api/v1/async/flight/', {'i am': 'error'})
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(
+            response.json(),
+            {'errors': {
+                'departure_location': ['This field is required.'],
+                'arrival_location': ['This field is required.'],
+            }},
+        )
+
+    async def test_post_flight_wrong_method(self):
+        response = await self.async_client.get('/api/v1/async/flight/')
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    async def test_post_passenger_valid(self):
+        response = await self.post_valid_passenger()
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        passenger_id = response.json()['passenger_id']
+        self.assertEqual(FlightViewSet.passenger_service.get_passenger(passenger_id).surname, 'Musk')
+
+    async def test_post_passenger_malformed_json(self):
+        response = await self.async_client.post(
+            '/api/v1/async/passenger/', b'{"name": ', content_type='application/json',
+        )
+        sync_response = await sync_to_async(self.client.post)(
+            '/api/v1/passenger/', b'{"name": ', content_type='application/json',
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json(), sync_response.json())
+
+    async def test_post_passenger_full_log_queue_leaves_event_loop(self):
+        log_service = LogService(log_file_name="test_async_view_log.csv", mode="async", queue_size=1, backpressure="drop")
+        log_service._lock.acquire()  # stall the writer thread on its first batch
+        self.addCleanup(log_service.close)
+        self.addCleanup(log_service._lock.release)
+        with (
+            patch.object(FlightViewSet, "log_service", log_service),
+            patch.object(log_service, "write_entry", wraps=log_service.write_entry) as write_entry,
+        ):
+            await self.post_valid_passenger()
+            while log_service.stats()["queue_depth"]:
+                await asyncio.sleep(0.01)
+            await self.post_valid_passenger()  # fills the queue
+            write_entry.assert_not_called()  # both queued on the loop without waiting
+
+            response = await self.post_valid_passenger()
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        write_entry.assert_called_once()  # backpressure applied in a worker thread
+        self.assertEqual(log_service.stats()["dropped_rows"], 1)
+
+    async def test_get_ticket(self):
+        flight_id = (await self.post_valid_flight(max_capacity=1)).json()['flight_id']
+        passenger_id = (await self.post_valid_passenger()).json()['passenger_id']
+        url = f'/api/v1/async/ticket/?flight_id={flight_id}&passenger_id={passenger_id}'
+
+        response = await self.async_client.post(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = await self.async_client.post(url)
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+        other_passenger_id = (await self.post_valid_passenger()).json()['passenger_id']
+        response = await self.async_client.post(
+            f'/api/v1/async/ticket/?flight_id={flight_id}&passenger_id={other_passenger_id}'
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    async def test_get_ticket_same_as_sync_route(self):
+        flight_id = (await self.post_valid_flight(max_capacity=10)).json()['flight_id']
+        for method in (self.async_client.get, self.async_client.post):
+            for route in ('/api/v1/ticket/', '/api/v1/async/ticket/'):
+                passenger_id = (await self.post_valid_passenger()).json()['passenger_id']
+                url = f'{route}?flight_id={flight_id}&passenger_id={passenger_id}'
+                self.assertEqual((await method(url)).status_code, status.HTTP_200_OK, url)
+                self.assertEqual((await method(url)).status_code, status.HTTP_409_CONFLICT, url)
+                response = await method(f'{route}?flight_id=-1')
+                self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY, url)
+                self.assertEqual(set(response.json()['errors']), {'flight_id', 'passenger_id'})
+
+    async def test_get_ticket_not_found(self):
+        passenger_id = (await self.post_valid_passenger()).json()['passenger_id']
+        response = await self.async_client.post(
+            f'/api/v1/async/ticket/?flight_id=1000000&passenger_id={passenger_id}'
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_get_ticket_validation_error(self):
+        response = await self.async_client.post('/api/v1/async/ticket/?flight_id=-1')
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(set(response.json()['errors']), {'flight_id', 'passenger_id'})
+
+    async def test_get_delayed(self):
+        flight_id = (await self.post_valid_flight()).json()['flight_id']
+        response = await self.async_client.get('/api/v1/async/delayed/', {'flight_id': flight_id})
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+        FlightViewSet.flight_service.change_flight_status(flight_id, FlightStatus.DELAYED.value)
+        response = await self.async_client.get('/api/v1/async/delayed/', {'flight_id': flight_id})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    async def test_get_delayed_not_found(self):
+        response = await self.async_client.get('/api/v1/async/delayed/', {'flight_id': 1_000_000})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_get_delayed_validation_error(self):
+        response = await self.async_client.get('/api/v1/async/delayed/', {'flight_id': 'x'})
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
@@ -1,10 +1,14 @@
+import gzip
+import json
+import threading
 import time
+from unittest.mock import patch
 from uuid import uuid4
 
 from rest_framework import status
 from rest_framework.test import APITestCase, APIRequestFactory
 
-from flight.models import FlightStatus
+from flight.models import FlightStatus, Operation
 from flight.views import FlightViewSet
 
 
@@ -52,6 +56,62 @@ class SpaceFlightControlSystemTests(APITestCase):
         response = FlightViewSet.as_view({'post': 'post_flight'})(request)
         self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
 
+        response = self.post_valid_flight(max_capacity=2 ** 32)
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(set(response.data['errors']), {'max_capacity'})
+
+    def test_post_flight_storage_full(self):
+        full = ValueError("Shared flight storage is full")
+        with patch.object(FlightViewSet.flight_service, 'add_flight', side_effect=full):
+            response = self.post_valid_flight()
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(response.data, {'errors': {'non_field_errors': ['Shared flight storage is full']}})
+
+    def test_get_flights_pages(self):
+        flight_ids = [self.post_valid_flight(arrival_location=location).data['flight_id'] for location in ('A', 'B')]
+        view = FlightViewSet.as_view({'get': 'get_flights'})
+        cursor = None
+        listed = {}
+        while True:
+            query = {'limit': 1} if cursor is None else {'limit': 1, 'cursor': cursor}
+            response = view(self.factory.get('/api/v1/flight/', query))
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(response.data['flights']), 1)
+            listed.update((flight['flight_id'], flight) for flight in response.data['flights'])
+            cursor = response.data['next_cursor']
+            if cursor is None:
+                break
+        self.assertEqual(listed[flight_ids[1]]['arrival_location'], 'B')
+        self.assertEqual(listed[flight_ids[1]]['passengers_count'], 0)
+        self.assertEqual(max(listed), flight_ids[1])
+
+    def test_get_flights_validation_error(self):
+        request = self.factory.get('/api/v1/flight/', {'cursor': 'nope', 'limit': 1_000_000})
+        response = FlightViewSet.as_view({'get': 'get_flights'})(request)
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(response.data['errors']['cursor'], ['Invalid cursor.'])
+        self.assertIn('limit', response.data['errors'])
+
+    def test_post_flights_bulk(self):
+        request = self.factory.post(
+            '/api/v1/flight/bulk/',
+            b'{"departure_location": "Earth", "arrival_location": "Mars"}\n'
+            b'{"departure_location": "Earth"}\n'
+            b'{"departure_location": "Mars", "arrival_location": "Earth", "max_capacity": 3}\n',
+            content_type='application/x-ndjson',
+        )
+        response = FlightViewSet.as_view({'post': 'post_flights_bulk'})(request)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual(len(response.data['id_ranges']), 1)
+        self.assertEqual(response.data['errors'], [{'line': 2, 'errors': {'arrival_location': ['This field is required.']}}])
+
+    def test_post_flights_bulk_empty(self):
+        request = self.factory.post('/api/v1/flight/bulk/', b'', content_type='application/x-ndjson')
+        response = FlightViewSet.as_view({'post': 'post_flights_bulk'})(request)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'created': 0, 'id_ranges': [], 'errors': []})
+
     def test_post_flight_status_success(self):
         self.post_valid_flight()
         request = self.factory.post(
@@ -90,6 +150,70 @@ class SpaceFlightControlSystemTests(APITestCase):
         response = self.post_valid_passenger()
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
 
+    def test_get_passengers_pages(self):
+        first_id = self.post_valid_passenger().data['passenger_id']
+        second_id = self.post_valid_passenger().data['passenger_id']
+        view = FlightViewSet.as_view({'get': 'get_passengers'})
+
+        response = view(self.factory.get('/api/v1/passenger/', {'limit': first_id + 1}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['passengers'][-1], {'passenger_id': first_id, 'name': 'Elon', 'surname': 'Musk'})
+
+        response = view(self.factory.get('/api/v1/passenger/', {'cursor': response.data['next_cursor']}))
+        self.assertEqual([p['passenger_id'] for p in response.data['passengers']], [second_id])
+        self.assertIsNone(response.data['next_cursor'])
+
+    def test_get_passengers_flight_cursor_rejected(self):
+        self.post_valid_flight()
+        cursor = FlightViewSet.as_view({'get': 'get_flights'})(
+            self.factory.get('/api/v1/flight/', {'limit': 1})
+        ).data['next_cursor']
+        response = FlightViewSet.as_view({'get': 'get_passengers'})(
+            self.factory.get('/api/v1/passenger/', {'cursor': cursor})
+        )
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+    def test_get_passenger_search(self):
+        surname = f'Musk{uuid4().hex[:8]}'
+        passenger_ids = [
+            FlightViewSet.as_view({'post': 'post_passenger'})(
+                self.factory.post('/api/v1/passenger/', {'name': name, 'surname': surname})
+            ).data['passenger_id']
+            for name in ('Elon', 'Errol', 'Maye')
+        ]
+        request = self.factory.get('/api/v1/passenger/search/', {'name': 'e', 'surname': surname.lower()})
+        response = FlightViewSet.as_view({'get': 'get_passenger_search'})(request)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'passenger_ids': passenger_ids[:2]})
+
+    def test_get_passenger_search_validation_error(self):
+        request = self.factory.get('/api/v1/passenger/search/', {'limit': 5})
+        response = FlightViewSet.as_view({'get': 'get_passenger_search'})(request)
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(response.data, {'errors': {'non_field_errors': ['Provide a name or surname prefix.']}})
+
+    def test_get_itinerary(self):
+        flight_ids = [self.post_valid_flight().data['flight_id'] for _ in range(2)]
+        passenger_id = self.post_valid_passenger().data['passenger_id']
+        for flight_id in flight_ids:
+            FlightViewSet.flight_service.buy_ticket(flight_id, passenger_id)
+
+        request = self.factory.get('/api/v1/passenger/itinerary/', {'passenger_id': passenger_id})
+        response = FlightViewSet.as_view({'get': 'get_itinerary'})(request)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'passenger_id': passenger_id, 'flight_ids': flight_ids})
+
+    def test_get_itinerary_passenger_not_found(self):
+        request = self.factory.get('/api/v1/passenger/itinerary/', {'passenger_id': 1_000_000})
+        response = FlightViewSet.as_view({'get': 'get_itinerary'})(request)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_get_itinerary_validation_error(self):
+        request = self.factory.get('/api/v1/passenger/itinerary/', {'passenger_id': -1})
+        response = FlightViewSet.as_view({'get': 'get_itinerary'})(request)
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(response.data, {'errors': {'passenger_id': ['Ensure this value is greater than or equal to 0.']}})
+
     def test_post_passenger_validation_error(self):
         request = self.factory.post(
             '/api/v1/passenger/',
@@ -100,6 +224,18 @@ class SpaceFlightControlSystemTests(APITestCase):
         response = FlightViewSet.as_view({'post': 'post_passenger'})(request)
         self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
 
+    def test_post_passengers_bulk(self):
+        request = self.factory.post(
+            '/api/v1/passenger/bulk/',
+            b'{"name": "Elon", "surname": "Musk"}\n{"name": "Water", "surname": "Rock"}\n',
+            content_type='application/x-ndjson',
+        )
+        response = FlightViewSet.as_view({'post': 'post_passengers_bulk'})(request)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['created'], 2)
+        first, last = response.data['id_ranges'][0]
+        self.assertEqual(last - first, 1)
+
     def test_get_ticket_valid(self):
         flight = self.post_valid_flight()
         passenger = self.post_valid_passenger()
@@ -142,6 +278,62 @@ class SpaceFlightControlSystemTests(APITestCase):
         response = FlightViewSet.as_view({'get': 'get_ticket'})(request)
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
+    def test_get_ticket_already_booked(self):
+        flight = self.post_valid_flight()
+        passenger = self.post_valid_passenger()
+        url = f'/api/v1/ticket/?flight_id={flight.data["flight_id"]}&passenger_id={passenger.data["passenger_id"]}'
+        FlightViewSet.as_view({'get': 'get_ticket'})(self.factory.get(url))
+        response = FlightViewSet.as_view({'get': 'get_ticket'})(self.factory.get(url))
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+    def test_post_tickets(self):
+        flight_id = self.post_valid_flight(max_capacity=1).data["flight_id"]
+        passenger_id1 = self.post_valid_passenger().data["passenger_id"]
+        passenger_id2 = self.post_valid_passenger().data["passenger_id"]
+        request = self.factory.post(
+            '/api/v1/ticket/batch/',
+            {
+                'tickets': [
+                    [flight_id, passenger_id1],
+                    [flight_id, passenger_id1],
+                    [flight_id, passenger_id2],
+                    [1_000_000, passenger_id2],
+                    [flight_id, 1_000_000],
+                ],
+            },
+            format='json',
+        )
+        response = FlightViewSet.as_view({'post': 'post_tickets'})(request)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'results': ['OK', 'ALREADY_BOOKED', 'FULL', 'NOT_FOUND', 'NOT_FOUND']})
+
+    def test_post_tickets_validation_error(self):
+        request = self.factory.post('/api/v1/ticket/batch/', {'tickets': [[0]]}, format='json')
+        response = FlightViewSet.as_view({'post': 'post_tickets'})(request)
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+    def test_get_ticket_status_booked(self):
+        flight = self.post_valid_flight()
+        passenger = self.post_valid_passenger()
+        query = f'flight_id={flight.data["flight_id"]}&passenger_id={passenger.data["passenger_id"]}'
+        FlightViewSet.as_view({'get': 'get_ticket'})(self.factory.get(f'/api/v1/ticket/?{query}'))
+        request = self.factory.get(f'/api/v1/ticket/status/?{query}')
+        response = FlightViewSet.as_view({'get': 'get_ticket_status'})(request)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'booked': True, 'passengers_count': 1})
+
+    def test_get_ticket_status_not_booked(self):
+        flight = self.post_valid_flight()
+        request = self.factory.get(f'/api/v1/ticket/status/?flight_id={flight.data["flight_id"]}&passenger_id=0')
+        response = FlightViewSet.as_view({'get': 'get_ticket_status'})(request)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'booked': False, 'passengers_count': 0})
+
+    def test_get_ticket_status_flight_not_found(self):
+        request = self.factory.get('/api/v1/ticket/status/?flight_id=1000000&passenger_id=0')
+        response = FlightViewSet.as_view({'get': 'get_ticket_status'})(request)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
     def test_get_ticket_validation_error(self):
         request = self.factory.get(
             f'/api/v1/ticket/'
@@ -172,6 +364,101 @@ class SpaceFlightControlSystemTests(APITestCase):
         response = FlightViewSet.as_view({'get': 'get_ticket'})(request)
         self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
 
+    def test_get_delayed_fast_validation_same_payload(self):
+        payloads = []
+        for fast_query_actions in [frozenset({'get_delayed'}), frozenset()]:
+            with patch.object(FlightViewSet, 'fast_query_actions', fast_query_actions):
+                request = self.factory.get('/api/v1/delayed/?flight_id=-5')
+                response = FlightViewSet.as_view({'get': 'get_delayed'})(request)
+            self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+            payloads.append(response.data)
+        self.assertEqual(payloads[0], payloads[1])
+
+    def test_get_flight_search(self):
+        destination = f'Mars-{uuid4().hex[:8]}'
+        flight_ids = [self.post_valid_flight(arrival_location=destination, max_capacity=1).data['flight_id']
+                      for _ in range(3)]
+        FlightViewSet.flight_service.buy_ticket(flight_ids[0], 0)
+        view = FlightViewSet.as_view({'get': 'get_flight_search'})
+
+        request = self.factory.get(
+            '/api/v1/flight/search/', {'departure_location': 'Earth', 'arrival_location': destination, 'limit': 1}
+        )
+        response = view(request)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data,
+            {'flights': [{'flight_id': flight_ids[1], 'seats_remaining': 1}], 'next_after': flight_ids[1]},
+        )
+
+        request = self.factory.get(
+            '/api/v1/flight/search/',
+            {'departure_location': 'Earth', 'arrival_location': destination, 'after': response.data['next_after']},
+        )
+        response = view(request)
+        self.assertEqual(
+            response.data,
+            {'flights': [{'flight_id': flight_ids[2], 'seats_remaining': 1}], 'next_after': None},
+        )
+
+    def test_get_flight_search_validation_error(self):
+        request = self.factory.get('/api/v1/flight/search/', {'departure_location': 'Earth'})
+        response = FlightViewSet.as_view({'get': 'get_flight_search'})(request)
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(set(response.data['errors']), {'arrival_location'})
+
+        request = self.factory.get(
+            '/api/v1/flight/search/', {'departure_location': 'Earth', 'arrival_location': 'Mars', 'after': 2**63}
+        )
+        response = FlightViewSet.as_view({'get': 'get_flight_search'})(request)
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(set(response.data['errors']), {'after'})
+
+    def test_post_delayed_batch(self):
+        flight_ids = [self.post_valid_flight().data['flight_id'] for _ in range(2)]
+        FlightViewSet.flight_service.change_flight_status(flight_ids[0], FlightStatus.DELAYED.value)
+        request = self.factory.post(
+            '/api/v1/delayed/batch/',
+            {'flight_ids': [flight_ids[0], flight_ids[1], 1_000_000]},
+            format='json',
+        )
+        response = FlightViewSet.as_view({'post': 'post_delayed_batch'})(request)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'results': [True, False, None]})
+
+    def test_post_delayed_batch_validation_error(self):
+        request = self.factory.post('/api/v1/delayed/batch/', {'flight_ids': []}, format='json')
+        response = FlightViewSet.as_view({'post': 'post_delayed_batch'})(request)
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+    def test_get_flights_by_status_pages(self):
+        flight_ids = [self.post_valid_flight().data['flight_id'] for _ in range(3)]
+        for flight_id in flight_ids[1:]:
+            FlightViewSet.flight_service.change_flight_status(flight_id, FlightStatus.DELAYED.value)
+        view = FlightViewSet.as_view({'get': 'get_flights_by_status'})
+
+        request = self.factory.get(f'/api/v1/flight/by-status/?status=DELAYED&after={flight_ids[0]}&limit=1')
+        response = view(request)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'flight_ids': [flight_ids[1]], 'next_after': flight_ids[1]})
+
+        request = self.factory.get(
+            f'/api/v1/flight/by-status/?status=DELAYED&after={response.data["next_after"]}&limit=2'
+        )
+        response = view(request)
+        self.assertEqual(response.data, {'flight_ids': [flight_ids[2]], 'next_after': None})
+
+    def test_get_flights_by_status_validation_error(self):
+        request = self.factory.get('/api/v1/flight/by-status/?status=LOST&limit=0')
+        response = FlightViewSet.as_view({'get': 'get_flights_by_status'})(request)
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(set(response.data['errors']), {'status', 'limit'})
+
+        request = self.factory.get(f'/api/v1/flight/by-status/?status=DELAYED&after={2**63}')
+        response = FlightViewSet.as_view({'get': 'get_flights_by_status'})(request)
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(set(response.data['errors']), {'after'})
+
     def test_get_delayed_not_delayed(self):
         flight_id = self.post_valid_flight().data["flight_id"]
         request = self.factory.get(
@@ -196,12 +483,107 @@ class SpaceFlightControlSystemTests(APITestCase):
         self.assertEqual(response.data["done"], False)
         self.assertEqual(response.data["result"], None)
 
+    def get_log_export(self, **headers):
+        request = self.factory.get("/api/v1/log/export/", **headers)
+        return FlightViewSet.as_view({"get": "get_log_export"})(request)
+
+    def test_get_log_export_success(self):
+        passenger_id = self.post_valid_passenger().data["passenger_id"]
+        response = self.get_log_export()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        body = b"".join(response.streaming_content)
+        self.assertEqual(len(body), int(response["Content-Length"]))
+        self.assertTrue(body.startswith(b"id;name;surname\n"))
+        self.assertIn(f"{passenger_id};Elon;Musk\n".encode(), body)
+
+    def test_get_log_export_incremental(self):
+        watermark = int(self.get_log_export()["X-Watermark"])
+        passenger_id = self.post_valid_passenger().data["passenger_id"]
+        self.post_valid_passenger()
+
+        request = self.factory.get(f"/api/v1/log/export/?after={watermark}&until={passenger_id}")
+        response = FlightViewSet.as_view({"get": "get_log_export"})(request)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(b"".join(response.streaming_content), f"id;name;surname\n{passenger_id};Elon;Musk\n".encode())
+        self.assertEqual(int(response["X-Watermark"]), passenger_id)
+
+    def test_get_log_export_validation_error(self):
+        request = self.factory.get("/api/v1/log/export/?after=abc")
+        response = FlightViewSet.as_view({"get": "get_log_export"})(request)
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+    def test_get_log_export_range(self):
+        self.post_valid_passenger()
+        full = b"".join(self.get_log_export().streaming_content)
+        response = self.get_log_export(HTTP_RANGE="bytes=3-10")
+
+        self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertEqual(response["Content-Range"], f"bytes 3-10/{len(full)}")
+        self.assertEqual(b"".join(response.streaming_content), full[3:11])
+
+    def test_get_log_export_range_not_satisfiable(self):
+        response = self.get_log_export(HTTP_RANGE="bytes=100000000-")
+        self.assertEqual(response.status_code, status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+
+    def test_get_log_export_if_range_mismatch(self):
+        response = self.get_log_export(HTTP_RANGE="bytes=0-1", HTTP_IF_RANGE='"stale"')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_get_log_export_gzip(self):
+        self.post_valid_passenger()
+        plain = b"".join(self.get_log_export().streaming_content)
+        response = self.get_log_export(HTTP_ACCEPT_ENCODING="gzip, deflate")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertNotIn("Accept-Ranges", response)
+        self.assertEqual(gzip.decompress(b"".join(response.streaming_content)), plain)
+
+    def test_get_log_export_gzip_query_uses_cached_copy(self):
+        self.post_valid_passenger()
+        request = self.factory.get("/api/v1/log/export/?compress=gzip")
+        first = FlightViewSet.as_view({"get": "get_log_export"})(request)
+        compressed = b"".join(first.streaming_content)
+
+        response = self.get_log_export(HTTP_ACCEPT_ENCODING="gzip", HTTP_RANGE="bytes=0-9")
+
+        self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertEqual(response["Content-Range"], f"bytes 0-9/{len(compressed)}")
+        self.assertEqual(b"".join(response.streaming_content), compressed[:10])
+
+    def test_get_log_export_not_modified(self):
+        self.post_valid_passenger()
+        etag = self.get_log_export()["ETag"]
+
+        response = self.get_log_export(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.post_valid_passenger()
+        response = self.get_log_export(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_get_log_stats_success(self):
+        self.post_valid_passenger()
+        request = self.factory.get("/api/v1/log/stats/")
+        response = FlightViewSet.as_view({"get": "get_log_stats"})(request)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertGreaterEqual(response.data["written_rows"], 1)
+        self.assertEqual(response.data["dropped_rows"], 0)
+
     def test_get_log_file_status_success(self):
         desired_response_data = {
             "id": None,
             "done": True,
             "result": {
-                "path": "static/log/passengers.csv"
+                "path": "static/log/passengers.csv",
+                "segments": FlightViewSet.log_service.get_segments(),
+                "after": -1,
+                "watermark": FlightViewSet.passenger_service.count_passengers() - 1,
             },
         }
 
@@ -217,6 +599,26 @@ class SpaceFlightControlSystemTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data, desired_response_data)
 
+    def test_get_log_file_status_incremental_watermark(self):
+        self.post_valid_passenger()
+        after = FlightViewSet.passenger_service.count_passengers() - 1
+        new_passenger_id = self.post_valid_passenger().data["passenger_id"]
+
+        request = self.factory.get(f"/api/v1/log?after={after}")
+        response = FlightViewSet.as_view({"get": "get_log_file"})(request)
+        time.sleep(1)
+        request = self.factory.get(f"/api/v1/log/status?id={response.data['id']}")
+        response = FlightViewSet.as_view({"get": "get_log_file_status"})(request)
+
+        self.assertEqual(response.data["result"]["after"], after)
+        self.assertEqual(response.data["result"]["watermark"], new_passenger_id)
+
+    def test_get_log_file_validation_error(self):
+        request = self.factory.get("/api/v1/log?after=-5")
+        response = FlightViewSet.as_view({"get": "get_log_file"})(request)
+
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+
     def test_get_log_file_status_validation_error(self):
         desired_response_data = {
             "errors": {
@@ -239,3 +641,64 @@ class SpaceFlightControlSystemTests(APITestCase):
         response = FlightViewSet.as_view({"get": "get_log_file_status"})(request)
 
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_get_log_file_status_long_poll(self):
+        request = self.factory.get("/api/v1/log")
+        op_id = FlightViewSet.as_view({"get": "get_log_file"})(request).data["id"]
+
+        request = self.factory.get(f"/api/v1/log/status?id={op_id}&wait=10")
+        response = FlightViewSet.as_view({"get": "get_log_file_status"})(request)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["done"], True)
+        self.assertEqual(response.data["result"]["path"], "static/log/passengers.csv")
+
+    def test_get_log_file_status_long_poll_timeout(self):
+        ops_service = FlightViewSet.ops_service
+        op_id = uuid4()
+        ops_service._register_operation(Operation(op_id))
+
+        request = self.factory.get(f"/api/v1/log/status?id={op_id}&wait=0.05")
+        response = FlightViewSet.as_view({"get": "get_log_file_status"})(request)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["done"], False)
+
+    def test_get_log_file_status_event_stream(self):
+        ops_service = FlightViewSet.ops_service
+        op_id = uuid4()
+        ops_service._register_operation(Operation(op_id))
+        threading.Timer(0.1, ops_service.finish_operation, (op_id, {"path": "static/log/passengers.csv"})).start()
+
+        request = self.factory.get(f"/api/v1/log/status?id={op_id}", HTTP_ACCEPT="text/event-stream")
+        response = FlightViewSet.as_view({"get": "get_log_file_status"})(request)
+        events = b"".join(response.streaming_content).decode().strip().split("\n\n")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        self.assertEqual(len(events), 2)
+        self.assertTrue(events[0].startswith("event: operation\ndata: "))
+        self.assertEqual(json.loads(events[0].split("data: ")[1])["done"], False)
+        self.assertEqual(json.loads(events[1].split("data: ")[1])["done"], True)
+
+    def test_get_log_file_status_expired(self):
+        ops_service = FlightViewSet.ops_service
+        op_id = uuid4()
+        ops_service._register_operation(Operation(op_id))
+        ops_service.finish_operation(op_id, {"path": "static/log/passengers.csv"})
+
+        expired_at = time.monotonic() + ops_service.ttl + 1
+        with patch("flight.services.operation_service.time.monotonic", return_value=expired_at):
+            request = self.factory.get(f"/api/v1/log/status?id={op_id}")
+            response = FlightViewSet.as_view({"get": "get_log_file_status"})(request)
+
+        self.assertEqual(response.status_code, status.HTTP_410_GONE)
+        self.assertEqual(response.data, {"id": str(op_id), "status": "expired"})
+
+    def test_get_operation_stats(self):
+        request = self.factory.get("/api/v1/operation/stats/")
+        response = FlightViewSet.as_view({"get": "get_operation_stats"})(request)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["ttl"], FlightViewSet.ops_service.ttl)
+        self.assertIn("evicted_operations", response.data)
@@ -0,0 +1,117 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from flight.models import FlightStatus
+from flight.services import AlreadyBookedError
+
+
+class FlightServiceCases:
+    """
+    Test cases every flight storage engine must pass, mixed into a TestCase whose setUp creates self.service
+    """
+
+    def test_get_flight(self):
+        added_flight_id = self.service.add_flight('Earth', 'Mars', 20)
+        flight = self.service.get_flight(added_flight_id)
+
+        self.assertEqual(flight.departure_location, 'Earth')
+        self.assertEqual(flight.arrival_location, 'Mars')
+        self.assertEqual(flight.max_capacity, 20)
+        self.assertEqual(flight.status, FlightStatus.AVAILABLE_FOR_REGISTRATION.value)
+
+    def test_buy_ticket_flight_not_found(self):
+        self.assertRaises(IndexError, self.service.buy_ticket, 0, 0)
+
+    def test_buy_ticket_already_booked(self):
+        added_flight_id = self.service.add_flight('Earth', 'Mars', 20)
+        self.service.buy_ticket(added_flight_id, 0)
+
+        self.assertRaises(AlreadyBookedError, self.service.buy_ticket, added_flight_id, 0)
+        self.assertEqual(self.service.count_passengers(added_flight_id), 1)
+
+    def test_has_ticket(self):
+        added_flight_id = self.service.add_flight('Earth', 'Mars', 20)
+        self.service.buy_ticket(added_flight_id, 5)
+
+        self.assertEqual(self.service.has_ticket(added_flight_id, 5), True)
+        self.assertEqual(self.service.has_ticket(added_flight_id, 6), False)
+
+    def test_flights_by_status(self):
+        flight_ids = [self.service.add_flight('Earth', 'Mars', 20) for _ in range(5)]
+        self.service.change_flight_status(flight_ids[3], FlightStatus.DELAYED.value)
+        self.service.change_flight_status(flight_ids[1], FlightStatus.DELAYED.value)
+        self.service.change_flight_status(flight_ids[3], FlightStatus.ON_THE_WAY.value)
+        self.service.change_flight_status(-1, FlightStatus.DELAYED.value)
+
+        self.assertEqual(self.service.flights_by_status(FlightStatus.DELAYED.value), [flight_ids[1], flight_ids[4]])
+        self.assertEqual(self.service.flights_by_status(FlightStatus.ON_THE_WAY.value), [flight_ids[3]])
+        self.assertEqual(
+            self.service.flights_by_status(FlightStatus.AVAILABLE_FOR_REGISTRATION.value, after=flight_ids[0], limit=1),
+            [flight_ids[2]],
+        )
+        self.assertEqual(self.service.flights_by_status(FlightStatus.ARRIVED.value), [])
+
+    def test_are_delayed(self):
+        flight_ids = [self.service.add_flight('Earth', 'Mars', 20) for _ in range(2)]
+        self.service.change_flight_status(flight_ids[1], FlightStatus.DELAYED.value)
+
+        self.assertEqual(self.service.are_delayed([flight_ids[1], flight_ids[0], 99]), [True, False, None])
+
+    def test_search_flights(self):
+        flight_ids = [
+            self.service.add_flight('Earth', 'Mars', 2),
+            self.service.add_flight('Mars', 'Earth', 2),
+            self.service.add_flight('Earth', 'Mars', 1),
+            self.service.add_flight('Earth', 'Mars', 3),
+        ]
+        self.service.buy_ticket(flight_ids[0], 0)
+        self.service.buy_ticket(flight_ids[2], 0)
+
+        self.assertEqual(self.service.search_flights('Earth', 'Mars'), [(flight_ids[0], 1), (flight_ids[3], 3)])
+        self.assertEqual(self.service.search_flights('Earth', 'Mars', after=flight_ids[0], limit=1), [(flight_ids[3], 3)])
+        self.assertEqual(self.service.search_flights('Earth', 'Mars', limit=1), [(flight_ids[0], 1)])
+        self.assertEqual(self.service.search_flights('Mars', 'Earth'), [(flight_ids[1], 2)])
+        self.assertEqual(self.service.search_flights('Earth', 'Venus'), [])
+
+        self.service.buy_ticket(flight_ids[0], 1)
+        self.assertEqual(self.service.search_flights('Earth', 'Mars'), [(flight_ids[3], 3)])
+
+    def test_list_flights(self):
+        flight_ids = [self.service.add_flight('Earth', location, 2) for location in ('Mars', 'Venus', 'Moon')]
+        self.service.buy_ticket(flight_ids[1], 7)
+
+        page = self.service.list_flights(limit=2)
+        self.assertEqual([(flight_id, count) for flight_id, _, count in page], [(flight_ids[0], 0), (flight_ids[1], 1)])
+        page = self.service.list_flights(after=page[-1][0], limit=2)
+        self.assertEqual([(flight_id, flight.arrival_location) for flight_id, flight, _ in page], [(flight_ids[2], 'Moon')])
+        self.assertEqual(self.service.list_flights(after=flight_ids[0], limit=1)[0][2], 1)
+        self.assertEqual(self.service.list_flights(after=flight_ids[2]), [])
+
+    def test_get_itinerary(self):
+        flight_ids = [self.service.add_flight('Earth', 'Mars', 1) for _ in range(3)]
+        self.service.buy_ticket(flight_ids[2], 5)
+        self.service.buy_ticket(flight_ids[0], 5)
+        self.assertRaises(ValueError, self.service.buy_ticket, flight_ids[0], 6)
+
+        self.assertEqual(self.service.get_itinerary(5), [flight_ids[0], flight_ids[2]])
+        self.assertEqual(self.service.get_itinerary(6), [])
+
+    def test_buy_ticket_concurrent_never_oversells(self):
+        flight_ids = [self.service.add_flight('Earth', 'Mars', 50) for _ in range(10)]
+
+        def buy(thread: int) -> int:
+            sold = 0
+            for i in range(200):
+                try:
+                    self.service.buy_ticket(flight_ids[i % 10], thread * 1000 + i)
+                    sold += 1
+                except ValueError:
+                    pass
+            return sold
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            sold = sum(executor.map(buy, range(8)))
+
+        self.assertEqual(sold, 500)
+        for flight_id in flight_ids:
+            self.assertEqual(self.service.count_passengers(flight_id), 50)
+            self.assertEqual(len(set(self.service.get_flight(flight_id).passengers)), 50)
@@ -0,0 +1,74 @@
+from django.test import TestCase
+
+from flight.models import FlightStatus
+from flight.services import ColumnarFlightService
+from flight.tests.unit_tests.flight_service_cases import FlightServiceCases
+
+
+class ColumnarFlightServiceTest(FlightServiceCases, TestCase):
+    def setUp(self) -> None:
+        self.service = ColumnarFlightService()
+
+    def test_add_flight_interns_locations(self):
+        self.service.add_flight('Earth', 'Mars', 20)
+        self.service.add_flight('Mars', 'Earth', 20)
+
+        self.assertEqual(self.service.locations, ['Earth', 'Mars'])
+
+    def test_add_flight_invalid_capacity(self):
+        self.assertRaises(ValueError, self.service.add_flight, 'Earth', 'Mars', 0)
+
+    def test_rejected_flight_keeps_columns_aligned(self):
+        self.assertRaises(ValueError, self.service.add_flight, 'Venus', 'Pluto', 2 ** 32)
+        added_flight_id = self.service.add_flight('Moon', 'Titan', 20)
+        flight = self.service.get_flight(added_flight_id)
+
+        self.assertEqual(added_flight_id, 0)
+        self.assertEqual((flight.departure_location, flight.arrival_location), ('Moon', 'Titan'))
+        self.assertEqual({len(self.service.departures), len(self.service.arrivals), len(self.service.capacities)}, {1})
+
+    def test_change_flight_status(self):
+        added_flight_id = self.service.add_flight('Earth', 'Mars', 20)
+        status = FlightStatus.DELAYED.value
+
+        self.assertEqual(self.service.change_flight_status(added_flight_id, status), True)
+        self.assertEqual(self.service.get_flight(added_flight_id).status, status)
+
+    def test_change_flight_status_not_found(self):
+        self.assertEqual(self.service.change_flight_status(0, ''), False)
+
+    def test_change_flight_status_unknown_status(self):
+        added_flight_id = self.service.add_flight('Earth', 'Mars', 20)
+
+        self.assertRaises(ValueError, self.service.change_flight_status, added_flight_id, 'LOST')
+
+    def test_buy_ticket(self):
+        added_flight_id = self.service.add_flight('Earth', 'Mars', 20)
+        passenger_id = 0
+
+        self.service.buy_ticket(added_flight_id, passenger_id)
+
+        self.assertEqual(self.service.get_flight(added_flight_id).passengers, [passenger_id])
+
+    def test_buy_ticket_flight_full(self):
+        added_flight_id = self.service.add_flight('Earth', 'Mars', 1)
+        self.service.buy_ticket(added_flight_id, 0)
+
+        self.assertRaises(ValueError, self.service.buy_ticket, added_flight_id, 1)
+
+    def test_has_ticket_flight_not_found(self):
+        self.assertRaises(IndexError, self.service.has_ticket, 0, 0)
+
+    def test_is_delayed_true(self):
+        added_flight_id = self.service.add_flight('Earth', 'Mars', 20)
+        self.service.change_flight_status(added_flight_id, FlightStatus.DELAYED.value)
+
+        self.assertEqual(self.service.is_delayed(added_flight_id), True)
+
+    def test_is_delayed_false(self):
+        added_flight_id = self.service.add_flight('Earth', 'Mars', 20)
+
+        self.assertEqual(self.service.is_delayed(added_flight_id), False)
+
+    def test_is_delayed_not_found(self):
+        self.assertRaises(IndexError, self.service.is_delayed, 0)
@@ -0,0 +1,136 @@
+import gzip
+
+from django.test import TestCase
+
+from flight.http import RangeNotSatisfiable, accepts_encoding, parse_byte_range
+from flight.services import ExportService, LogService, PassengerService
+from flight.services import export_service
+
+
+class ExportServiceTest(TestCase):
+    def setUp(self) -> None:
+        self.passenger_service = PassengerService()
+        self.service = ExportService(self.passenger_service, chunk_size=10)
+
+    def add_passengers(self, count: int) -> None:
+        for i in range(count):
+            self.passenger_service.add_passenger(f"Elon{i}", "Musk")
+
+    def test_iter_bytes(self):
+        self.add_passengers(2)
+        export = b"".join(self.service.iter_bytes(self.service.snapshot()))
+        self.assertEqual(export, b"id;name;surname\n0;Elon0;Musk\n1;Elon1;Musk\n")
+
+    def test_iter_bytes_escapes_separator(self):
+        self.passenger_service.add_passenger('Elon "X"', "Musk;Jr")
+        export = b"".join(self.service.iter_bytes(1))
+        self.assertEqual(export, b'id;name;surname\n0;"Elon ""X""";"Musk;Jr"\n')
+
+    def test_snapshot_ignores_later_passengers(self):
+        self.add_passengers(1)
+        rows = self.service.snapshot()
+        self.add_passengers(1)
+        self.assertEqual(b"".join(self.service.iter_bytes(rows)), b"id;name;surname\n0;Elon0;Musk\n")
+
+    def test_content_length(self):
+        self.add_passengers(5)
+        for rows in (5, 2, 0):
+            self.assertEqual(self.service.content_length(rows), len(b"".join(self.service.iter_bytes(rows))))
+
+    def test_iter_bytes_range(self):
+        export_service.CHECKPOINT_ROWS, checkpoint_rows = 4, export_service.CHECKPOINT_ROWS
+        self.addCleanup(setattr, export_service, "CHECKPOINT_ROWS", checkpoint_rows)
+        self.add_passengers(30)
+        full = b"".join(self.service.iter_bytes(30))
+        for first, last in [(0, 0), (5, 40), (200, 300), (len(full) - 3, len(full) + 10)]:
+            self.assertEqual(b"".join(self.service.iter_bytes(30, first, last)), full[first:last + 1])
+
+    def test_iter_bytes_incremental(self):
+        self.add_passengers(3)
+        export = b"".join(self.service.iter_bytes(3, first_row=1))
+        self.assertEqual(export, b"id;name;surname\n1;Elon1;Musk\n2;Elon2;Musk\n")
+        self.assertEqual(self.service.content_length(3, first_row=1), len(export))
+        self.assertEqual(b"".join(self.service.iter_bytes(3, 20, 30, first_row=1)), export[20:31])
+
+    def test_record_export(self):
+        self.add_passengers(3)
+        self.assertEqual(self.service.record_export(), {"path": None, "segments": [], "after": -1, "watermark": 2})
+        self.add_passengers(2)
+        self.assertEqual(self.service.record_export(2), {"path": None, "segments": [], "after": 2, "watermark": 4})
+        self.assertEqual(self.service.record_export(4)["watermark"], 4)
+
+    def test_record_export_lists_rotated_segments(self):
+        log_service = LogService(log_file_name="test_export_segments.csv", rotate_rows=2)
+        service = ExportService(self.passenger_service, log_service)
+        for passenger_id in range(5):
+            self.passenger_service.add_passenger(f"Elon{passenger_id}", "Musk")
+            log_service.write_entry(f"Elon{passenger_id}", "Musk", passenger_id=passenger_id)
+
+        export = service.record_export(2)
+
+        self.assertEqual([segment["segment"] for segment in export["segments"]], [2, 3])
+        self.assertEqual(export["segments"][-1]["file"], export["path"])
+        self.assertEqual([segment["segment"] for segment in service.record_export()["segments"]], [1, 2, 3])
+
+    def test_iter_gzip(self):
+        self.add_passengers(50)
+        compressed = b"".join(self.service.iter_gzip(50))
+        self.assertEqual(gzip.decompress(compressed), b"".join(self.service.iter_bytes(50)))
+
+    def test_cached_gzip(self):
+        self.add_passengers(5)
+        self.assertEqual(self.service.cached_gzip(5), None)
+        compressed = b"".join(self.service.iter_gzip(5))
+        self.assertEqual(self.service.cached_gzip(5), compressed)
+        self.add_passengers(1)
+        self.assertEqual(self.service.cached_gzip(6), None)
+
+    def test_cached_gzip_built_by_one_request(self):
+        self.add_passengers(50)
+        first = self.service.iter_gzip(50)
+        next(first)
+        second = b"".join(self.service.iter_gzip(50))  # streamed while the first one is still buffering
+        self.assertEqual(self.service.cached_gzip(50), None)
+        rest = b"".join(first)
+        self.assertEqual(gzip.decompress(self.service.cached_gzip(50)), gzip.decompress(second))
+        self.assertEqual(self.service.cached_gzip(50).endswith(rest), True)
+    def test_cached_gzip_skips_incremental_exports(self):
+        self.add_passengers(5)
+        b"".join(self.service.iter_gzip(5, first_row=2))
+        self.assertEqual(self.service.cached_gzip(5, first_row=2), None)
+
+    def test_etag_changes_with_passengers(self):
+        etag = self.service.etag(self.service.snapshot())
+        self.add_passengers(1)
+        self.assertNotEqual(self.service.etag(self.service.snapshot()), etag)
+
+    def test_etag_changes_with_instance(self):
+        self.add_passengers(1)
+        restarted = ExportService(PassengerService())
+        restarted.passenger_service.add_passenger("Elon0", "Musk")
+        self.assertNotEqual(restarted.etag(restarted.snapshot()), self.service.etag(self.service.snapshot()))
+
+
+class ParseByteRangeTest(TestCase):
+    def test_parse_byte_range(self):
+        self.assertEqual(parse_byte_range("bytes=0-9", 100), (0, 9))
+        self.assertEqual(parse_byte_range("bytes=90-", 100), (90, 99))
+        self.assertEqual(parse_byte_range("bytes=-10", 100), (90, 99))
+        self.assertEqual(parse_byte_range("bytes=50-500", 100), (50, 99))
+
+    def test_parse_byte_range_ignored(self):
+        self.assertEqual(parse_byte_range(None, 100), None)
+        self.assertEqual(parse_byte_range("bytes=0-1,5-6", 100), None)
+        self.assertEqual(parse_byte_range("bytes=9-0", 100), None)
+        self.assertEqual(parse_byte_range("items=0-1", 100), None)
+
+    def test_accepts_encoding(self):
+        self.assertEqual(accepts_encoding("gzip, deflate, br", "gzip"), True)
+        self.assertEqual(accepts_encoding("deflate, *;q=0.5", "gzip"), True)
+        self.assertEqual(accepts_encoding("gzip;q=0, *", "gzip"), False)
+        self.assertEqual(accepts_encoding("deflate", "gzip"), False)
+        self.assertEqual(accepts_encoding(None, "gzip"), False)
+
+    def test_parse_byte_range_not_satisfiable(self):
+        self.assertRaises(RangeNotSatisfiable, parse_byte_range, "bytes=100-", 100)
+        self.assertRaises(RangeNotSatisfiable, parse_byte_range, "bytes=-0", 100)
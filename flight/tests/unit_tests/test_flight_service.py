@@ -1,10 +1,13 @@
+from concurrent.futures import ThreadPoolExecutor
+
 from django.test import TestCase
 
-from flight.models import Flight, FlightStatus
+from flight.models import Flight, FlightStatus, TicketPurchaseStatus
 from flight.services import FlightService
+from flight.tests.unit_tests.flight_service_cases import FlightServiceCases
 
 
-class FlightServiceTest(TestCase):
+class FlightServiceTest(FlightServiceCases, TestCase):
     def setUp(self) -> None:
         self.service = FlightService()
 
@@ -51,6 +54,32 @@ class FlightServiceTest(TestCase):
 
         self.assertRaises(ValueError, self.service.buy_ticket, added_flight_id, passenger_id)
 
+    def test_buy_tickets(self):
+        self.service.flights = [Flight('Earth', 'Mars', 1)]
+
+        results = self.service.buy_tickets([(0, 0), (0, 0), (0, 1), (1, 0), (0, 2)], passenger_exists=lambda p: p < 2)
+
+        self.assertEqual(results, [
+            TicketPurchaseStatus.OK.value,
+            TicketPurchaseStatus.ALREADY_BOOKED.value,
+            TicketPurchaseStatus.FULL.value,
+            TicketPurchaseStatus.NOT_FOUND.value,
+            TicketPurchaseStatus.NOT_FOUND.value,
+        ])
+        self.assertEqual(self.service.flights[0].passengers, [0])
+
+    def test_has_ticket_flight_not_found(self):
+        self.assertRaises(IndexError, self.service.has_ticket, 0, 0)
+
+    def test_count_passengers(self):
+        flight = Flight('Earth', 'Mars', 20)
+        self.service.flights = [flight]
+        added_flight_id = 0
+        self.service.buy_ticket(added_flight_id, 0)
+        self.service.buy_ticket(added_flight_id, 1)
+
+        self.assertEqual(self.service.count_passengers(added_flight_id), 2)
+
     def test_is_delayed_true(self):
         flight = Flight('Earth', 'Mars', 20)
         flight.status = FlightStatus.DELAYED.value
@@ -65,3 +94,9 @@ class FlightServiceTest(TestCase):
         added_flight_id = 0
 
         self.assertEqual(self.service.is_delayed(added_flight_id), False)
+
+    def test_add_flight_concurrent_unique_ids(self):
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            flight_ids = list(executor.map(lambda _: self.service.add_flight('Earth', 'Mars', 1), range(1000)))
+
+        self.assertEqual(sorted(flight_ids), list(range(1000)))
@@ -0,0 +1,83 @@
+import io
+import os
+import tempfile
+import uuid
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+
+from flight.ingest import extend_id_ranges, ingest_flights, ingest_passengers
+from flight.services import FlightService, LogService, PassengerService, SharedFlightService
+
+
+class IngestTest(TestCase):
+    def test_extend_id_ranges(self):
+        self.assertEqual(extend_id_ranges([[0, 1]], [2, 3, 7, 8, 10]), [[0, 3], [7, 8], [10, 10]])
+
+    def test_ingest_flights(self):
+        service = FlightService()
+        lines = [
+            b'{"departure_location": "Earth", "arrival_location": "Mars", "max_capacity": 2}\n',
+            b'\n',
+            b'{"departure_location": "Earth"}\n',
+            b'[1, 2]\n',
+            b'{broken\n',
+            b'{"departure_location": "Mars", "arrival_location": "Earth"}\n',
+        ]
+
+        report = ingest_flights(lines, service)
+
+        self.assertEqual(report["created"], 2)
+        self.assertEqual(report["id_ranges"], [[0, 1]])
+        self.assertEqual([error["line"] for error in report["errors"]], [3, 4, 5])
+        self.assertEqual(service.flights[0].max_capacity, 2)
+        self.assertEqual(service.flights[1].max_capacity, 50)
+
+    def test_ingest_flights_rejected_by_service(self):
+        service = SharedFlightService(f"test_ingest_{uuid.uuid4().hex[:12]}", max_flights=1, max_seats=100)
+        self.addCleanup(service.close)
+        self.addCleanup(service.unlink)
+        lines = [
+            b'{"departure_location": "Earth", "arrival_location": "Mars", "max_capacity": 2}\n',
+            b'{"departure_location": "Mars", "arrival_location": "Earth"}\n',
+            b'{"departure_location": "Mars"}\n',
+        ]
+
+        report = ingest_flights(lines, service)
+
+        self.assertEqual(report["created"], 1)
+        self.assertEqual(
+            report["errors"][0], {"line": 2, "errors": {"non_field_errors": ["Shared flight storage is full"]}},
+        )
+        self.assertEqual([error["line"] for error in report["errors"]], [2, 3])
+
+    def test_ingest_passengers_batches_log_writes(self):
+        passenger_service = PassengerService()
+        log_service = LogService(log_file_name="test_ingest.csv")
+        lines = ['{"name": "Elon", "surname": "Musk"}\n'] * 3
+
+        report = ingest_passengers(lines, passenger_service, log_service)
+
+        self.assertEqual(report, {"created": 3, "id_ranges": [[0, 2]], "errors": []})
+        with open(log_service.log_file) as csv_file:
+            self.assertEqual(csv_file.readlines()[1:], ["Elon;Musk\n"] * 3)
+
+    def test_ingest_command_refuses_in_memory_storage(self):
+        with override_settings(FLIGHT_STORAGE_ENGINE="objects", JOURNAL={"ENABLED": False}):
+            self.assertRaises(CommandError, call_command, "ingest", "flights", "-")
+
+    def test_ingest_command_loads_shared_storage(self):
+        name = f"test_ingest_{uuid.uuid4().hex[:12]}"
+        options = {"NAME": name, "MAX_FLIGHTS": 16, "MAX_SEATS": 1000}
+        with tempfile.NamedTemporaryFile("w", suffix=".ndjson", delete=False) as ndjson:
+            ndjson.write('{"departure_location": "Earth", "arrival_location": "Mars", "max_capacity": 2}\n')
+        self.addCleanup(os.remove, ndjson.name)
+        stdout = io.StringIO()
+        with override_settings(FLIGHT_STORAGE_ENGINE="shared_memory", FLIGHT_STORAGE_OPTIONS=options):
+            call_command("ingest", "flights", ndjson.name, stdout=stdout)
+
+        service = SharedFlightService(name, max_flights=16, max_seats=1000)
+        self.addCleanup(service.close)
+        self.addCleanup(service.unlink)
+        self.assertEqual(service.get_flight(0).arrival_location, "Mars")
+        self.assertIn('"created": 1', stdout.getvalue())
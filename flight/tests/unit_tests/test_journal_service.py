@@ -0,0 +1,107 @@
+import os
+import tempfile
+
+from django.test import TestCase
+
+from flight.models import FlightStatus
+from flight.services import ColumnarFlightService, FlightService, JournalService, PassengerService
+
+
+class JournalServiceTest(TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def open(self, snapshot_records: int = 0, flight_service_class: type[FlightService] = FlightService):
+        journal = JournalService(self.directory.name, snapshot_records=snapshot_records)
+        flight_service, passenger_service = journal.recover(flight_service_class(), PassengerService())
+        return journal, flight_service, passenger_service
+
+    def fill(self, flight_service, passenger_service) -> None:
+        flight_service.add_flight('Earth', 'Mars', 2)
+        flight_service.add_flight('Mars', 'Venus', 5)
+        for name in ('Yuri', 'Elon', 'Water'):
+            passenger_service.add_passenger(name, 'Rock')
+        flight_service.buy_ticket(0, 2)
+        flight_service.buy_ticket(0, 0)
+        flight_service.buy_ticket(1, 1)
+        flight_service.change_flight_status(1, FlightStatus.DELAYED.value)
+
+    def assertRecovered(self, flight_service, passenger_service) -> None:
+        self.assertEqual(
+            [(f.departure_location, f.arrival_location, f.max_capacity, f.status, list(f.passengers))
+             for f in flight_service.flights],
+            [
+                ('Earth', 'Mars', 2, FlightStatus.AVAILABLE_FOR_REGISTRATION.value, [2, 0]),
+                ('Mars', 'Venus', 5, FlightStatus.DELAYED.value, [1]),
+            ],
+        )
+        self.assertEqual([p.name for _, p in passenger_service.iter_passengers()], ['Yuri', 'Elon', 'Water'])
+
+    def test_recover_from_journal(self):
+        journal, flight_service, passenger_service = self.open()
+        self.fill(flight_service, passenger_service)
+        journal.close()
+
+        journal, flight_service, passenger_service = self.open()
+        self.assertRecovered(flight_service, passenger_service)
+        self.assertEqual(journal.recovery_stats["replayed_records"], 9)
+        journal.close()
+
+    def test_failed_mutations_are_not_journaled(self):
+        journal, flight_service, passenger_service = self.open()
+        flight_service.add_flight('Earth', 'Mars', 1)
+        flight_service.buy_ticket(0, 0)
+        self.assertRaises(ValueError, flight_service.buy_ticket, 0, 1)
+        self.assertEqual(flight_service.buy_tickets([(0, 0), (3, 0)]), ["ALREADY_BOOKED", "NOT_FOUND"])
+        self.assertEqual(flight_service.change_flight_status(3, FlightStatus.DELAYED.value), False)
+
+        self.assertEqual(journal.records, 2)
+        journal.close()
+
+    def test_rejected_flight_is_not_added(self):
+        journal, flight_service, passenger_service = self.open()
+        flight_service.add_flight('Earth', 'Mars', 2)
+        self.assertRaises(ValueError, flight_service.add_flight, 'Venus', 'Pluto', 2 ** 32)
+        self.assertRaises(ValueError, flight_service.add_flight, 'Venus' * 20_000, 'Pluto', 2)
+        self.assertEqual(len(flight_service.flights), 1)
+        self.assertEqual(journal.records, 1)
+        flight_id = flight_service.add_flight('Mars', 'Venus', 5)
+        flight_service.buy_ticket(flight_id, 1)
+        journal.close()
+
+        journal, flight_service, passenger_service = self.open()
+        self.assertEqual(
+            [(f.departure_location, list(f.passengers)) for f in flight_service.flights], [('Earth', []), ('Mars', [1])],
+        )
+        journal.close()
+
+    def test_recover_from_snapshot_and_tail(self):
+        journal, flight_service, passenger_service = self.open(snapshot_records=4)
+        self.fill(flight_service, passenger_service)
+        journal.close()
+
+        self.assertEqual(sorted(os.listdir(self.directory.name)), ['journal.000002.bin', 'snapshot.bin'])
+        journal, flight_service, passenger_service = self.open(flight_service_class=ColumnarFlightService)
+        self.assertRecovered(flight_service, passenger_service)
+        self.assertEqual(journal.recovery_stats["generation"], 2)
+        self.assertEqual(journal.recovery_stats["replayed_records"], 1)
+        journal.close()
+
+    def test_torn_tail_is_cut_off(self):
+        journal, flight_service, passenger_service = self.open()
+        self.fill(flight_service, passenger_service)
+        journal.close()
+        with open(journal.journal_file(0), "ab") as journal_file:
+            journal_file.write(b"\x03\x10\x00")
+
+        journal, flight_service, passenger_service = self.open()
+        self.assertRecovered(flight_service, passenger_service)
+        flight_service.buy_ticket(1, 2)
+        journal.close()
+
+        journal, flight_service, passenger_service = self.open()
+        self.assertEqual(flight_service.get_flight(1).passengers, [1, 2])
+        journal.close()
@@ -1,3 +1,8 @@
+import json
+import os
+import time
+from unittest.mock import patch
+
 from django.conf import settings
 from django.test import TestCase
 
@@ -27,6 +32,223 @@ class LogServiceTest(TestCase):
             self.assertEqual(row_names, columns)
             self.assertEqual(log_entry, ";".join(passenger.__dict__.values())+"\n")
 
+    def test_write_entries_success(self):
+        self.service.write_entries([("Elon", "Musk"), ("Water", "Rock")])
+        with open(self.service.log_file) as csv_file:
+            self.assertEqual(csv_file.readlines()[1:], ["Elon;Musk\n", "Water;Rock\n"])
+
+    def test_stats(self):
+        self.service.write_entry("Elon", "Musk")
+        stats = self.service.stats()
+        self.assertEqual(stats["mode"], "direct")
+        self.assertEqual(stats["queue_depth"], 0)
+        self.assertEqual(stats["written_rows"], 1)
+
     def test_get_log_file_path_success(self):
         file_path = (settings.STATIC_URL + "log/" + self.log_file_name)[1:]
         self.assertEqual(self.service.get_log_file_path(), file_path)
+
+
+class BufferedLogServiceTest(TestCase):
+    def setUp(self) -> None:
+        self.service = LogService(log_file_name="test_buffered_log_service.csv", mode="buffered", buffer_rows=3)
+
+    def tearDown(self) -> None:
+        self.service.close()
+
+    def read_entries(self) -> list[str]:
+        with open(self.service.log_file) as csv_file:
+            return csv_file.readlines()[1:]
+
+    def test_write_entry_buffers_rows(self):
+        self.service.write_entry("Elon", "Musk")
+        self.assertEqual(self.read_entries(), [])
+
+    def test_write_entry_flushes_on_buffer_size(self):
+        self.service.write_entries([("Elon", "Musk"), ("Water", "Rock")])
+        self.service.write_entry("Yuri", "Gagarin")
+        self.assertEqual(self.read_entries(), ["Elon;Musk\n", "Water;Rock\n", "Yuri;Gagarin\n"])
+
+    def test_write_entry_flushes_on_interval(self):
+        service = LogService(log_file_name="test_interval_log_service.csv", mode="buffered", flush_interval=0.05)
+        service.write_entry("Elon", "Musk")
+        time.sleep(0.3)
+        with open(service.log_file) as csv_file:
+            self.assertEqual(csv_file.readlines()[1:], ["Elon;Musk\n"])
+        service.close()
+
+    def test_close_flushes_and_falls_back_to_direct_writes(self):
+        self.service.write_entry("Elon", "Musk")
+        self.service.close()
+        self.service.write_entry("Water", "Rock")
+        self.assertEqual(self.read_entries(), ["Elon;Musk\n", "Water;Rock\n"])
+
+    def test_get_log_file_path_flushes(self):
+        self.service.write_entry("Elon", "Musk")
+        self.service.get_log_file_path()
+        self.assertEqual(self.read_entries(), ["Elon;Musk\n"])
+
+    def test_fsync_durability(self):
+        service = LogService(log_file_name="test_fsync_log_service.csv", mode="buffered", buffer_rows=1, durability="fsync")
+        service.write_entry("Elon", "Musk")
+        with open(service.log_file) as csv_file:
+            self.assertEqual(csv_file.readlines()[1:], ["Elon;Musk\n"])
+        service.close()
+
+    def test_unknown_mode(self):
+        self.assertRaises(ValueError, LogService, log_file_name="test_unknown.csv", mode="later")
+
+
+class AsyncLogServiceTest(TestCase):
+    def setUp(self) -> None:
+        self.service = LogService(log_file_name="test_async_log_service.csv", mode="async")
+
+    def tearDown(self) -> None:
+        self.service.close()
+
+    def read_entries(self, service: LogService) -> list[str]:
+        with open(service.log_file) as csv_file:
+            return csv_file.readlines()[1:]
+
+    def test_write_entry_written_by_writer_thread(self):
+        self.service.write_entry("Elon", "Musk")
+        self.service.write_entries([("Water", "Rock")])
+        self.service.flush()
+        self.assertEqual(self.read_entries(self.service), ["Elon;Musk\n", "Water;Rock\n"])
+        self.assertEqual(self.service.stats()["written_rows"], 2)
+
+    def test_close_drains_queue(self):
+        for _ in range(100):
+            self.service.write_entry("Elon", "Musk")
+        self.service.close()
+        self.assertEqual(len(self.read_entries(self.service)), 100)
+
+    def test_write_error_does_not_stop_writer(self):
+        with (
+            patch.object(self.service, "_append", side_effect=OSError("disk full")),
+            self.assertLogs("flight.services.log_service", "ERROR"),
+        ):
+            self.service.write_entry("Elon", "Musk")
+            self.service.flush()
+        self.service.write_entry("Water", "Rock")
+        self.service.flush()
+        self.assertEqual(self.service.stats()["write_errors"], 1)
+        self.assertEqual(self.read_entries(self.service), ["Water;Rock\n"])
+
+    def test_write_after_close_reaches_file(self):
+        self.service.write_entry("Elon", "Musk")
+        self.service.close()
+        self.service.write_entry("Water", "Rock")
+        self.assertEqual(self.read_entries(self.service), ["Elon;Musk\n", "Water;Rock\n"])
+
+    def blocked_service(self, backpressure: str) -> LogService:
+        service = LogService(
+            log_file_name=f"test_{backpressure}_log_service.csv",
+            mode="async",
+            queue_size=1,
+            backpressure=backpressure,
+        )
+        service._lock.acquire()  # stall the writer thread on its first batch
+        service.write_entry("Elon", "Musk")
+        while service.stats()["queue_depth"]:
+            time.sleep(0.01)
+        service.write_entry("Water", "Rock")  # fills the queue
+        return service
+
+    def test_backpressure_drop(self):
+        service = self.blocked_service("drop")
+        service.write_entry("Yuri", "Gagarin")
+        self.assertEqual(service.stats()["dropped_rows"], 1)
+        self.assertEqual(service.stats()["queue_depth"], 1)
+        service._lock.release()
+        service.close()
+        self.assertEqual(self.read_entries(service), ["Elon;Musk\n", "Water;Rock\n"])
+
+    def test_backpressure_spill(self):
+        service = self.blocked_service("spill")
+        service.write_entry("Yuri", "Gagarin")
+        service.write_entry("Valentina", "Tereshkova")
+        self.assertEqual(service.stats()["spilled_rows"], 2)
+        self.assertEqual(service.stats()["queue_depth"], 3)
+        self.assertFalse(service.try_write_entry("Neil", "Armstrong"))
+        service._lock.release()
+        service.flush()
+        self.assertEqual(service.stats()["queue_depth"], 0)
+        service.write_entry("Neil", "Armstrong")
+        service.close()
+        self.assertEqual(
+            self.read_entries(service),
+            ["Elon;Musk\n", "Water;Rock\n", "Yuri;Gagarin\n", "Valentina;Tereshkova\n", "Neil;Armstrong\n"],
+        )
+
+    def test_close_writes_spilled_rows(self):
+        service = self.blocked_service("spill")
+        service.write_entry("Yuri", "Gagarin")
+        service._lock.release()
+        service.close()
+        self.assertEqual(self.read_entries(service), ["Elon;Musk\n", "Water;Rock\n", "Yuri;Gagarin\n"])
+
+
+class RotatingLogServiceTest(TestCase):
+    def setUp(self) -> None:
+        self.service = LogService(log_file_name="test_rotating_log_service.csv", rotate_rows=2)
+
+    def write_passengers(self, count: int) -> None:
+        for passenger_id in range(count):
+            self.service.write_entry(f"Elon{passenger_id}", "Musk", passenger_id=passenger_id)
+
+    def test_rotate_on_rows(self):
+        self.write_passengers(5)
+        segments = self.service.get_segments()
+
+        self.assertEqual([segment["first_passenger_id"] for segment in segments], [0, 2, 4])
+        self.assertEqual([segment["last_passenger_id"] for segment in segments], [1, 3, 4])
+        self.assertEqual([segment["rows"] for segment in segments], [2, 2, 1])
+        for segment in segments:
+            self.assertEqual(segment["bytes"], os.path.getsize(segment["file"]))
+        with open(segments[1]["file"]) as segment_file:
+            self.assertEqual(segment_file.readlines(), ["name;surname\n", "Elon2;Musk\n", "Elon3;Musk\n"])
+
+    def test_rotate_on_bytes(self):
+        service = LogService(log_file_name="test_rotating_bytes_log_service.csv", rotate_bytes=30)
+        for passenger_id in range(4):
+            service.write_entry("Elon", "Musk", passenger_id=passenger_id)  # 10 bytes per row, 13 bytes header
+        self.assertEqual([segment["rows"] for segment in service.get_segments()], [2, 2, 0])
+
+    def test_manifest_written(self):
+        self.write_passengers(4)
+        with open(self.service.manifest_file) as manifest:
+            self.assertEqual(json.load(manifest), self.service.segments)
+        self.assertEqual(len(self.service.segments), 2)
+
+    def test_other_instance_keeps_segments(self):
+        self.write_passengers(3)
+        other = LogService(log_file_name="test_rotating_log_service.csv", rotate_rows=2)
+        self.assertEqual(os.path.exists(self.service.segments[0]["file"]), True)
+        self.assertEqual(os.path.exists(self.service.manifest_file), True)
+        self.assertNotEqual(other.manifest_file, self.service.manifest_file)
+
+    def test_remove_segments(self):
+        self.write_passengers(3)
+        segment_file = self.service.segments[0]["file"]
+        self.service._remove_segments()
+        self.assertEqual(os.path.exists(segment_file), False)
+        self.assertEqual(os.path.exists(self.service.manifest_file), False)
+
+    def test_out_of_order_rows(self):
+        for passenger_id in [0, 1, 3, 2, 4]:
+            self.service.write_entry(f"Elon{passenger_id}", "Musk", passenger_id=passenger_id)
+        segments = self.service.get_segments()
+
+        self.assertEqual([segment["ranges"] for segment in segments], [[[0, 1]], [[3, 3], [2, 2]], [[4, 4]]])
+        self.assertEqual([segment["segment"] for segment in self.service.get_segments(after=2)], [2, 3])
+        self.assertEqual([segment["segment"] for segment in self.service.get_segments(after=3)], [3])
+
+    def test_rotate_buffered(self):
+        service = LogService(log_file_name="test_rotating_buffered_log_service.csv", mode="buffered", rotate_rows=2)
+        service.write_entries([("Elon", "Musk")] * 3, passenger_ids=[0, 1, 2])
+        service.rotate()
+        self.assertEqual([segment["rows"] for segment in service.get_segments()], [3, 0])
+        service.write_entry("Water", "Rock", passenger_id=3)
+        service.close()
+        self.assertEqual([segment["segment"] for segment in service.get_segments(after=2)], [2])
@@ -1,3 +1,6 @@
+import threading
+import time
+from unittest.mock import patch
 from uuid import uuid4
 from django.test import TestCase
 
@@ -38,4 +41,159 @@ class TestOperationService(TestCase):
         op_id = self.service.execute_operation(lambda x: x+1, args=(0,))
         op = Operation(op_id)
 
-        self.assertEqual(self.service.operations.get(op_id), op)
\ No newline at end of file
+        self.assertEqual(self.service.operations.get(op_id), op)
+
+    def test_finished_operation_expires(self):
+        service = OperationService(ttl=10)
+        op_id = uuid4()
+        service._register_operation(Operation(op_id))
+        service.finish_operation(op_id, True)
+
+        with patch("flight.services.operation_service.time.monotonic", return_value=time.monotonic() + 11):
+            self.assertEqual(service.get_operation(op_id), None)
+            self.assertEqual(service.is_expired(op_id), True)
+            self.assertEqual(service.is_expired(uuid4()), False)
+            self.assertEqual(service.stats()["expired_operations"], 1)
+
+    def test_pending_operation_does_not_expire(self):
+        service = OperationService(ttl=10)
+        op_id = uuid4()
+        service._register_operation(Operation(op_id))
+
+        with patch("flight.services.operation_service.time.monotonic", return_value=time.monotonic() + 11):
+            self.assertEqual(service.get_operation(op_id), Operation(op_id))
+
+    def test_evict_least_recently_used_finished_operation(self):
+        service = OperationService(max_operations=3)
+        op_ids = [uuid4() for _ in range(4)]
+        for op_id in op_ids[:3]:
+            service._register_operation(Operation(op_id))
+            service.finish_operation(op_id, True)
+        service.get_operation(op_ids[0])
+        service._register_operation(Operation(op_ids[3]))
+
+        self.assertEqual(list(service.operations), [op_ids[2], op_ids[0], op_ids[3]])
+        self.assertEqual(service.is_expired(op_ids[1]), True)
+        stats = service.stats()
+        self.assertEqual({key: stats[key] for key in ("operations", "pending", "max_operations")}, {
+            "operations": 3,
+            "pending": 1,
+            "max_operations": 3,
+        })
+        self.assertEqual((stats["expired_operations"], stats["evicted_operations"]), (0, 1))
+
+    def test_evict_finished_before_pending(self):
+        service = OperationService(max_operations=2)
+        pending_id, finished_id, new_id = uuid4(), uuid4(), uuid4()
+        service._register_operation(Operation(pending_id))
+        service._register_operation(Operation(finished_id))
+        service.finish_operation(finished_id, True)
+        service._register_operation(Operation(new_id))
+
+        self.assertEqual(list(service.operations), [pending_id, new_id])
+
+    def test_execute_operation_in_pool(self):
+        service = OperationService(pools={
+            "default": {"KIND": "thread", "MAX_WORKERS": 1},
+            "exports": {"KIND": "thread", "MAX_WORKERS": 1},
+        })
+        done = threading.Event()
+        op_id = service.execute_operation(lambda x: done.set() or x + 1, args=(0,), pool="exports", priority=5)
+
+        self.assertTrue(done.wait(5))
+        for _ in range(50):
+            if service.get_operation(op_id).done:
+                break
+            time.sleep(0.01)
+        self.assertEqual(service.get_operation(op_id), Operation(op_id, True, 1))
+        self.assertEqual(service.stats()["pools"]["exports"]["completed_jobs"], 1)
+        self.assertEqual(service.stats()["pools"]["default"]["submitted_jobs"], 0)
+
+    def test_execute_operation_unknown_pool(self):
+        self.assertRaises(ValueError, self.service.execute_operation, lambda: None, pool="missing")
+
+    def test_pools_must_include_default(self):
+        self.assertRaises(ValueError, OperationService, pools={"exports": {"KIND": "thread"}})
+
+    def wait_done(self, service: OperationService, op_id) -> None:
+        for _ in range(100):
+            if service.get_operation(op_id).done:
+                return
+            time.sleep(0.01)
+        self.fail("operation did not finish")
+
+    def test_execute_operation_coalesces_pending_duplicates(self):
+        release = threading.Event()
+        calls = []
+
+        def export(after):
+            calls.append(after)
+            release.wait(5)
+            return after
+
+        op_id = self.service.execute_operation(export, args=(1,))
+        self.assertEqual(self.service.execute_operation(export, args=(1,)), op_id)
+        other_id = self.service.execute_operation(export, args=(2,))
+        uncoalesced_id = self.service.execute_operation(export, args=(1,), coalesce=False)
+        release.set()
+        for operation_id in (op_id, other_id, uncoalesced_id):
+            self.wait_done(self.service, operation_id)
+
+        self.assertEqual(len({op_id, other_id, uncoalesced_id}), 3)
+        self.assertEqual(sorted(calls), [1, 1, 2])
+        self.assertEqual(self.service.stats()["coalesced_operations"], 1)
+        self.assertNotEqual(self.service.execute_operation(export, args=(1,)), op_id)
+
+    def test_execute_operation_reuses_recent_result(self):
+        service = OperationService(reuse_seconds=60)
+        op_id = service.execute_operation(pow, args=(2, 3))
+        self.wait_done(service, op_id)
+
+        self.assertEqual(service.execute_operation(pow, args=(2, 3)), op_id)
+        self.assertEqual(service.stats()["reused_results"], 1)
+        with patch("flight.services.operation_service.time.monotonic", return_value=time.monotonic() + 61):
+            self.assertNotEqual(service.execute_operation(pow, args=(2, 3)), op_id)
+
+    def test_failed_operation_is_not_coalesced(self):
+        service = OperationService(reuse_seconds=60)
+        op_id = service.execute_operation(int, args=("not a number",))
+        for _ in range(100):
+            if op_id not in service._operation_keys:
+                break
+            time.sleep(0.01)
+
+        self.assertNotEqual(service.execute_operation(int, args=("not a number",)), op_id)
+
+    def test_execute_operation_rejects_unpicklable_process_job(self):
+        service = OperationService(pools={"default": {"KIND": "process", "MAX_WORKERS": 1}})
+        self.addCleanup(service.pools["default"].executor.shutdown)
+
+        self.assertRaises(ValueError, service.execute_operation, lambda: 1)
+        self.assertRaises(ValueError, service.check_operation, pow, pool="missing")
+        self.assertEqual(service.stats()["operations"], 0)
+
+    def test_failed_operation_is_done_with_error(self):
+        service = OperationService(ttl=60)
+        op_id = service.execute_operation(int, args=("not a number",))
+
+        op = service.wait_operation(op_id, 10)
+        self.assertEqual(op.done, True)
+        self.assertEqual(op.result, {"error": "ValueError: invalid literal for int() with base 10: 'not a number'"})
+        with patch("flight.services.operation_service.time.monotonic", return_value=time.monotonic() + 61):
+            self.assertEqual(service.get_operation(op_id), None)
+
+    def test_wait_operation_wakes_on_finish(self):
+        op_id = uuid4()
+        self.service._register_operation(Operation(op_id))
+        threading.Timer(0.05, self.service.finish_operation, (op_id, True)).start()
+
+        started = time.monotonic()
+        self.assertEqual(self.service.wait_operation(op_id, 10), Operation(op_id, True, True))
+        self.assertLess(time.monotonic() - started, 1)
+
+    def test_wait_operation_timeout(self):
+        op_id = uuid4()
+        self.service._register_operation(Operation(op_id))
+
+        self.assertEqual(self.service.wait_operation(op_id, 0.05), Operation(op_id))
+        self.assertEqual(self.service.wait_operation(uuid4(), 10), None)
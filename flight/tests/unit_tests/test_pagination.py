@@ -0,0 +1,19 @@
+from django.test import TestCase
+
+from flight.pagination import MAX_ID, decode_cursor, encode_cursor
+
+
+class CursorTest(TestCase):
+    def test_round_trip(self):
+        for last_id in (0, 7, 10**12, MAX_ID):
+            self.assertEqual(decode_cursor('flight', encode_cursor('flight', last_id)), last_id)
+
+    def test_cursor_is_opaque(self):
+        self.assertNotIn('7', encode_cursor('passenger', 7))
+
+    def test_cursor_of_another_list(self):
+        self.assertRaises(ValueError, decode_cursor, 'flight', encode_cursor('passenger', 7))
+
+    def test_malformed_cursor(self):
+        for cursor in ('', '!!', 'Zmxp', encode_cursor('flight', -1), encode_cursor('flight', MAX_ID + 1), 'ZmxpZ2h0Ong'):
+            self.assertRaises(ValueError, decode_cursor, 'flight', cursor)
@@ -1,7 +1,10 @@
+from unittest.mock import patch
+
 from django.test import TestCase
 
 from flight.models import Passenger
 from flight.services import PassengerService
+from flight.services.passenger_service import PrefixIndex
 
 
 class PassengerServiceTest(TestCase):
@@ -19,4 +22,45 @@ class PassengerServiceTest(TestCase):
         self.service.passengers.append(passenger)
         self.assertEqual(passenger, self.service.get_passenger(0))
 
+    def test_has_passenger(self):
+        self.service.add_passenger('Water', 'Rock')
+        self.assertEqual(self.service.has_passenger(0), True)
+        self.assertEqual(self.service.has_passenger(1), False)
+        self.assertEqual(self.service.has_passenger(-1), False)
+
+    def test_iter_passengers(self):
+        for name in ('A', 'B', 'C'):
+            self.service.add_passenger(name, 'Rock')
+        self.assertEqual(self.service.count_passengers(), 3)
+        self.assertEqual([(i, p.name) for i, p in self.service.iter_passengers(1)], [(1, 'B'), (2, 'C')])
+        self.assertEqual([i for i, _ in self.service.iter_passengers(0, 2)], [0, 1])
+
+    def test_list_passengers(self):
+        for name in ('A', 'B', 'C'):
+            self.service.add_passenger(name, 'Rock')
+
+        self.assertEqual([(i, p.name) for i, p in self.service.list_passengers(limit=2)], [(0, 'A'), (1, 'B')])
+        self.assertEqual([(i, p.name) for i, p in self.service.list_passengers(after=1)], [(2, 'C')])
+        self.assertEqual(self.service.list_passengers(after=2), [])
+
+    def test_search_passengers(self):
+        for name, surname in [('Elon', 'Musk'), ('elsa', 'Muskrat'), ('Al', 'Mus'), ('Ellen', 'Ripley')]:
+            self.service.add_passenger(name, surname)
+
+        self.assertEqual(self.service.search_passengers(surname='mus'), [2, 0, 1])
+        self.assertEqual(self.service.search_passengers(name='EL'), [3, 0, 1])
+        self.assertEqual(self.service.search_passengers(name='el', surname='Mus'), [0, 1])
+        self.assertEqual(self.service.search_passengers(surname='Musk', limit=1), [0])
+        self.assertEqual(self.service.search_passengers(name='Z'), [])
+
+
+class PrefixIndexTest(TestCase):
+    def test_search_across_merged_and_recent_keys(self):
+        index = PrefixIndex()
+        with patch('flight.services.passenger_service.MERGE_RECENT_KEYS', 3):
+            for item_id, key in enumerate(['mb', 'ma', 'x', 'mc', 'Ma', 'm']):
+                index.add(key, item_id)
 
+        self.assertEqual(list(index.search('m')), [5, 1, 4, 0, 3])
+        self.assertEqual(list(index.search('MA')), [1, 4])
+        self.assertEqual(list(index.search('y')), [])
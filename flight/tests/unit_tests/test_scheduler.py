@@ -0,0 +1,74 @@
+import threading
+
+from django.test import TestCase
+
+from flight.scheduler import ExecutorPool
+
+
+class ExecutorPoolTest(TestCase):
+    def test_higher_priority_starts_first(self):
+        pool = ExecutorPool("test", max_workers=1)
+        release = threading.Event()
+        finished = threading.Event()
+        order = []
+        pool.submit(release.wait, (5,))
+        pool.submit(order.append, ("low",), priority=0)
+        pool.submit(order.append, ("high",), priority=10)
+        pool.submit(order.append, ("low again",), priority=0)
+        pool.submit(finished.set, priority=-1)
+
+        self.assertEqual(pool.stats()["queue_depth"], 4)
+        self.assertEqual(pool.stats()["running"], 1)
+        release.set()
+        self.assertTrue(finished.wait(5))
+        self.assertEqual(order, ["high", "low", "low again"])
+
+    def test_max_workers_limit(self):
+        pool = ExecutorPool("test", max_workers=2)
+        release = threading.Event()
+        for _ in range(5):
+            pool.submit(release.wait, (5,))
+
+        self.assertEqual(pool.stats()["running"], 2)
+        self.assertEqual(pool.stats()["queue_depth"], 3)
+        release.set()
+        finished = threading.Event()
+        pool.submit(finished.set, priority=-1)
+        self.assertTrue(finished.wait(5))
+
+    def test_callback_and_failures(self):
+        pool = ExecutorPool("test", max_workers=1)
+        results = []
+        finished = threading.Event()
+        pool.submit(pow, (2, 10), callback=results.append)
+        pool.submit(int, ("not a number",), callback=results.append)
+        pool.submit(finished.set)
+
+        self.assertTrue(finished.wait(5))
+        stats = pool.stats()
+        self.assertEqual(results, [1024])
+        self.assertEqual((stats["submitted_jobs"], stats["failed_jobs"]), (3, 1))
+        self.assertGreaterEqual(stats["max_run_seconds"], stats["avg_run_seconds"])
+
+    def test_process_pool(self):
+        pool = ExecutorPool("test", kind="process", max_workers=1)
+        results = []
+        done = threading.Event()
+        pool.submit(pow, (3, 4), callback=lambda result: results.append(result) or done.set())
+
+        self.assertTrue(done.wait(30))
+        self.assertEqual(results, [81])
+        pool.executor.shutdown()
+
+    def test_process_pool_rejects_unpicklable_jobs(self):
+        pool = ExecutorPool("test", kind="process", max_workers=1)
+        lock_holder = threading.Event()
+
+        self.assertRaises(ValueError, pool.submit, lambda: 1)
+        self.assertRaises(ValueError, pool.check_job, lock_holder.wait)
+        self.assertEqual(pool.stats()["submitted_jobs"], 0)
+        pool.check_job(pow, (3, 4))
+        pool.executor.shutdown()
+
+    def test_unknown_kind(self):
+        self.assertRaises(ValueError, ExecutorPool, "test", kind="fiber")
@@ -0,0 +1,156 @@
+import multiprocessing
+import uuid
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from flight.models import FlightStatus
+from flight.services import AlreadyBookedError, SharedFlightService
+from flight.tests.unit_tests.flight_service_cases import FlightServiceCases
+
+
+def buy_tickets_in_process(name: str, flight_ids: list[int], first_passenger_id: int) -> None:
+    service = SharedFlightService(name, max_flights=16, max_seats=1000)
+    for i in range(200):
+        try:
+            service.buy_ticket(flight_ids[i % len(flight_ids)], first_passenger_id + i)
+        except ValueError:
+            pass
+    service.close()
+
+
+class SharedFlightServiceTest(FlightServiceCases, TestCase):
+    def setUp(self) -> None:
+        self.name = f"test_flights_{uuid.uuid4().hex[:12]}"
+        self.service = SharedFlightService(self.name, max_flights=16, max_seats=1000)
+
+    def tearDown(self) -> None:
+        self.service.unlink()
+        self.service.close()
+
+    def test_add_flight_invalid_capacity(self):
+        self.assertRaises(ValueError, self.service.add_flight, 'Earth', 'Mars', 0)
+
+    def test_add_flight_storage_full(self):
+        self.service.add_flight('Earth', 'Mars', 1000)
+
+        self.assertRaises(ValueError, self.service.add_flight, 'Earth', 'Mars', 1)
+
+    def test_change_flight_status(self):
+        added_flight_id = self.service.add_flight('Earth', 'Mars', 20)
+        status = FlightStatus.DELAYED.value
+
+        self.assertEqual(self.service.change_flight_status(added_flight_id, status), True)
+        self.assertEqual(self.service.get_flight(added_flight_id).status, status)
+
+    def test_change_flight_status_not_found(self):
+        self.assertEqual(self.service.change_flight_status(0, ''), False)
+
+    def test_change_flight_status_unknown_status(self):
+        added_flight_id = self.service.add_flight('Earth', 'Mars', 20)
+
+        self.assertRaises(ValueError, self.service.change_flight_status, added_flight_id, 'LOST')
+
+    def test_buy_ticket(self):
+        added_flight_id = self.service.add_flight('Earth', 'Mars', 20)
+        passenger_id = 0
+
+        self.service.buy_ticket(added_flight_id, passenger_id)
+
+        self.assertEqual(self.service.get_flight(added_flight_id).passengers, [passenger_id])
+
+    def test_buy_ticket_flight_full(self):
+        added_flight_id = self.service.add_flight('Earth', 'Mars', 1)
+        self.service.buy_ticket(added_flight_id, 0)
+
+        self.assertRaises(ValueError, self.service.buy_ticket, added_flight_id, 1)
+
+    def test_has_ticket_sees_other_processes(self):
+        added_flight_id = self.service.add_flight('Earth', 'Mars', 20)
+        self.service.buy_ticket(added_flight_id, 5)
+        self.assertEqual(self.service.has_ticket(added_flight_id, 6), False)
+        attached = SharedFlightService(self.name, max_flights=16, max_seats=1000)
+        attached.buy_ticket(added_flight_id, 6)
+
+        self.assertEqual(self.service.has_ticket(added_flight_id, 6), True)
+        self.assertRaises(AlreadyBookedError, self.service.buy_ticket, added_flight_id, 6)
+        self.assertRaises(AlreadyBookedError, attached.buy_ticket, added_flight_id, 5)
+        attached.close()
+
+    def test_get_itinerary_sees_other_processes(self):
+        flight_ids = [self.service.add_flight('Earth', 'Mars', 20) for _ in range(5)]
+        self.service.buy_ticket(flight_ids[3], 5)
+        self.assertEqual(self.service.get_itinerary(5), [flight_ids[3]])
+        attached = SharedFlightService(self.name, max_flights=16, max_seats=1000)
+        attached.buy_ticket(flight_ids[1], 5)
+        attached.buy_ticket(flight_ids[4], 6)
+        attached.close()
+
+        with patch("flight.services.shared_flight_service.ITINERARY_SCAN_FLIGHTS", 2):
+            self.assertEqual(self.service.get_itinerary(5), [flight_ids[1], flight_ids[3]])
+            self.assertEqual(self.service.get_itinerary(6), [flight_ids[4]])
+
+    def test_is_delayed(self):
+        added_flight_id = self.service.add_flight('Earth', 'Mars', 20)
+        self.service.change_flight_status(added_flight_id, FlightStatus.DELAYED.value)
+
+        self.assertEqual(self.service.is_delayed(added_flight_id), True)
+        self.assertRaises(IndexError, self.service.is_delayed, 1)
+
+    def test_flights_by_status_sees_other_processes(self):
+        flight_id = self.service.add_flight('Earth', 'Mars', 20)
+        attached = SharedFlightService(self.name, max_flights=16, max_seats=1000)
+        attached.change_flight_status(flight_id, FlightStatus.DELAYED.value)
+        attached.close()
+
+        self.assertEqual(self.service.flights_by_status(FlightStatus.DELAYED.value), [flight_id])
+
+    def test_search_flights_sees_other_processes(self):
+        self.assertEqual(self.service.search_flights('Earth', 'Mars'), [])
+        attached = SharedFlightService(self.name, max_flights=16, max_seats=1000)
+        flight_ids = [attached.add_flight('Earth', 'Mars', 1) for _ in range(2)]
+        attached.buy_ticket(flight_ids[0], 7)
+        attached.close()
+
+        self.assertEqual(self.service.search_flights('Earth', 'Mars'), [(flight_ids[1], 1)])
+
+    def test_flights_by_status_scans_in_chunks(self):
+        flight_ids = [self.service.add_flight('Earth', 'Mars', 20) for _ in range(10)]
+        for flight_id in flight_ids[2::3]:
+            self.service.change_flight_status(flight_id, FlightStatus.DELAYED.value)
+
+        with patch("flight.services.shared_flight_service.STATUS_SCAN_BYTES", 4):
+            self.assertEqual(self.service.flights_by_status(FlightStatus.DELAYED.value), [2, 5, 8])
+            self.assertEqual(self.service.flights_by_status(FlightStatus.DELAYED.value, after=2, limit=1), [5])
+
+    def test_attach_with_other_layout_rejected(self):
+        self.assertRaises(ValueError, SharedFlightService, self.name, max_flights=8, max_seats=1000)
+        self.assertRaises(ValueError, SharedFlightService, self.name, max_flights=16, max_seats=500)
+
+    def test_attached_service_sees_same_inventory(self):
+        added_flight_id = self.service.add_flight('Earth', 'Mars', 20)
+        other = SharedFlightService(self.name, max_flights=16, max_seats=1000)
+        other.buy_ticket(added_flight_id, 7)
+        other.change_flight_status(added_flight_id, FlightStatus.DELAYED.value)
+
+        self.assertEqual(other.add_flight('Mars', 'Earth', 20), 1)
+        self.assertEqual(self.service.get_flight(1).departure_location, 'Mars')
+        self.assertEqual(self.service.has_ticket(added_flight_id, 7), True)
+        self.assertEqual(self.service.is_delayed(added_flight_id), True)
+        other.close()
+
+    def test_buy_ticket_across_processes_never_oversells(self):
+        flight_ids = [self.service.add_flight('Earth', 'Mars', 30) for _ in range(4)]
+        context = multiprocessing.get_context("fork")
+        processes = [
+            context.Process(target=buy_tickets_in_process, args=(self.name, flight_ids, process * 1000))
+            for process in range(4)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+
+        for flight_id in flight_ids:
+            self.assertEqual(self.service.count_passengers(flight_id), 30)
+            self.assertEqual(len(set(self.service.get_flight(flight_id).passengers)), 30)
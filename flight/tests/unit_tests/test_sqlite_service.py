@@ -0,0 +1,234 @@
+import os
+import tempfile
+import time
+from unittest.mock import patch
+from uuid import uuid4
+
+from django.test import TestCase
+
+from flight.models import FlightStatus, Operation
+from flight.services import (
+    AlreadyBookedError,
+    SQLiteDatabase,
+    SQLiteFlightService,
+    SQLiteOperationService,
+    SQLitePassengerService,
+)
+from flight.tests.unit_tests.flight_service_cases import FlightServiceCases
+
+
+class SQLiteFlightServiceTest(FlightServiceCases, TestCase):
+    def setUp(self) -> None:
+        self.database = SQLiteDatabase()
+        self.service = SQLiteFlightService(self.database)
+
+    def tearDown(self) -> None:
+        self.database.close()
+
+    def test_add_flight(self):
+        self.assertEqual(self.service.add_flight('Earth', 'Mars', 20), 0)
+        added_flight_id = self.service.add_flight('Mars', 'Earth', 10)
+        flight = self.service.get_flight(added_flight_id)
+
+        self.assertEqual(added_flight_id, 1)
+        self.assertEqual(flight.departure_location, 'Mars')
+        self.assertEqual(flight.arrival_location, 'Earth')
+        self.assertEqual(flight.max_capacity, 10)
+        self.assertEqual(flight.status, FlightStatus.AVAILABLE_FOR_REGISTRATION.value)
+        self.assertEqual(self.service.get_flight(-1).departure_location, 'Mars')
+
+    def test_add_flight_invalid_capacity(self):
+        self.assertRaises(ValueError, self.service.add_flight, 'Earth', 'Mars', 0)
+
+    def test_change_flight_status(self):
+        added_flight_id = self.service.add_flight('Earth', 'Mars', 20)
+        status = FlightStatus.DELAYED.value
+
+        self.assertEqual(self.service.change_flight_status(added_flight_id, status), True)
+        self.assertEqual(self.service.get_flight(added_flight_id).status, status)
+        self.assertEqual(self.service.is_delayed(added_flight_id), True)
+
+    def test_change_flight_status_not_found(self):
+        self.assertEqual(self.service.change_flight_status(0, FlightStatus.DELAYED.value), False)
+        self.assertRaises(IndexError, self.service.is_delayed, 0)
+
+    def test_buy_ticket(self):
+        added_flight_id = self.service.add_flight('Earth', 'Mars', 20)
+        self.service.buy_ticket(added_flight_id, 3)
+        self.service.buy_ticket(added_flight_id, 1)
+
+        self.assertEqual(self.service.get_flight(added_flight_id).passengers, [3, 1])
+        self.assertEqual(self.service.has_ticket(added_flight_id, 1), True)
+        self.assertEqual(self.service.has_ticket(added_flight_id, 2), False)
+        self.assertEqual(self.service.count_passengers(added_flight_id), 2)
+
+    def test_buy_ticket_errors(self):
+        added_flight_id = self.service.add_flight('Earth', 'Mars', 1)
+        self.service.buy_ticket(added_flight_id, 0)
+
+        self.assertRaises(AlreadyBookedError, self.service.buy_ticket, added_flight_id, 0)
+        self.assertRaises(ValueError, self.service.buy_ticket, added_flight_id, 1)
+        self.assertRaises(IndexError, self.service.buy_ticket, 5, 0)
+        self.assertEqual(self.service.count_passengers(added_flight_id), 1)
+
+    def test_buy_tickets(self):
+        added_flight_id = self.service.add_flight('Earth', 'Mars', 1)
+
+        self.assertEqual(
+            self.service.buy_tickets([(added_flight_id, 0), (added_flight_id, 0), (added_flight_id, 1), (9, 0)]),
+            ["OK", "ALREADY_BOOKED", "FULL", "NOT_FOUND"],
+        )
+
+
+class SQLitePassengerServiceTest(TestCase):
+    def setUp(self) -> None:
+        self.database = SQLiteDatabase()
+        self.service = SQLitePassengerService(self.database)
+
+    def tearDown(self) -> None:
+        self.database.close()
+
+    def test_add_passenger(self):
+        added_passenger_id = self.service.add_passenger('Water', 'Rock')
+        passenger = self.service.get_passenger(added_passenger_id)
+
+        self.assertEqual(added_passenger_id, 0)
+        self.assertEqual((passenger.name, passenger.surname), ('Water', 'Rock'))
+        self.assertEqual(self.service.get_passenger(1), None)
+        self.assertEqual(self.service.has_passenger(0), True)
+        self.assertEqual(self.service.has_passenger(1), False)
+        self.assertEqual(self.service.has_passenger(-1), False)
+
+    def test_iter_passengers(self):
+        for name in ('A', 'B', 'C'):
+            self.service.add_passenger(name, 'Rock')
+
+        self.assertEqual(self.service.count_passengers(), 3)
+        self.assertEqual([(i, p.name) for i, p in self.service.iter_passengers(1)], [(1, 'B'), (2, 'C')])
+        self.assertEqual([i for i, _ in self.service.iter_passengers(0, 2)], [0, 1])
+
+    def test_list_passengers(self):
+        for name in ('A', 'B', 'C'):
+            self.service.add_passenger(name, 'Rock')
+
+        self.assertEqual([(i, p.name) for i, p in self.service.list_passengers(limit=2)], [(0, 'A'), (1, 'B')])
+        self.assertEqual([(i, p.name) for i, p in self.service.list_passengers(after=1)], [(2, 'C')])
+        self.assertEqual(self.service.list_passengers(after=2), [])
+
+    def test_search_passengers(self):
+        for name, surname in [('Elon', 'Musk'), ('elsa', 'Muskrat'), ('Al', 'Mus'), ('Ellen', 'Mu_k')]:
+            self.service.add_passenger(name, surname)
+
+        self.assertEqual(self.service.search_passengers(surname='mus'), [2, 0, 1])
+        self.assertEqual(self.service.search_passengers(name='EL'), [3, 0, 1])
+        self.assertEqual(self.service.search_passengers(name='el', surname='Mus'), [0, 1])
+        self.assertEqual(self.service.search_passengers(surname='Mu_'), [3])
+        self.assertEqual(self.service.search_passengers(surname='Musk', limit=1), [0])
+
+
+class SQLiteOperationServiceTest(TestCase):
+    def setUp(self) -> None:
+        self.database = SQLiteDatabase()
+        self.service = SQLiteOperationService(self.database)
+
+    def tearDown(self) -> None:
+        self.database.close()
+
+    def test_finish_operation(self):
+        op_id = uuid4()
+        self.service._register_operation(Operation(op_id))
+
+        self.assertEqual(self.service.get_operation(op_id), Operation(op_id))
+        self.assertEqual(self.service.finish_operation(op_id, {"path": "passengers.csv"}), True)
+        self.assertEqual(self.service.get_operation(op_id), Operation(op_id, True, {"path": "passengers.csv"}))
+
+    def test_operation_not_found(self):
+        self.assertEqual(self.service.get_operation(uuid4()), None)
+        self.assertEqual(self.service.finish_operation(uuid4(), True), False)
+
+    def test_finished_operation_expires(self):
+        op_id = uuid4()
+        self.service._register_operation(Operation(op_id))
+        self.service.finish_operation(op_id, True)
+
+        with patch("flight.services.sqlite_service.time.time", return_value=time.time() + self.service.ttl + 1):
+            self.assertEqual(self.service.get_operation(op_id), None)
+        self.assertEqual(self.service.is_expired(op_id), True)
+        self.assertEqual(self.service.stats()["expired_operations"], 1)
+
+    def test_lookup_without_expired_operations_does_not_write(self):
+        op_id = uuid4()
+        self.service._register_operation(Operation(op_id))
+        self.database.commit()
+
+        self.service.get_operation(op_id)
+        self.assertEqual(self.database.connection.in_transaction, False)
+        self.assertEqual(self.service._delete_operations("DELETE FROM operations WHERE 0 RETURNING id", ()), 0)
+        self.assertEqual(self.database.connection.in_transaction, False)
+
+    def test_evict_oldest_finished_operation(self):
+        service = SQLiteOperationService(self.database, max_operations=2)
+        op_ids = [uuid4() for _ in range(3)]
+        service._register_operation(Operation(op_ids[0]))
+        service._register_operation(Operation(op_ids[1]))
+        service.finish_operation(op_ids[1], True)
+        service._register_operation(Operation(op_ids[2]))
+
+        self.assertEqual(service.get_operation(op_ids[1]), None)
+        self.assertEqual(service.is_expired(op_ids[1]), True)
+        self.assertEqual(service.stats()["operations"], 2)
+        self.assertEqual(service.stats()["pending"], 2)
+        self.assertEqual(service.stats()["evicted_operations"], 1)
+
+
+class SQLiteDatabaseTest(TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "storage.sqlite3")
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_data_survives_reopen(self):
+        database = SQLiteDatabase(self.path)
+        flight_id = SQLiteFlightService(database).add_flight('Earth', 'Mars', 20)
+        SQLiteFlightService(database).buy_ticket(flight_id, 7)
+        database.close()
+
+        database = SQLiteDatabase(self.path)
+        self.assertEqual(SQLiteFlightService(database).get_flight(flight_id).passengers, [7])
+        self.assertEqual(database.read("PRAGMA journal_mode")[0][0], "wal")
+        database.close()
+
+    def test_commit_batches(self):
+        database = SQLiteDatabase(self.path, commit_rows=3, commit_interval=0.05)
+        reader = SQLiteDatabase(self.path)
+        service = SQLiteFlightService(database)
+        service.add_flight('Earth', 'Mars', 20)
+        service.add_flight('Earth', 'Mars', 20)
+
+        self.assertEqual(SQLiteFlightService(reader).flights, [])
+        service.add_flight('Earth', 'Mars', 20)
+        self.assertEqual(len(SQLiteFlightService(reader).flights), 3)
+
+        service.add_flight('Earth', 'Mars', 20)
+        time.sleep(0.2)
+        self.assertEqual(len(SQLiteFlightService(reader).flights), 4)
+        reader.close()
+        database.close()
+
+    def test_rejected_purchase_releases_write_lock(self):
+        database = SQLiteDatabase(self.path, commit_rows=1)
+        other = SQLiteDatabase(self.path, timeout=0.1)
+        service = SQLiteFlightService(database)
+        flight_id = service.add_flight('Earth', 'Mars', 1)
+        service.buy_ticket(flight_id, 0)
+
+        for passenger_id, error in [(0, AlreadyBookedError), (1, ValueError)]:
+            self.assertRaises(error, service.buy_ticket, flight_id, passenger_id)
+            self.assertEqual(database.connection.in_transaction, False)
+            SQLiteFlightService(other).add_flight('Earth', 'Mars', 20)  # "database is locked" if still held
+        self.assertRaises(IndexError, service.buy_ticket, 99, 0)
+        self.assertEqual(database.connection.in_transaction, False)
+        other.close()
+        database.close()
@@ -0,0 +1,58 @@
+from django.http import QueryDict
+from django.test import TestCase
+from rest_framework import serializers
+
+from flight.serializers import BuyTicketQuerySerializer, FlightIDSerializer, InPassengerSerializer
+from flight.validation import FastQueryValidator, ValidQuery, fast_query_validator
+
+
+class FastQueryValidatorTest(TestCase):
+    def assert_same_as_serializer(self, serializer_class, query: str):
+        result = FastQueryValidator(serializer_class)(QueryDict(query))
+        serializer = serializer_class(data=QueryDict(query))
+        self.assertEqual(result.is_valid(), serializer.is_valid(), query)
+        if serializer.is_valid():
+            self.assertEqual(result.data, serializer.data, query)
+        else:
+            self.assertEqual(result.errors, serializer.errors, query)
+
+    def test_valid_query(self):
+        result = FastQueryValidator(BuyTicketQuerySerializer)(QueryDict("flight_id=3&passenger_id=0042"))
+        self.assertIsInstance(result, ValidQuery)
+        self.assertTrue(result.is_valid())
+        self.assertEqual(result.data, {"flight_id": 3, "passenger_id": 42})
+        self.assertEqual(result.validated_data, result.data)
+
+    def test_same_result_as_serializer(self):
+        for query in [
+            "flight_id=0",
+            "flight_id=7&flight_id=8",
+            "flight_id=",
+            "flight_id=-1",
+            "flight_id=+1",
+            "flight_id=%201",
+            "flight_id=5.0",
+            "flight_id=x",
+            "flight_id=%C2%B2",
+            "flight_id=" + "9" * 30,
+            "flight_id=" + "9" * 1001,
+            "",
+        ]:
+            self.assert_same_as_serializer(FlightIDSerializer, query)
+        for query in ["flight_id=1&passenger_id=2", "flight_id=1", "passenger_id=x", "flight_id=-1&passenger_id=-1"]:
+            self.assert_same_as_serializer(BuyTicketQuerySerializer, query)
+
+    def test_max_value(self):
+        class LimitSerializer(serializers.Serializer):
+            limit = serializers.IntegerField(min_value=1, max_value=100)
+
+        self.assert_same_as_serializer(LimitSerializer, "limit=100")
+        self.assert_same_as_serializer(LimitSerializer, "limit=101")
+        self.assert_same_as_serializer(LimitSerializer, "limit=0")
+
+    def test_unsupported_serializer(self):
+        with self.assertRaises(ValueError):
+            FastQueryValidator(InPassengerSerializer)
+
+    def test_compiled_once(self):
+        self.assertIs(fast_query_validator(FlightIDSerializer), fast_query_validator(FlightIDSerializer))
@@ -0,0 +1,79 @@
+from functools import cache
+from typing import Mapping
+
+from rest_framework import serializers
+from rest_framework.serializers import Serializer
+
+MAX_FAST_DIGITS = 18  # longer values (and DRF's "String value too large.") go through the serializer
+
+
+class ValidQuery:
+    """
+    Result of a successful fast validation, used like a valid serializer (is_valid(), data, validated_data)
+    """
+    __slots__ = ("data",)
+
+    errors = {}
+
+    def __init__(self, data: dict):
+        self.data = data
+
+    @property
+    def validated_data(self) -> dict:
+        return self.data
+
+    def is_valid(self) -> bool:
+        return True
+
+
+class FastQueryValidator:
+    """
+    Precompiled validator for query shapes made of required integer fields (IDs and the like).
+    Canonical values (plain ASCII digits within the field limits) are parsed without building a serializer,
+    anything else - missing, negative, malformed or out of range values - is handed to the serializer itself,
+    so errors and edge cases (" 5", "5.0", ...) are exactly the serializer's.
+    """
+
+    def __init__(self, serializer_class: type[Serializer]):
+        """
+        Raises ValueError if the serializer has fields other than required IntegerFields.
+        :param serializer_class: serializer describing the query
+        """
+        self.serializer_class = serializer_class
+        self.fields: list[tuple[str, int | None, int | None]] = []
+        for name, field in serializer_class().fields.items():
+            if type(field) is not serializers.IntegerField or not field.required or field.source != name:
+                raise ValueError(f"{serializer_class.__name__}.{name} cannot be validated on the fast path")
+            self.fields.append((name, field.min_value, field.max_value))
+
+    def __call__(self, data: Mapping) -> ValidQuery | Serializer:
+        """
+        Validate query parameters
+        :param data: query parameters (QueryDict, the last value of a repeated parameter is used like in DRF)
+        :return: ValidQuery, or a serializer bound to data if the fast path does not apply
+        """
+        values = {}
+        for name, min_value, max_value in self.fields:
+            raw = data.get(name)
+            if (
+                    type(raw) is not str
+                    or not 0 < len(raw) <= MAX_FAST_DIGITS
+                    or not raw.isascii()
+                    or not raw.isdigit()
+            ):
+                return self.serializer_class(data=data)
+            value = int(raw)
+            if (min_value is not None and value < min_value) or (max_value is not None and value > max_value):
+                return self.serializer_class(data=data)
+            values[name] = value
+        return ValidQuery(values)
+
+
+@cache
+def fast_query_validator(serializer_class: type[Serializer]) -> FastQueryValidator:
+    """
+    Validator compiled once per serializer class
+    :param serializer_class: serializer describing the query
+    :return: FastQueryValidator
+    """
+    return FastQueryValidator(serializer_class)
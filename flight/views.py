@@ -1,26 +1,76 @@
+import time
+from functools import partial
 from uuid import UUID
 
+from django.conf import settings
+from django.http import HttpResponse, StreamingHttpResponse
 from django.shortcuts import render
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
 from drf_spectacular.utils import extend_schema_view, extend_schema
 from rest_framework import status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.viewsets import ViewSet
 
-from .services import FlightService, LogService, OperationService, PassengerService
+from .http import (
+    EventStreamRenderer,
+    RangeNotSatisfiable,
+    accepts_encoding,
+    format_event,
+    iter_slices,
+    parse_byte_range,
+)
+from .ingest import ingest_flights, ingest_passengers
+from .pagination import encode_cursor
+from .services import (
+    AlreadyBookedError,
+    ExportService,
+    create_flight_service,
+    create_log_service,
+    create_operation_service,
+    create_passenger_service,
+    journal_services,
+)
 from .serializers import (
     InFlightSerializer,
     FlightIDSerializer,
     InPassengerSerializer,
     PassengerIDSerializer,
     BuyTicketQuerySerializer,
+    BuyTicketBatchSerializer,
+    BuyTicketBatchResultSerializer,
+    TicketStatusSerializer,
     ChangeFlightStatusSerializer,
+    DelayedBatchSerializer,
+    DelayedBatchResultSerializer,
+    FlightIDPageSerializer,
+    FlightsByStatusQuerySerializer,
+    FlightSearchQuerySerializer,
+    FlightSearchResultSerializer,
     ValidationErrorSerializer,
+    IngestReportSerializer,
+    ExportQuerySerializer,
+    WatermarkQuerySerializer,
+    LogStatsSerializer,
+    OperationExpiredSerializer,
     OperationSerializer,
+    OperationStatsSerializer,
     GetOperationQuerySerializer,
+    FlightPageQuerySerializer,
+    FlightPageSerializer,
+    PassengerPageQuerySerializer,
+    PassengerPageSerializer,
+    PassengerSearchQuerySerializer,
+    PassengerIDListSerializer,
+    PassengerItinerarySerializer,
 )
+from .validation import fast_query_validator
 
 
+SSE_HEARTBEAT_SECONDS = 15  # keep-alive comment interval of event streams
+SSE_MAX_SECONDS = 300  # event streams are closed after this, EventSource clients reconnect
+
 
 @extend_schema_view(
     post_flight=extend_schema(
@@ -32,6 +82,23 @@ from .serializers import (
         },
         auth=False,
     ),
+    get_flights=extend_schema(
+        summary="List flights",
+        parameters=[FlightPageQuerySerializer],
+        responses={
+            status.HTTP_200_OK: FlightPageSerializer,
+            status.HTTP_422_UNPROCESSABLE_ENTITY: ValidationErrorSerializer,
+        },
+        auth=False,
+    ),
+    post_flights_bulk=extend_schema(
+        summary="Post many flights as newline-delimited JSON",
+        request={"application/x-ndjson": InFlightSerializer},
+        responses={
+            status.HTTP_200_OK: IngestReportSerializer,
+        },
+        auth=False,
+    ),
     post_flight_status=extend_schema(
         summary="Post new flight status",
         request=ChangeFlightStatusSerializer,
@@ -51,6 +118,42 @@ from .serializers import (
         },
         auth=False,
     ),
+    get_passengers=extend_schema(
+        summary="List passengers",
+        parameters=[PassengerPageQuerySerializer],
+        responses={
+            status.HTTP_200_OK: PassengerPageSerializer,
+            status.HTTP_422_UNPROCESSABLE_ENTITY: ValidationErrorSerializer,
+        },
+        auth=False,
+    ),
+    get_passenger_search=extend_schema(
+        summary="Find passengers by name and/or surname prefix",
+        parameters=[PassengerSearchQuerySerializer],
+        responses={
+            status.HTTP_200_OK: PassengerIDListSerializer,
+            status.HTTP_422_UNPROCESSABLE_ENTITY: ValidationErrorSerializer,
+        },
+        auth=False,
+    ),
+    get_itinerary=extend_schema(
+        summary="List flights a passenger has tickets to",
+        parameters=[PassengerIDSerializer],
+        responses={
+            status.HTTP_200_OK: PassengerItinerarySerializer,
+            status.HTTP_404_NOT_FOUND: None,
+            status.HTTP_422_UNPROCESSABLE_ENTITY: ValidationErrorSerializer,
+        },
+        auth=False,
+    ),
+    post_passengers_bulk=extend_schema(
+        summary="Post many passengers as newline-delimited JSON",
+        request={"application/x-ndjson": InPassengerSerializer},
+        responses={
+            status.HTTP_200_OK: IngestReportSerializer,
+        },
+        auth=False,
+    ),
     get_ticket=extend_schema(
         summary="Buy ticket to flight by user",
         parameters=[BuyTicketQuerySerializer],
@@ -58,6 +161,26 @@ from .serializers import (
             status.HTTP_200_OK: None,
             status.HTTP_403_FORBIDDEN: None,
             status.HTTP_404_NOT_FOUND: None,
+            status.HTTP_409_CONFLICT: None,
+            status.HTTP_422_UNPROCESSABLE_ENTITY: ValidationErrorSerializer,
+        },
+        auth=False,
+    ),
+    post_tickets=extend_schema(
+        summary="Buy a batch of tickets",
+        request=BuyTicketBatchSerializer,
+        responses={
+            status.HTTP_200_OK: BuyTicketBatchResultSerializer,
+            status.HTTP_422_UNPROCESSABLE_ENTITY: ValidationErrorSerializer,
+        },
+        auth=False,
+    ),
+    get_ticket_status=extend_schema(
+        summary="Check if passenger has a ticket to flight",
+        parameters=[BuyTicketQuerySerializer],
+        responses={
+            status.HTTP_200_OK: TicketStatusSerializer,
+            status.HTTP_404_NOT_FOUND: None,
             status.HTTP_422_UNPROCESSABLE_ENTITY: ValidationErrorSerializer,
         },
         auth=False,
@@ -73,29 +196,108 @@ from .serializers import (
         },
         auth=False,
     ),
+    get_flight_search=extend_schema(
+        summary="Find flights with free seats on a route",
+        parameters=[FlightSearchQuerySerializer],
+        responses={
+            status.HTTP_200_OK: FlightSearchResultSerializer,
+            status.HTTP_422_UNPROCESSABLE_ENTITY: ValidationErrorSerializer,
+        },
+        auth=False,
+    ),
+    post_delayed_batch=extend_schema(
+        summary="Check if flights are delayed",
+        request=DelayedBatchSerializer,
+        responses={
+            status.HTTP_200_OK: DelayedBatchResultSerializer,
+            status.HTTP_422_UNPROCESSABLE_ENTITY: ValidationErrorSerializer,
+        },
+        auth=False,
+    ),
+    get_flights_by_status=extend_schema(
+        summary="List flights in a status",
+        parameters=[FlightsByStatusQuerySerializer],
+        responses={
+            status.HTTP_200_OK: FlightIDPageSerializer,
+            status.HTTP_422_UNPROCESSABLE_ENTITY: ValidationErrorSerializer,
+        },
+        auth=False,
+    ),
     get_log_file=extend_schema(
         summary="Generate passengers.csv and get operation details",
+        description="The operation result carries the export watermark (last Passenger ID), "
+                    "pass it as `after` next time to export only newer passengers",
+        parameters=[WatermarkQuerySerializer],
         responses={
             status.HTTP_200_OK: OperationSerializer,
+            status.HTTP_422_UNPROCESSABLE_ENTITY: ValidationErrorSerializer,
+        },
+        auth=False,
+    ),
+    get_log_export=extend_schema(
+        summary="Download passenger list as CSV (supports Range, conditional requests and gzip)",
+        parameters=[ExportQuerySerializer],
+        responses={
+            (status.HTTP_200_OK, "text/csv"): bytes,
+            (status.HTTP_206_PARTIAL_CONTENT, "text/csv"): bytes,
+            status.HTTP_304_NOT_MODIFIED: None,
+            status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE: None,
+            status.HTTP_422_UNPROCESSABLE_ENTITY: ValidationErrorSerializer,
+        },
+        auth=False,
+    ),
+    get_log_stats=extend_schema(
+        summary="Get passenger log writer statistics",
+        responses={
+            status.HTTP_200_OK: LogStatsSerializer,
         },
         auth=False,
     ),
     get_log_file_status=extend_schema(
-        summary="Get passengers.csv generation status",
+        summary="Get passengers.csv generation status (long-poll with wait, or stream with Accept: text/event-stream)",
         parameters=[GetOperationQuerySerializer],
         responses={
             status.HTTP_200_OK: OperationSerializer,
+            (status.HTTP_200_OK, "text/event-stream"): str,
             status.HTTP_404_NOT_FOUND: None,
+            status.HTTP_410_GONE: OperationExpiredSerializer,
             status.HTTP_422_UNPROCESSABLE_ENTITY: ValidationErrorSerializer,
         },
         auth=False,
     ),
+    get_operation_stats=extend_schema(
+        summary="Get operation registry statistics",
+        responses={
+            status.HTTP_200_OK: OperationStatsSerializer,
+        },
+        auth=False,
+    ),
 )
 class FlightViewSet(ViewSet):
-    flight_service = FlightService()
-    log_service = LogService()
-    ops_service = OperationService()
-    passenger_service = PassengerService()
+    flight_service, passenger_service = journal_services(create_flight_service(), create_passenger_service())
+    log_service = create_log_service()
+    ops_service = create_operation_service()
+    export_service = ExportService(passenger_service, log_service)
+    # exports read this process's passengers and log: fail at startup if "exports" is a process pool
+    ops_service.check_operation(export_service.record_export, pool="exports")
+    fast_query_actions = frozenset(settings.FAST_QUERY_VALIDATION)
+
+    def get_renderers(self):
+        renderers = super().get_renderers()
+        if self.action == "get_log_file_status":
+            renderers.append(EventStreamRenderer())
+        return renderers
+
+    def query_serializer(self, serializer_class, request):
+        """
+        Bind query parameters to a serializer, or validate them on the fast path if the action opted in
+        :param serializer_class: serializer describing the query
+        :param request: request
+        :return: object with is_valid(), data and errors like a serializer
+        """
+        if self.action in self.fast_query_actions:
+            return fast_query_validator(serializer_class)(request.query_params)
+        return serializer_class(data=request.query_params)
 
     @action(detail=False, methods=["POST"])
     def post_flight(self, request):
@@ -106,12 +308,55 @@ class FlightViewSet(ViewSet):
                 data=ValidationErrorSerializer({"errors": in_flight.errors}).data,
             )
 
-        new_flight_id = self.flight_service.add_flight(**in_flight.data)
+        try:
+            new_flight_id = self.flight_service.add_flight(**in_flight.data)
+        except ValueError as e:  # e.g. the shared flight storage is full
+            return Response(
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                data=ValidationErrorSerializer({"errors": {"non_field_errors": [str(e)]}}).data,
+            )
         return Response(
             status=status.HTTP_201_CREATED,
             data=FlightIDSerializer({"flight_id": new_flight_id}).data
         )
 
+    @action(detail=False, methods=["GET"])
+    def get_flights(self, request):
+        query_ser = FlightPageQuerySerializer(data=request.query_params)
+        if not query_ser.is_valid():
+            return Response(
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                data=ValidationErrorSerializer({"errors": query_ser.errors}).data,
+            )
+
+        limit = query_ser.validated_data["limit"]
+        flights = self.flight_service.list_flights(query_ser.validated_data.get("cursor", -1), limit)
+        return Response(
+            status=status.HTTP_200_OK,
+            data=FlightPageSerializer({
+                "flights": [
+                    {
+                        "flight_id": flight_id,
+                        "departure_location": flight.departure_location,
+                        "arrival_location": flight.arrival_location,
+                        "max_capacity": flight.max_capacity,
+                        "status": flight.status,
+                        "passengers_count": passengers_count,
+                    }
+                    for flight_id, flight, passengers_count in flights
+                ],
+                "next_cursor": encode_cursor("flight", flights[-1][0]) if len(flights) == limit else None,
+            }).data,
+        )
+
+    @action(detail=False, methods=["POST"])
+    def post_flights_bulk(self, request):
+        report = ingest_flights(request.stream or (), self.flight_service)
+        return Response(
+            status=status.HTTP_200_OK,
+            data=IngestReportSerializer(report).data,
+        )
+
     @action(detail=False, methods=["POST"])
     def post_flight_status(self, request):
         new_flight_status = ChangeFlightStatusSerializer(data=request.data)
@@ -140,15 +385,82 @@ class FlightViewSet(ViewSet):
             )
 
         new_passenger_id = self.passenger_service.add_passenger(**in_passenger.data)
-        self.log_service.write_entry(**in_passenger.data)
+        self.log_service.write_entry(**in_passenger.data, passenger_id=new_passenger_id)
         return Response(
             status=status.HTTP_201_CREATED,
             data=PassengerIDSerializer({"passenger_id": new_passenger_id}).data
         )
 
+    @action(detail=False, methods=["GET"])
+    def get_passengers(self, request):
+        query_ser = PassengerPageQuerySerializer(data=request.query_params)
+        if not query_ser.is_valid():
+            return Response(
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                data=ValidationErrorSerializer({"errors": query_ser.errors}).data,
+            )
+
+        limit = query_ser.validated_data["limit"]
+        passengers = self.passenger_service.list_passengers(query_ser.validated_data.get("cursor", -1), limit)
+        return Response(
+            status=status.HTTP_200_OK,
+            data=PassengerPageSerializer({
+                "passengers": [
+                    {"passenger_id": passenger_id, "name": passenger.name, "surname": passenger.surname}
+                    for passenger_id, passenger in passengers
+                ],
+                "next_cursor": encode_cursor("passenger", passengers[-1][0]) if len(passengers) == limit else None,
+            }).data,
+        )
+
+    @action(detail=False, methods=["GET"])
+    def get_passenger_search(self, request):
+        query_ser = PassengerSearchQuerySerializer(data=request.query_params)
+        if not query_ser.is_valid():
+            return Response(
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                data=ValidationErrorSerializer({"errors": query_ser.errors}).data,
+            )
+
+        passenger_ids = self.passenger_service.search_passengers(**query_ser.validated_data)
+        return Response(
+            status=status.HTTP_200_OK,
+            data=PassengerIDListSerializer({"passenger_ids": passenger_ids}).data,
+        )
+
+    @action(detail=False, methods=["GET"])
+    def get_itinerary(self, request):
+        query_ser = self.query_serializer(PassengerIDSerializer, request)
+        if not query_ser.is_valid():
+            return Response(
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                data=ValidationErrorSerializer({"errors": query_ser.errors}).data,
+            )
+
+        passenger_id = query_ser.data["passenger_id"]
+        if not self.passenger_service.has_passenger(passenger_id):
+            return Response(
+                status=status.HTTP_404_NOT_FOUND
+            )
+        return Response(
+            status=status.HTTP_200_OK,
+            data=PassengerItinerarySerializer({
+                "passenger_id": passenger_id,
+                "flight_ids": self.flight_service.get_itinerary(passenger_id),
+            }).data,
+        )
+
+    @action(detail=False, methods=["POST"])
+    def post_passengers_bulk(self, request):
+        report = ingest_passengers(request.stream or (), self.passenger_service, self.log_service)
+        return Response(
+            status=status.HTTP_200_OK,
+            data=IngestReportSerializer(report).data,
+        )
+
     @action(detail=False, methods=["GET"])
     def get_ticket(self, request):
-        query_ser = BuyTicketQuerySerializer(data=request.query_params)
+        query_ser = self.query_serializer(BuyTicketQuerySerializer, request)
         if not query_ser.is_valid():
             return Response(
                 status=status.HTTP_422_UNPROCESSABLE_ENTITY,
@@ -169,14 +481,58 @@ class FlightViewSet(ViewSet):
             return Response(
                 status=status.HTTP_404_NOT_FOUND
             )
+        except AlreadyBookedError:
+            return Response(
+                status=status.HTTP_409_CONFLICT
+            )
         except ValueError:
             return Response(
                 status=status.HTTP_403_FORBIDDEN
             )
 
+    @action(detail=False, methods=["POST"])
+    def post_tickets(self, request):
+        in_tickets = BuyTicketBatchSerializer(data=request.data)
+        if not in_tickets.is_valid():
+            return Response(
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                data=ValidationErrorSerializer({"errors": in_tickets.errors}).data,
+            )
+
+        results = self.flight_service.buy_tickets(
+            in_tickets.validated_data["tickets"],
+            passenger_exists=self.passenger_service.has_passenger,
+        )
+        return Response(
+            status=status.HTTP_200_OK,
+            data=BuyTicketBatchResultSerializer({"results": results}).data,
+        )
+
+    @action(detail=False, methods=["GET"])
+    def get_ticket_status(self, request):
+        query_ser = self.query_serializer(BuyTicketQuerySerializer, request)
+        if not query_ser.is_valid():
+            return Response(
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                data=ValidationErrorSerializer({"errors": query_ser.errors}).data,
+            )
+
+        try:
+            booked = self.flight_service.has_ticket(**query_ser.data)
+            passengers_count = self.flight_service.count_passengers(query_ser.data["flight_id"])
+        except IndexError:
+            return Response(
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        return Response(
+            status=status.HTTP_200_OK,
+            data=TicketStatusSerializer({"booked": booked, "passengers_count": passengers_count}).data,
+        )
+
     @action(detail=False, methods=["GET"])
     def get_delayed(self, request):
-        query_ser = FlightIDSerializer(data=request.query_params)
+        query_ser = self.query_serializer(FlightIDSerializer, request)
         if not query_ser.is_valid():
             return Response(
                 status=status.HTTP_422_UNPROCESSABLE_ENTITY,
@@ -196,15 +552,157 @@ class FlightViewSet(ViewSet):
                 status=status.HTTP_404_NOT_FOUND,
             )
 
+    @action(detail=False, methods=["POST"])
+    def post_delayed_batch(self, request):
+        in_flights = DelayedBatchSerializer(data=request.data)
+        if not in_flights.is_valid():
+            return Response(
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                data=ValidationErrorSerializer({"errors": in_flights.errors}).data,
+            )
+
+        results = self.flight_service.are_delayed(in_flights.validated_data["flight_ids"])
+        return Response(
+            status=status.HTTP_200_OK,
+            data=DelayedBatchResultSerializer({"results": results}).data,
+        )
+
+    @action(detail=False, methods=["GET"])
+    def get_flights_by_status(self, request):
+        query_ser = FlightsByStatusQuerySerializer(data=request.query_params)
+        if not query_ser.is_valid():
+            return Response(
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                data=ValidationErrorSerializer({"errors": query_ser.errors}).data,
+            )
+
+        limit = query_ser.validated_data["limit"]
+        flight_ids = self.flight_service.flights_by_status(**query_ser.validated_data)
+        return Response(
+            status=status.HTTP_200_OK,
+            data=FlightIDPageSerializer({
+                "flight_ids": flight_ids,
+                "next_after": flight_ids[-1] if len(flight_ids) == limit else None,
+            }).data,
+        )
+
     @action(detail=False, methods=["GET"])
-    def get_log_file(self, _):
-        op_id = self.ops_service.execute_operation(self.log_service.get_log_file_path)
+    def get_flight_search(self, request):
+        query_ser = FlightSearchQuerySerializer(data=request.query_params)
+        if not query_ser.is_valid():
+            return Response(
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                data=ValidationErrorSerializer({"errors": query_ser.errors}).data,
+            )
+
+        limit = query_ser.validated_data["limit"]
+        flights = self.flight_service.search_flights(**query_ser.validated_data)
+        return Response(
+            status=status.HTTP_200_OK,
+            data=FlightSearchResultSerializer({
+                "flights": [
+                    {"flight_id": flight_id, "seats_remaining": seats_remaining}
+                    for flight_id, seats_remaining in flights
+                ],
+                "next_after": flights[-1][0] if len(flights) == limit else None,
+            }).data,
+        )
+
+    @action(detail=False, methods=["GET"])
+    def get_log_file(self, request):
+        query_ser = WatermarkQuerySerializer(data=request.query_params)
+        if not query_ser.is_valid():
+            return Response(
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                data=ValidationErrorSerializer({"errors": query_ser.errors}).data,
+            )
+
+        op_id = self.ops_service.execute_operation(
+            self.export_service.record_export,
+            args=(query_ser.validated_data["after"],),
+            pool="exports",
+        )
         op = self.ops_service.get_operation(op_id)
         return Response(
             status=status.HTTP_200_OK,
             data=OperationSerializer(op).data,
         )
 
+    @action(detail=False, methods=["GET"])
+    def get_log_export(self, request):
+        query_ser = ExportQuerySerializer(data=request.query_params)
+        if not query_ser.is_valid():
+            return Response(
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                data=ValidationErrorSerializer({"errors": query_ser.errors}).data,
+            )
+
+        first_row = query_ser.validated_data["after"] + 1
+        rows = self.export_service.snapshot()
+        if "until" in query_ser.validated_data:
+            rows = min(rows, query_ser.validated_data["until"] + 1)
+        rows = max(rows, first_row)
+        encoding = query_ser.validated_data.get("compress")
+        if encoding is None:
+            encoding = "gzip" if accepts_encoding(request.headers.get("Accept-Encoding"), "gzip") else "identity"
+        etag = self.export_service.etag(rows, first_row, encoding)
+        last_modified = int(self.export_service.last_modified())
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is not None:
+            return response
+
+        if encoding == "identity":
+            size = self.export_service.content_length(rows, first_row)
+            iter_range = partial(self.export_service.iter_bytes, rows, first_row=first_row)
+        else:
+            compressed = self.export_service.cached_gzip(rows, first_row)
+            size = None if compressed is None else len(compressed)
+            iter_range = None if compressed is None else partial(iter_slices, compressed)
+
+        byte_range = None
+        if iter_range is not None and request.headers.get("If-Range") in (None, etag, http_date(last_modified)):
+            try:
+                byte_range = parse_byte_range(request.headers.get("Range"), size)
+            except RangeNotSatisfiable:
+                response = HttpResponse(status=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+                response["Content-Range"] = f"bytes */{size}"
+                return response
+
+        if byte_range is not None:
+            first, last = byte_range
+            response = StreamingHttpResponse(
+                iter_range(first, last),
+                status=status.HTTP_206_PARTIAL_CONTENT,
+                content_type="text/csv",
+            )
+            response["Content-Range"] = f"bytes {first}-{last}/{size}"
+            response["Content-Length"] = last - first + 1
+        elif iter_range is not None:
+            response = StreamingHttpResponse(iter_range(0, size - 1), content_type="text/csv")
+            response["Content-Length"] = size
+        else:
+            response = StreamingHttpResponse(
+                self.export_service.iter_gzip(rows, first_row),  # compressed size is unknown until streamed
+                content_type="text/csv",
+            )
+        if encoding != "identity":
+            response["Content-Encoding"] = encoding
+        patch_vary_headers(response, ["Accept-Encoding"])
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(last_modified)
+        if encoding == "identity":  # the compressed size is only known once an export is cached
+            response["Accept-Ranges"] = "bytes"
+        response["X-Watermark"] = rows - 1
+        response["Content-Disposition"] = 'attachment; filename="passengers.csv"'
+        return response
+
+    @action(detail=False, methods=["GET"])
+    def get_log_stats(self, _):
+        return Response(
+            status=status.HTTP_200_OK,
+            data=LogStatsSerializer(self.log_service.stats()).data,
+        )
+
     @action(detail=False, methods=["GET"])
     def get_log_file_status(self, request):
         query_ser = GetOperationQuerySerializer(data=request.query_params)
@@ -214,22 +712,57 @@ class FlightViewSet(ViewSet):
                 data=ValidationErrorSerializer({"errors": query_ser.errors}).data,
             )
 
-        op = self.ops_service.get_operation(UUID(query_ser.data.get("id")))
+        op_id = UUID(query_ser.data.get("id"))
+        wait = query_ser.validated_data.get("wait")
+        op = self.ops_service.wait_operation(op_id, wait) if wait else self.ops_service.get_operation(op_id)
         if op is None:
+            if self.ops_service.is_expired(op_id):
+                return Response(
+                    status=status.HTTP_410_GONE,
+                    data=OperationExpiredSerializer({"id": op_id, "status": "expired"}).data,
+                )
             return Response(
                 status=status.HTTP_404_NOT_FOUND,
             )
 
+        if request.accepted_renderer.format == EventStreamRenderer.format:
+            response = StreamingHttpResponse(self._operation_events(op), content_type=EventStreamRenderer.media_type)
+            response["Cache-Control"] = "no-cache"
+            response["X-Accel-Buffering"] = "no"  # stop reverse proxies from buffering the stream
+            return response
         return Response(
             status=status.HTTP_200_OK,
-            data=OperationSerializer(
-                {
-                    "id": op.id,
-                    "done": op.done,
-                    "result": {
-                        "path": op.result,
-                    },
-                }
-            ).data,
+            data=self._operation_data(op),
         )
 
+    @staticmethod
+    def _operation_data(op) -> dict:
+        return OperationSerializer(
+            {
+                "id": op.id,
+                "done": op.done,
+                "result": op.result if isinstance(op.result, dict) else {"path": op.result},
+            }
+        ).data
+
+    def _operation_events(self, op):
+        # one "operation" event now and one when the operation is done, comments keep idle connections open
+        yield format_event("operation", self._operation_data(op))
+        deadline = time.monotonic() + SSE_MAX_SECONDS
+        while not op.done and time.monotonic() < deadline:
+            op_id = op.id
+            op = self.ops_service.wait_operation(op_id, SSE_HEARTBEAT_SECONDS)
+            if op is None:
+                yield format_event("expired", OperationExpiredSerializer({"id": op_id, "status": "expired"}).data)
+                return
+            if op.done:
+                yield format_event("operation", self._operation_data(op))
+                return
+            yield b": keep-alive\n\n"
+
+    @action(detail=False, methods=["GET"])
+    def get_operation_stats(self, _):
+        return Response(
+            status=status.HTTP_200_OK,
+            data=OperationStatsSerializer(self.ops_service.stats()).data,
+        )
@@ -89,6 +89,96 @@ SPECTACULAR_SETTINGS = {
 WSGI_APPLICATION = 'space_flight_control_system.wsgi.application'
 
 
+# Flight storage engine
+# "objects" keeps a list of Flight objects, "columnar" keeps flights in typed array columns,
+# "shared_memory" keeps flights in a shared memory region seen by every worker process on the host,
+# "sqlite" persists flights in SQLite (see SQLITE_STORAGE)
+# FLIGHT_STORAGE_OPTIONS are passed to the engine, "shared_memory" takes NAME, MAX_FLIGHTS and MAX_SEATS
+
+FLIGHT_STORAGE_ENGINE = "objects"
+FLIGHT_STORAGE_OPTIONS = {}
+
+
+# Passenger and operation storage engines: "memory" or "sqlite"
+# SQLITE_STORAGE configures the database shared by every "sqlite" engine (flights included):
+# writes are committed every COMMIT_ROWS writes or COMMIT_INTERVAL seconds, whichever comes first
+
+PASSENGER_STORAGE_ENGINE = "memory"
+OPERATION_STORAGE_ENGINE = "memory"
+
+SQLITE_STORAGE = {
+    "PATH": BASE_DIR / 'storage.sqlite3',
+    "COMMIT_ROWS": 100,
+    "COMMIT_INTERVAL": 0.5,
+    "SYNCHRONOUS": "NORMAL",
+}
+
+
+# Operation registry: finished operations are dropped after TTL seconds (0 - never),
+# at most MAX_OPERATIONS are kept (0 - unlimited), the least recently used finished ones are evicted first
+# POOLS: executor pools operations run in, KIND "thread" or "process", MAX_WORKERS operations at a time
+# ("default" is required, passenger exports run in "exports", which must be a "thread" pool)
+# Identical operations (same function and arguments) started while one is pending share it,
+# REUSE_SECONDS: also share a finished one for this many seconds (0 - run again once finished)
+
+OPERATIONS = {
+    "TTL": 600,
+    "MAX_OPERATIONS": 10000,
+    "REUSE_SECONDS": 0,
+    "POOLS": {
+        "default": {"KIND": "thread", "MAX_WORKERS": 4},
+        "exports": {"KIND": "thread", "MAX_WORKERS": 2},
+    },
+}
+
+
+# Flight and passenger lists (cursor pagination): PAGE_SIZE items when the request sets no limit,
+# MAX_PAGE_SIZE is the largest limit a request may ask for
+
+PAGINATION = {
+    "PAGE_SIZE": 100,
+    "MAX_PAGE_SIZE": 1000,
+}
+
+# Actions validating their integer query parameters on the fast path (without building a serializer,
+# same 422 payload), every other action uses its DRF serializer
+
+FAST_QUERY_VALIDATION = ["get_delayed", "get_ticket", "get_itinerary"]
+
+
+# Journal of flight and passenger mutations (meant for the in-memory engines), replayed on startup
+# SNAPSHOT_RECORDS: write a snapshot and start a new journal after this many records (0 - never)
+# DURABILITY of a journal record: "none", "flush" (to the OS) or "fsync" (to disk)
+
+JOURNAL = {
+    "ENABLED": False,
+    "DIRECTORY": BASE_DIR / 'journal',
+    "SNAPSHOT_RECORDS": 100000,
+    "DURABILITY": "flush",
+}
+
+
+# Passenger log writer
+# MODE: "direct" opens passengers.csv for every row, "buffered" keeps it open and writes rows in batches,
+# "async" queues rows for a background writer thread
+# DURABILITY of a batch write: "none", "flush" (to the OS) or "fsync" (to disk)
+# BACKPRESSURE when the async queue is full: "block", "drop" or "spill"
+# (park the rows in memory, the writer thread queues them again in order)
+# ROTATE_BYTES / ROTATE_ROWS: move passengers.csv to a numbered segment once it reaches this size (0 - never),
+# segments are named after the process that wrote them and removed when it exits
+
+PASSENGER_LOG = {
+    "MODE": "direct",
+    "BUFFER_ROWS": 1000,
+    "FLUSH_INTERVAL": 1.0,
+    "DURABILITY": "flush",
+    "QUEUE_SIZE": 10000,
+    "BACKPRESSURE": "block",
+    "ROTATE_BYTES": 0,
+    "ROTATE_ROWS": 0,
+}
+
+
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 
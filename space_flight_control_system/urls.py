@@ -20,6 +20,7 @@ from django.contrib import admin
 from django.urls import path
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
 
+from flight import async_views
 from flight.views import FlightViewSet
 
 urlpatterns = [
@@ -30,10 +31,20 @@ urlpatterns = [
         FlightViewSet.as_view(
             {
                 "post": "post_flight",
+                "get": "get_flights",
             }
         ),
         name="post_flight",
     ),
+    path(
+        "api/v1/flight/bulk/",
+        FlightViewSet.as_view(
+            {
+                "post": "post_flights_bulk",
+            }
+        ),
+        name="post_flights_bulk",
+    ),
     path(
         "api/v1/flight/status",
         FlightViewSet.as_view(
@@ -43,24 +54,89 @@ urlpatterns = [
         ),
         name="post_flight_status",
     ),
+    path(
+        "api/v1/flight/by-status/",
+        FlightViewSet.as_view(
+            {
+                "get": "get_flights_by_status",
+            }
+        ),
+        name="get_flights_by_status",
+    ),
+    path(
+        "api/v1/flight/search/",
+        FlightViewSet.as_view(
+            {
+                "get": "get_flight_search",
+            }
+        ),
+        name="get_flight_search",
+    ),
     path(
         "api/v1/passenger/",
         FlightViewSet.as_view(
             {
                 "post": "post_passenger",
+                "get": "get_passengers",
             }
         ),
         name="post_passenger",
     ),
+    path(
+        "api/v1/passenger/search/",
+        FlightViewSet.as_view(
+            {
+                "get": "get_passenger_search",
+            }
+        ),
+        name="get_passenger_search",
+    ),
+    path(
+        "api/v1/passenger/itinerary/",
+        FlightViewSet.as_view(
+            {
+                "get": "get_itinerary",
+            }
+        ),
+        name="get_itinerary",
+    ),
+    path(
+        "api/v1/passenger/bulk/",
+        FlightViewSet.as_view(
+            {
+                "post": "post_passengers_bulk",
+            }
+        ),
+        name="post_passengers_bulk",
+    ),
     path(
         "api/v1/ticket/",
         FlightViewSet.as_view(
             {
+                "get": "get_ticket",
                 "post": "get_ticket",
             }
         ),
         name="get_ticket",
     ),
+    path(
+        "api/v1/ticket/batch/",
+        FlightViewSet.as_view(
+            {
+                "post": "post_tickets",
+            }
+        ),
+        name="post_tickets",
+    ),
+    path(
+        "api/v1/ticket/status/",
+        FlightViewSet.as_view(
+            {
+                "get": "get_ticket_status",
+            }
+        ),
+        name="get_ticket_status",
+    ),
     path(
         "api/v1/delayed/",
         FlightViewSet.as_view(
@@ -70,6 +146,15 @@ urlpatterns = [
         ),
         name="get_delayed",
     ),
+    path(
+        "api/v1/delayed/batch/",
+        FlightViewSet.as_view(
+            {
+                "post": "post_delayed_batch",
+            }
+        ),
+        name="post_delayed_batch",
+    ),
 
     path(
         "api/v1/log/",
@@ -80,6 +165,24 @@ urlpatterns = [
         ),
         name="get_log_file",
     ),
+    path(
+        "api/v1/log/export/",
+        FlightViewSet.as_view(
+            {
+                "get": "get_log_export",
+            }
+        ),
+        name="get_log_export",
+    ),
+    path(
+        "api/v1/log/stats/",
+        FlightViewSet.as_view(
+            {
+                "get": "get_log_stats",
+            }
+        ),
+        name="get_log_stats",
+    ),
     path(
         "api/v1/log/status/",
         FlightViewSet.as_view(
@@ -89,4 +192,17 @@ urlpatterns = [
         ),
         name="get_log_file_status",
     ),
+    path(
+        "api/v1/operation/stats/",
+        FlightViewSet.as_view(
+            {
+                "get": "get_operation_stats",
+            }
+        ),
+        name="get_operation_stats",
+    ),
+    path("api/v1/async/flight/", async_views.post_flight, name="async_post_flight"),
+    path("api/v1/async/passenger/", async_views.post_passenger, name="async_post_passenger"),
+    path("api/v1/async/ticket/", async_views.get_ticket, name="async_get_ticket"),
+    path("api/v1/async/delayed/", async_views.get_delayed, name="async_get_delayed"),
 ] + static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)